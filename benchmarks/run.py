@@ -0,0 +1,423 @@
+"""Benchmarks for youte, runnable offline.
+
+Data is generated with youte.synthetic and collector benchmarks run against
+youte.stub, so no network access or API key is needed. Each benchmark runs in a fresh
+process so that its peak RSS can be measured.
+
+Usage:
+
+    python benchmarks/run.py                       # run all benchmarks
+    python benchmarks/run.py -k parse -k csv       # run matching benchmarks only
+    python benchmarks/run.py --scale 0.1           # smaller inputs, for a quick check
+    python benchmarks/run.py --save results.json   # save results
+    python benchmarks/run.py --compare benchmarks/baseline.json
+
+--compare prints a report against saved results and exits with status 1 if any
+benchmark is slower than the baseline by more than --threshold.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import click
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+from youte import database, parallel, parser, timestamps
+from youte.collector import Youte
+from youte.stub import StubConfig, StubServer
+from youte.synthetic import DEFAULT_SPEC, generate_pages, write_corpus
+from youte.tidy import TidyWriter
+from youte.utilities import read_pages, retrieve_ids_from_file
+from youte.version import version
+
+
+@dataclass
+class Result:
+    name: str
+    count: float
+    seconds: float
+    unit: str
+    rate: float
+    peak_rss_mb: Optional[float] = None
+
+
+_BENCHMARKS: Dict[str, Callable[[Path, float], Result]] = {}
+
+
+def benchmark(name: str):
+    def register(func: Callable[[Path, float], Result]):
+        _BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def _timed(name: str, func: Callable[[], float], unit: str) -> Result:
+    start = time.perf_counter()
+    count = func()
+    seconds = time.perf_counter() - start
+    return Result(name, count, seconds, unit, count / seconds if seconds else 0.0)
+
+
+def _pages(kind: str, items: int, per_page: int = 50) -> list:
+    # enough distinct channels that channel pages don't repeat ids
+    spec = replace(DEFAULT_SPEC, channels=max(items, DEFAULT_SPEC.channels))
+    pages = max(items // per_page, 1)
+    return list(generate_pages(kind, pages, per_page, seed=1, spec=spec))
+
+
+_PARSERS = {
+    "search": parser.parse_searches,
+    "video": parser.parse_videos,
+    "channel": parser.parse_channels,
+    "comment": parser.parse_comments,
+}
+
+_TABULATORS = {
+    "search": parser.tabulate_searches,
+    "video": parser.tabulate_videos,
+    "channel": parser.tabulate_channels,
+    "comment": parser.tabulate_comments,
+}
+
+
+def _register_parse(
+    kind: str, items: int, validation: str = "strict", compact: bool = False
+) -> None:
+    name = f"parse_{kind}" if validation == "strict" else f"parse_{kind}_{validation}"
+    if compact:
+        name += "_compact"
+
+    @benchmark(name)
+    def run(workdir: Path, scale: float) -> Result:
+        pages = _pages(kind, int(items * scale))
+
+        def parse() -> float:
+            parsed = _PARSERS[kind](pages, validation=validation, compact=compact)
+            return len(parsed.items)
+
+        return _timed(name, parse, "items/s")
+
+
+def _register_tabulate(kind: str, items: int) -> None:
+    tabulate = _TABULATORS[kind]
+
+    @benchmark(f"tabulate_{kind}")
+    def run(workdir: Path, scale: float) -> Result:
+        pages = _pages(kind, int(items * scale))
+
+        def parse() -> float:
+            return len(tabulate(pages))
+
+        return _timed(f"tabulate_{kind}", parse, "items/s")
+
+
+for _kind, _items in (
+    ("search", 20_000),
+    ("video", 10_000),
+    ("channel", 10_000),
+    ("comment", 50_000),
+):
+    for _validation in ("strict", "trusted", "sampled"):
+        _register_parse(_kind, _items, _validation)
+    _register_parse(_kind, _items, "trusted", compact=True)
+    _register_tabulate(_kind, _items)
+
+
+def _register_export(method: str, kind: str, items: int) -> None:
+    @benchmark(f"{method}_{kind}")
+    def run(workdir: Path, scale: float) -> Result:
+        resources = _PARSERS[kind](_pages(kind, int(items * scale)))
+        output = workdir / f"{kind}.{method[3:]}"
+
+        def export() -> float:
+            getattr(resources, method)(output)
+            return output.stat().st_size / 1e6
+
+        return _timed(f"{method}_{kind}", export, "MB/s")
+
+
+for _kind in ("video", "comment"):
+    for _method in ("to_csv", "to_json", "to_jsonl"):
+        _register_export(_method, _kind, 20_000)
+
+
+@benchmark("tidy_csv_comment")
+def tidy_csv(workdir: Path, scale: float) -> Result:
+    pages = _pages("comment", int(20_000 * scale))
+    output = workdir / "comments.csv"
+
+    def tidy() -> float:
+        with TidyWriter(output, "comment") as writer:
+            for page in pages:
+                writer.write(page)
+        return writer.count
+
+    return _timed("tidy_csv_comment", tidy, "items/s")
+
+
+def _register_populate(kind: str, table: str, items: int) -> None:
+    populate = getattr(database, f"populate_{table}")
+
+    @benchmark(f"populate_{table}")
+    def run(workdir: Path, scale: float) -> Result:
+        resources = _PARSERS[kind](_pages(kind, int(items * scale)))
+        engine = database.set_up_database(workdir / f"{kind}.db")
+
+        def insert() -> float:
+            populate(engine, [resources])
+            return len(resources.items)
+
+        return _timed(f"populate_{table}", insert, "rows/s")
+
+
+for _kind, _table in (
+    ("search", "searches"),
+    ("video", "videos"),
+    ("channel", "channels"),
+    ("comment", "comments"),
+):
+    _register_populate(_kind, _table, 2_000)
+
+
+@benchmark("retrieve_ids_from_file")
+def retrieve_ids(workdir: Path, scale: float) -> Result:
+    pages = max(int(2_000 * scale), 1)
+    path = write_corpus(workdir / "comments.jsonl", "comment", pages)
+
+    def read() -> float:
+        for _ in retrieve_ids_from_file(path):
+            pass
+        return pages
+
+    return _timed("retrieve_ids_from_file", read, "lines/s")
+
+
+@benchmark("read_pages")
+def read_json_pages(workdir: Path, scale: float) -> Result:
+    pages = max(int(2_000 * scale), 1)
+    path = write_corpus(workdir / "comments.json", "comment", pages)
+
+    def read() -> float:
+        return sum(1 for _ in read_pages(path))
+
+    return _timed("read_pages", read, "pages/s")
+
+
+def _register_parallel(jobs: int) -> None:
+    name = f"parse_file_to_csv_j{jobs}"
+
+    @benchmark(name)
+    def run(workdir: Path, scale: float) -> Result:
+        pages = max(int(400 * scale), 1)
+        path = write_corpus(workdir / "comments.jsonl", "comment", pages)
+
+        def parse() -> float:
+            return parallel.parse_file_to_csv(
+                path,
+                workdir / "comments.csv",
+                jobs=jobs,
+                validation="sampled",
+                chunk_size=1024 * 1024,
+            )
+
+        return _timed(name, parse, "items/s")
+
+
+for _jobs in (1, 4):
+    _register_parallel(_jobs)
+
+
+@benchmark("parse_rfc3339")
+def parse_timestamps(workdir: Path, scale: float) -> Result:
+    strings = [
+        comment["snippet"][key]
+        for page in _pages("comment", int(100_000 * scale))
+        for item in page["items"]
+        for comment in [item["snippet"]["topLevelComment"]]
+        for key in ("publishedAt", "updatedAt")
+    ]
+
+    def parse() -> float:
+        timestamps.parse_rfc3339.cache_clear()
+        return len(timestamps.parse_rfc3339_many(strings))
+
+    return _timed("parse_rfc3339", parse, "timestamps/s")
+
+
+def _register_collector(concurrency: int) -> None:
+    name = f"collector_c{concurrency}"
+
+    @benchmark(name)
+    def run(workdir: Path, scale: float) -> Result:
+        videos = max(int(8 * concurrency * scale), concurrency)
+        config = StubConfig(videos=videos, threads_per_video=500, latency=0.02)
+        with StubServer(config) as server:
+            shares = [server.video_ids[i::concurrency] for i in range(concurrency)]
+            counts = [0] * concurrency
+
+            def work(n: int) -> None:
+                yob = Youte(api_key="benchmark", base_url=server.base_url)
+                for _ in yob.get_comment_threads(video_ids=shares[n]):
+                    counts[n] += 1
+
+            def collect() -> float:
+                threads = [
+                    threading.Thread(target=work, args=(n,)) for n in range(concurrency)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                return sum(counts)
+
+            return _timed(name, collect, "pages/s")
+
+
+for _concurrency in (1, 4, 16):
+    _register_collector(_concurrency)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def _run_one(name: str, scale: float) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        result = _BENCHMARKS[name](Path(workdir), scale)
+    result.peak_rss_mb = _peak_rss_mb()
+    return asdict(result)
+
+
+def run_benchmarks(names: List[str], scale: float = 1.0) -> List[Result]:
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        # a new worker per benchmark, not daemonic so that it can start processes
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            result = Result(**executor.submit(_run_one, name, scale).result())
+        click.echo(
+            f"{name:<30} {result.rate:>12,.1f} {result.unit:<8} "
+            f"({result.count:,.6g} in {result.seconds:.2f}s, "
+            f"peak RSS {result.peak_rss_mb or 0:,.0f} MB)"
+        )
+        results.append(result)
+    return results
+
+
+def compare(
+    results: List[Result], baseline: dict, threshold: float, scale: float = 1.0
+) -> bool:
+    """Print a comparison report. Returns False if any benchmark regressed."""
+    ok = True
+    previous = {r["name"]: r for r in baseline["results"]}
+    click.echo()
+    if baseline["scale"] != scale:
+        click.echo(
+            f"Warning: baseline was run with --scale {baseline['scale']}, "
+            "rates may not be comparable",
+            err=True,
+        )
+    click.echo(
+        f"Compared with baseline from {baseline['created_at']} "
+        f"(youte {baseline['youte']}, Python {baseline['python']})"
+    )
+    click.echo(
+        f"{'benchmark':<30} {'baseline':>12} {'current':>12} {'change':>8}  "
+        f"{'RSS MB':>14}"
+    )
+    for result in results:
+        before = previous.get(result.name)
+        if before is None:
+            click.echo(f"{result.name:<30} {'-':>12} {result.rate:>12,.1f}")
+            continue
+        change = result.rate / before["rate"] - 1 if before["rate"] else 0.0
+        flag = ""
+        if change < -threshold:
+            flag, ok = "  REGRESSION", False
+        elif change > threshold:
+            flag = "  faster"
+        rss = f"{before['peak_rss_mb'] or 0:,.0f} > {result.peak_rss_mb or 0:,.0f}"
+        click.echo(
+            f"{result.name:<30} {before['rate']:>12,.1f} {result.rate:>12,.1f} "
+            f"{change:>+8.1%}  {rss:>14}{flag}"
+        )
+    return ok
+
+
+@click.command()
+@click.option("-k", "keywords", multiple=True, help="Only run matching benchmarks")
+@click.option("--scale", default=1.0, show_default=True, help="Multiply input sizes")
+@click.option("--save", type=click.Path(), help="Save results to a JSON file")
+@click.option("--compare", "baseline", type=click.Path(exists=True))
+@click.option(
+    "--threshold",
+    default=0.1,
+    show_default=True,
+    help="Slowdown relative to the baseline reported as a regression",
+)
+@click.option("--list", "list_", is_flag=True, help="List benchmarks and exit")
+def main(
+    keywords: tuple,
+    scale: float,
+    save: Optional[str],
+    baseline: Optional[str],
+    threshold: float,
+    list_: bool,
+) -> None:
+    """Run youte benchmarks"""
+    names = [
+        name
+        for name in _BENCHMARKS
+        if not keywords or any(keyword in name for keyword in keywords)
+    ]
+    if list_:
+        click.echo("\n".join(names))
+        return
+
+    results = run_benchmarks(names, scale)
+
+    if save:
+        with open(save, "w") as f:
+            json.dump(
+                {
+                    "created_at": datetime.now(tz=timezone.utc).isoformat(),
+                    "youte": version,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "scale": scale,
+                    "results": [asdict(result) for result in results],
+                },
+                f,
+                indent=2,
+            )
+        click.echo(f"Results saved to {save}")
+
+    if baseline:
+        with open(baseline) as f:
+            if not compare(results, json.load(f), threshold, scale):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
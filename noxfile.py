@@ -11,8 +11,21 @@ def lint(session):
 
 
 @nox.session(python=["3.8", "3.9", "3.10"])
-def test(session):
+@nox.parametrize("pydantic", ["pydantic==1.10.7", "pydantic>=2"])
+def test(session, pydantic):
     session.run("pip", "install", "--upgrade", "pip", "setuptools", "wheel")
     session.install(".")
-    session.install("pytest")
+    session.install("pytest", pydantic)
     session.run("pytest", "-k", "not test_archive and not test_collector")
+
+
+@nox.session
+def bench(session):
+    session.install(".")
+    session.run(
+        "python",
+        "benchmarks/run.py",
+        "--compare",
+        "benchmarks/baseline.json",
+        *session.posargs,
+    )
@@ -36,6 +36,10 @@ if __name__ == "__main__":
             "pydantic >= 1.10.7",
             "click_log >= 0.4.0",
         ],
+        extras_require={
+            "parquet": ["pyarrow >= 10.0", "numpy"],
+            "zstd": ["zstandard >= 0.15"],
+        },
         python_requires=">=3.8",
         entry_points={"console_scripts": ["youte=youte.cli:youte"]},
     )
@@ -5,26 +5,45 @@ Author: Boyd Nguyen <thaihoang.nguyen@qut.edu.au>
 
 from __future__ import annotations
 
-import json
+import itertools
 import logging
+import os
+import socket
 import sys
+from contextlib import nullcontext
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from typing import IO, Callable, Literal, Sequence
+from typing import IO, Callable, ContextManager, Iterable, Iterator, Literal, Sequence
 from warnings import simplefilter
 
 import click
 import click_log
+from click.core import ParameterSource
 
 import youte.database as database
 import youte.parser as parser
 from youte._logging import MultiFormatter
 from youte.collector import Youte
-from youte.common import Resources
+from youte.common import YouteClass, write_csv
 from youte.config import YouteConfig
 from youte.exceptions import ValueAlreadyExists
-from youte.utilities import export_file, retrieve_ids_from_file, validate_date_string
+from youte.metrics import Metrics, MetricsReporter
+from youte.parallel import parse_file, parse_file_to_csv
+from youte.parquet import ParquetWriter, write_parquet
+from youte.partition import PartitionedWriter, PartitionFormat
+from youte.progress import LogProgress
+from youte.tidy import TidyWriter
+from youte.transport import RecordTransport, ReplayTransport, Transport
+from youte.utilities import (
+    FlushPolicy,
+    RawWriter,
+    open_file,
+    read_pages,
+    retrieve_ids_from_file,
+    validate_date_string,
+)
 from youte.version import user_agent, version
+from youte.workqueue import WorkQueue, database_sink, merge_shards, run_worker
 
 # Logging
 
@@ -48,14 +67,38 @@ DEFAULT_OPTIONS = [
         show_default=True,
         help="Include/don't include metadata about when and how data was collected.",
     ),
+    click.option(
+        "--record",
+        type=click.Path(file_okay=False),
+        help="Save API responses to a directory so the run can be replayed offline",
+    ),
+    click.option(
+        "--replay",
+        type=click.Path(file_okay=False, exists=True),
+        help="Serve API responses from a directory saved with --record",
+    ),
+    click.option(
+        "--metrics-file",
+        type=click.Path(dir_okay=False),
+        help="Write request, latency and quota metrics to a file, "
+        "as JSON if it ends with .json and in Prometheus text format otherwise",
+    ),
+    click.option(
+        "--metrics-interval",
+        type=click.FloatRange(min=0),
+        default=60,
+        show_default=True,
+        help="Seconds between updates of --metrics-file, 0 to write it at the end only",
+    ),
 ]
 
 OUTPUT_OPTIONS = [
     click.option(
         "-o",
         "--outfile",
-        type=click.Path(),
-        help="Name of json file to store results to",
+        type=click.Path(allow_dash=True),
+        help="Name of json file to store results to. Add .gz or .zst to compress it, "
+        "or use - to stream JSONL to standard output",
         required=True,
     ),
     click.option(
@@ -66,6 +109,14 @@ OUTPUT_OPTIONS = [
         show_default=True,
     ),
     click.option("--pretty", "-p", is_flag=True, help="Pretty print JSON"),
+    click.option(
+        "--flush",
+        type=click.Choice(["none", "page", "fsync"]),
+        default="page",
+        show_default=True,
+        help="Write each page to the output file as soon as it is collected ('page'), "
+        "also force it to disk ('fsync'), or leave it to the file buffers ('none')",
+    ),
 ]
 
 TIDY_OPTIONS = [
@@ -73,9 +124,10 @@ TIDY_OPTIONS = [
     click.option(
         "--format",
         "format_",
-        type=click.Choice(["json", "csv"]),
+        type=click.Choice(["json", "jsonl", "csv", "parquet"]),
         default="csv",
-        help="Format data is parsed into. Can be 'json', 'jsonl', or 'csv'",
+        help="Format data is parsed into. Can be 'json', 'jsonl', 'csv' or 'parquet'. "
+        "Files ending with .parquet are always written as Parquet",
         show_default=True,
     ),
     click.option(
@@ -83,6 +135,42 @@ TIDY_OPTIONS = [
     ),
 ]
 
+PARTITION_OPTIONS = [
+    click.option(
+        "--partition-by",
+        help="Write output to directories partitioned by this attribute of the items, "
+        "e.g. published_date, channel_id or video_id",
+    ),
+    click.option(
+        "--max-file-size",
+        type=click.IntRange(min=1),
+        default=256,
+        show_default=True,
+        help="Size in MB after which a new file is started in a partition",
+    ),
+]
+
+QUEUE_OPTIONS = [
+    click.option(
+        "--queue",
+        "queue_path",
+        type=click.Path(),
+        help="Share the work with other machines through a queue file",
+    ),
+    click.option(
+        "--worker-id",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="Name of this worker in the queue  [default: hostname-pid]",
+    ),
+    click.option(
+        "--lease",
+        type=click.IntRange(min=10),
+        default=300,
+        show_default=True,
+        help="Seconds before a unit held by an unresponsive worker is requeued",
+    ),
+]
+
 
 def default_options(func) -> Callable:
     """Decorator to include api key options for querying commands"""
@@ -105,6 +193,20 @@ def tidy_options(func) -> Callable:
     return func
 
 
+def partition_options(func) -> Callable:
+    """Decorator to include partitioning options"""
+    for option in reversed(PARTITION_OPTIONS):
+        func = option(func)
+    return func
+
+
+def queue_options(func) -> Callable:
+    """Decorator to include work queue options"""
+    for option in reversed(QUEUE_OPTIONS):
+        func = option(func)
+    return func
+
+
 def _validate_date(ctx, param, value):
     if value:
         if validate_date_string(value):
@@ -135,7 +237,9 @@ def _check_file_overwrite(ctx, param, value: str) -> Path:
                 return path_value
         except click.Abort:
             click.secho(
-                "Rerun this command and choose a different filename.", fg="green"
+                "Rerun this command and choose a different filename.",
+                fg="green",
+                err=True,
             )
             raise click.Abort
     else:
@@ -157,6 +261,7 @@ def youte():
 @click.argument("query")
 @output_options
 @tidy_options
+@partition_options
 @default_options
 @click.option(
     "--from", "from_", help="Start date (YYYY-MM-DD)", callback=_validate_date
@@ -274,10 +379,15 @@ def search(
     outfile: Path,
     output_format: Literal["json", "jsonl"],
     pretty: bool,
+    flush: FlushPolicy,
     from_: str,
     to: str,
     name: str,
     key: str,
+    record: str,
+    replay: str,
+    metrics_file: str,
+    metrics_interval: float,
     order: Literal["date", "rating", "relevance", "title", "videoCount", "viewCount"],
     video_duration: Literal["any", "long", "medium", "short"],
     lang: str,
@@ -294,7 +404,9 @@ def search(
     location: tuple[float],
     radius: str,
     tidy_to: Path,
-    format_: Literal["json", "csv"],
+    format_: Literal["json", "jsonl", "csv", "parquet"],
+    partition_by: str | None,
+    max_file_size: int,
     max_pages: int,
     max_results: int,
     metadata: bool,
@@ -308,53 +420,58 @@ def search(
     operators to exclude videos or to find videos matching one of several search terms.
 
     --outfile must be specified as the place to store raw output. Default format is JSON,
-    but you can save it as JSONL by specifying --output-format.
+    but you can save it as JSONL by specifying --output-format. Use `-o -` to stream
+    JSONL to standard output, e.g. `youte search ... -o - | jq`.
     """
-    api_key = key if key else _get_api_key(name=name)
-    yob = Youte(api_key=api_key)
-
-    results = [
-        result
-        for result in yob.search(
-            query=query,
-            type_=type_,
-            start_time=from_,
-            end_time=to,
-            order=order,
-            safe_search=safe_search,
-            language=lang,
-            region=region,
-            video_duration=video_duration,
-            video_type=video_type,
-            caption=caption,
-            video_definition=video_definition,
-            video_embeddable=video_embeddable,
-            location=location,
-            location_radius=radius,
-            video_dimension=video_dimension,
-            max_pages_retrieved=max_pages,
-            max_result=max_results,
-            video_license=video_license,
-            channel_type=channel_type,
-            include_meta=metadata,
-        )
-    ]
-
-    export_file(
-        results, fp=outfile, file_format=output_format, pretty=pretty, ensure_ascii=True
+    yob = _get_youte(
+        key=key,
+        name=name,
+        record=record,
+        replay=replay,
+        metrics_file=metrics_file,
+        metrics_interval=metrics_interval,
     )
 
-    if tidy_to:
-        if format_ == "csv":
-            parser.parse_searches(results).to_csv(tidy_to, encoding=encoding)
-        elif format_ == "json":
-            parser.parse_searches(results).to_json(tidy_to)
+    with _tidy_writer(
+        tidy_to, "search", format_, encoding, pretty, partition_by, max_file_size
+    ) as writer, _raw_writer(
+        outfile, "search", output_format, pretty, flush, partition_by, max_file_size
+    ) as raw:
+        _collect(
+            yob,
+            yob.search(
+                query=query,
+                type_=type_,
+                start_time=from_,
+                end_time=to,
+                order=order,
+                safe_search=safe_search,
+                language=lang,
+                region=region,
+                video_duration=video_duration,
+                video_type=video_type,
+                caption=caption,
+                video_definition=video_definition,
+                video_embeddable=video_embeddable,
+                location=location,
+                location_radius=radius,
+                video_dimension=video_dimension,
+                max_pages_retrieved=max_pages,
+                max_result=max_results,
+                video_license=video_license,
+                channel_type=channel_type,
+                include_meta=metadata,
+            ),
+            writer,
+            raw,
+        )
 
 
 @youte.command()
 @click.argument("items", nargs=-1, required=False)
 @output_options
 @tidy_options
+@partition_options
 @default_options
 @click.option("-f", "--file-path", help="Use IDs from file", default=None)
 @click.option(
@@ -400,26 +517,37 @@ def search(
     is_flag=True,
     default=False,
 )
+@queue_options
 @click_log.simple_verbosity_option(logger, "--verbosity")
 def comments(
     items: list[str],
     outfile: Path,
     output_format: Literal["json", "jsonl"],
     pretty: bool,
+    flush: FlushPolicy,
     order: Literal["time", "relevance"],
     text_format: Literal["html", "plainText"],
     query: str,
     name: str,
     key: str,
+    record: str,
+    replay: str,
+    metrics_file: str,
+    metrics_interval: float,
     file_path: Path,
     by_video_id: bool,
     by_channel_id: bool,
     tidy_to: Path,
-    format_: Literal["json", "csv"],
+    format_: Literal["json", "jsonl", "csv", "parquet"],
+    partition_by: str | None,
+    max_file_size: int,
     max_results: int,
     metadata: bool,
     include_replies: bool,
     encoding: str,
+    queue_path: str,
+    worker_id: str,
+    lease: int,
 ) -> None:
     """Get YouTube comment threads (top-level comments)
 
@@ -439,9 +567,18 @@ def comments(
     has to contain a line-separated list of ids, with no header.
 
     All ids specified have to be the same kind.
+
+    With --queue, comments on videos (--by-video-id) can be collected by several
+    workers sharing one queue file. See `youte queue --help`.
     """
-    api_key = key if key else _get_api_key(name=name)
-    yob = Youte(api_key=api_key)
+    yob = _get_youte(
+        key=key,
+        name=name,
+        record=record,
+        replay=replay,
+        metrics_file=metrics_file,
+        metrics_interval=metrics_interval,
+    )
 
     vid_ids: list[str] | None = None
     channel_ids: list[str] | None = None
@@ -454,9 +591,36 @@ def comments(
     else:
         comment_ids = _read_ids(items, file_path)
 
-    results = [
-        result
-        for result in yob.get_comment_threads(
+    if queue_path:
+        if not by_video_id:
+            raise click.BadOptionUsage(
+                option_name="--queue",
+                message="--queue can only be used with --by-video-id",
+            )
+        queue = WorkQueue(queue_path, lease_seconds=lease)
+        if vid_ids:
+            queue.put("thread", vid_ids)
+        _work_queue(
+            queue,
+            yob,
+            worker_id=worker_id,
+            outfile=outfile,
+            output_format=output_format,
+            flush=flush,
+            follow=["reply"] if include_replies else [],
+            include_meta=metadata,
+            tidy_to=tidy_to,
+            partition_by=partition_by,
+        )
+        return
+
+    thread_videos: dict[str, str | None] = {}
+    with _tidy_writer(
+        tidy_to, "comment", format_, encoding, pretty, partition_by, max_file_size
+    ) as writer, _raw_writer(
+        outfile, "comment", output_format, pretty, flush, partition_by, max_file_size
+    ) as raw:
+        threads = yob.get_comment_threads(
             video_ids=vid_ids,
             related_channel_ids=channel_ids,
             comment_ids=comment_ids,
@@ -466,31 +630,23 @@ def comments(
             max_results=max_results,
             include_meta=metadata,
         )
-    ]
-
-    if include_replies:
-        comments = parser.parse_comments(results)  # type: ignore
-        thread_ids = [c.id for c in comments.items if c.total_reply_count > 0]
-        results_replies = [
-            r for r in yob.get_thread_replies(thread_ids, include_meta=metadata)
-        ]
-        results.extend(results_replies)
-
-    export_file(
-        results, outfile, file_format=output_format, pretty=pretty, ensure_ascii=True
-    )
+        if include_replies:
+            threads = _note_threads_with_replies(threads, thread_videos)
+        _collect(yob, threads, writer, raw)
 
-    if tidy_to:
-        if format_ == "csv":
-            parser.parse_comments(results).to_csv(tidy_to, encoding=encoding)
-        elif format_ == "json":
-            parser.parse_comments(results).to_json(tidy_to, pretty=pretty)
+        if include_replies:
+            replies = yob.get_thread_replies(list(thread_videos), include_meta=metadata)
+            if partition_by == "video_id":
+                # replies do not name their video, so take it from their thread
+                replies = _fill_reply_videos(replies, thread_videos)
+            _collect(yob, replies, writer, raw)
 
 
 @youte.command()
 @click.argument("items", nargs=-1, required=False)
 @output_options
 @tidy_options
+@partition_options
 @default_options
 @click.option("-f", "--file-path", help="Use IDs from file", default=None)
 @click.option(
@@ -507,21 +663,32 @@ def comments(
     default=100,
     show_default=True,
 )
+@queue_options
 @click_log.simple_verbosity_option(logger, "--verbosity")
 def replies(
     items: list[str],
     outfile: Path,
     output_format: Literal["json", "jsonl"],
     pretty: bool,
+    flush: FlushPolicy,
     text_format: Literal["html", "plainText"],
     name: str,
     key: str,
+    record: str,
+    replay: str,
+    metrics_file: str,
+    metrics_interval: float,
     file_path: Path,
     tidy_to: Path,
-    format_: Literal["json", "csv"],
+    format_: Literal["json", "jsonl", "csv", "parquet"],
+    partition_by: str | None,
+    max_file_size: int,
     max_results: int,
     metadata: bool,
     encoding: str,
+    queue_path: str,
+    worker_id: str,
+    lease: int,
 ) -> None:
     """Get replies to comment threads
 
@@ -529,37 +696,68 @@ def replies(
 
     You can use ids stored in a text file by using --file-path <FILENAME>. The file
     has to contain a line-separated list of ids, with no header.
+
+    With --queue, replies can be collected by several workers sharing one queue file.
+    See `youte queue --help`.
     """
-    api_key = key if key else _get_api_key(name=name)
-    yob = Youte(api_key=api_key)
+    yob = _get_youte(
+        key=key,
+        name=name,
+        record=record,
+        replay=replay,
+        metrics_file=metrics_file,
+        metrics_interval=metrics_interval,
+    )
 
     ids = _read_ids(items, file_path)
 
-    results = [
-        result
-        for result in yob.get_thread_replies(
-            thread_ids=ids,
-            text_format=text_format,
-            max_results=max_results,
+    if queue_path:
+        queue = WorkQueue(queue_path, lease_seconds=lease)
+        if ids:
+            queue.put("reply", ids)
+        _work_queue(
+            queue,
+            yob,
+            worker_id=worker_id,
+            outfile=outfile,
+            output_format=output_format,
+            flush=flush,
             include_meta=metadata,
+            tidy_to=tidy_to,
+            partition_by=partition_by,
         )
-    ]
+        return
 
-    export_file(
-        results, outfile, file_format=output_format, pretty=pretty, ensure_ascii=True
-    )
+    if partition_by == "video_id":
+        raise click.BadParameter(
+            "replies do not name their video, use `youte comments "
+            "--include-replies` to partition threads and replies by video",
+            param_hint="'--partition-by'",
+        )
 
-    if tidy_to:
-        if format_ == "csv":
-            parser.parse_comments(results).to_csv(tidy_to, encoding=encoding)
-        elif format_ == "json":
-            parser.parse_comments(results).to_json(tidy_to, pretty=pretty)
+    with _tidy_writer(
+        tidy_to, "comment", format_, encoding, pretty, partition_by, max_file_size
+    ) as writer, _raw_writer(
+        outfile, "comment", output_format, pretty, flush, partition_by, max_file_size
+    ) as raw:
+        _collect(
+            yob,
+            yob.get_thread_replies(
+                thread_ids=ids,
+                text_format=text_format,
+                max_results=max_results,
+                include_meta=metadata,
+            ),
+            writer,
+            raw,
+        )
 
 
 @youte.command()
 @click.argument("items", nargs=-1, required=False)
 @output_options
 @tidy_options
+@partition_options
 @default_options
 @click.option("-f", "--file-path", help="Get IDs from file", default=None)
 @click.option(
@@ -569,20 +767,31 @@ def replies(
     default=50,
     show_default=True,
 )
+@queue_options
 @click_log.simple_verbosity_option(logger, "--verbosity")
 def videos(
     items: list[str],
     outfile: Path,
     output_format: Literal["json", "jsonl"],
     pretty: bool,
+    flush: FlushPolicy,
     file_path: Path,
     name: str,
     key: str,
+    record: str,
+    replay: str,
+    metrics_file: str,
+    metrics_interval: float,
     tidy_to: Path,
-    format_: Literal["json", "csv"],
+    format_: Literal["json", "jsonl", "csv", "parquet"],
+    partition_by: str | None,
+    max_file_size: int,
     max_results: int,
     metadata: bool,
     encoding: str,
+    queue_path: str,
+    worker_id: str,
+    lease: int,
 ) -> None:
     """Retrieve video metadata
 
@@ -592,34 +801,56 @@ def videos(
 
     You can use ids stored in a text file by using --file-path <FILENAME>. The file
     has to contain a line-separated list of ids, with no header.
+
+    With --queue, the videos can be collected by several workers sharing one queue
+    file. See `youte queue --help`.
     """
-    api_key = key if key else _get_api_key(name=name)
-    yob = Youte(api_key=api_key)
+    yob = _get_youte(
+        key=key,
+        name=name,
+        record=record,
+        replay=replay,
+        metrics_file=metrics_file,
+        metrics_interval=metrics_interval,
+    )
 
     ids = _read_ids(string=items, file=file_path)
 
-    results = [
-        result
-        for result in yob.get_video_metadata(
-            ids, max_results=max_results, include_meta=metadata
+    if queue_path:
+        queue = WorkQueue(queue_path, lease_seconds=lease)
+        if ids:
+            queue.put("video", ids, batch_size=max_results)
+        _work_queue(
+            queue,
+            yob,
+            worker_id=worker_id,
+            outfile=outfile,
+            output_format=output_format,
+            flush=flush,
+            include_meta=metadata,
+            tidy_to=tidy_to,
+            partition_by=partition_by,
+        )
+        return
+
+    with _tidy_writer(
+        tidy_to, "video", format_, encoding, pretty, partition_by, max_file_size
+    ) as writer, _raw_writer(
+        outfile, "video", output_format, pretty, flush, partition_by, max_file_size
+    ) as raw:
+        _collect(
+            yob,
+            yob.get_video_metadata(ids, max_results=max_results, include_meta=metadata),
+            writer,
+            raw,
         )
-    ]
-
-    export_file(
-        results, outfile, file_format=output_format, pretty=pretty, ensure_ascii=True
-    )
-
-    if tidy_to:
-        if format_ == "csv":
-            parser.parse_videos(results).to_csv(tidy_to, encoding=encoding)
-        elif format_ == "json":
-            parser.parse_videos(results).to_json(tidy_to, pretty=pretty)
 
 
 @youte.command()
 @click.argument("items", nargs=-1, required=False)
 @output_options
 @tidy_options
+@partition_options
 @default_options
 @click.option("-f", "--file-path", help="Get IDs from file", default=None)
 @click.option(
@@ -643,12 +874,19 @@ def channels(
     outfile: Path,
     output_format: Literal["json", "jsonl"],
     pretty: bool,
+    flush: FlushPolicy,
     file_path: Path,
     handle_file: Path,
     name: str,
     key: str,
+    record: str,
+    replay: str,
+    metrics_file: str,
+    metrics_interval: float,
     tidy_to: Path,
-    format_: Literal["json", "csv"],
+    format_: Literal["json", "jsonl", "csv", "parquet"],
+    partition_by: str | None,
+    max_file_size: int,
     max_results: int,
     metadata: bool,
     encoding: str,
@@ -662,34 +900,38 @@ def channels(
     You can use ids stored in a text file by using --file-path <FILENAME>. The file
     has to contain a line-separated list of ids, with no header.
     """
-    api_key = key if key else _get_api_key(name=name)
-    yob = Youte(api_key=api_key)
+    yob = _get_youte(
+        key=key,
+        name=name,
+        record=record,
+        replay=replay,
+        metrics_file=metrics_file,
+        metrics_interval=metrics_interval,
+    )
 
     ids = _read_ids(string=items, file=file_path)
     handles = _read_ids(string=handles, file=handle_file)
 
-    results = [
-        result
-        for result in yob.get_channel_metadata(
-            ids=ids, handles=handles, max_results=max_results, include_meta=metadata
+    with _tidy_writer(
+        tidy_to, "channel", format_, encoding, pretty, partition_by, max_file_size
+    ) as writer, _raw_writer(
+        outfile, "channel", output_format, pretty, flush, partition_by, max_file_size
+    ) as raw:
+        _collect(
+            yob,
+            yob.get_channel_metadata(
+                ids=ids, handles=handles, max_results=max_results, include_meta=metadata
+            ),
+            writer,
+            raw,
         )
-    ]
-
-    export_file(
-        results, outfile, file_format=output_format, pretty=pretty, ensure_ascii=True
-    )
-
-    if tidy_to:
-        if format_ == "csv":
-            parser.parse_channels(results).to_csv(tidy_to, encoding=encoding)
-        elif format_ == "json":
-            parser.parse_channels(results).to_json(tidy_to, pretty=pretty)
 
 
 @youte.command()
 @click.argument("region_code", default="us")
 @output_options
 @tidy_options
+@partition_options
 @default_options
 @click.option(
     "--video-category",
@@ -708,11 +950,18 @@ def chart(
     outfile: Path,
     output_format: Literal["json", "jsonl"],
     pretty: bool,
+    flush: FlushPolicy,
     video_category: str,
     name: str,
     key: str,
+    record: str,
+    replay: str,
+    metrics_file: str,
+    metrics_interval: float,
     tidy_to: Path,
-    format_: Literal["json", "jsonl", "csv"],
+    format_: Literal["json", "jsonl", "csv", "parquet"],
+    partition_by: str | None,
+    max_file_size: int,
     max_results: int,
     metadata: bool,
     encoding: str,
@@ -725,28 +974,31 @@ def chart(
     REGION_CODE: ISO 3166-1 alpha-2 country codes to retrieve videos, default "us"
     """
 
-    api_key = key if key else _get_api_key(name=name)
-    yob = Youte(api_key=api_key)
-
-    results = [
-        result
-        for result in yob.get_most_popular(
-            region_code=region_code,
-            video_category_id=video_category,
-            max_results=max_results,
-            include_meta=metadata,
-        )
-    ]
-
-    export_file(
-        results, outfile, file_format=output_format, pretty=pretty, ensure_ascii=True  # type: ignore
+    yob = _get_youte(
+        key=key,
+        name=name,
+        record=record,
+        replay=replay,
+        metrics_file=metrics_file,
+        metrics_interval=metrics_interval,
     )
 
-    if tidy_to:
-        if format_ == "csv":
-            parser.parse_videos(results).to_csv(tidy_to, encoding=encoding)
-        elif format_ == "json":
-            parser.parse_videos(results).to_json(tidy_to, pretty=pretty)
+    with _tidy_writer(
+        tidy_to, "video", format_, encoding, pretty, partition_by, max_file_size
+    ) as writer, _raw_writer(
+        outfile, "video", output_format, pretty, flush, partition_by, max_file_size
+    ) as raw:
+        _collect(
+            yob,
+            yob.get_most_popular(
+                region_code=region_code,
+                video_category_id=video_category,
+                max_results=max_results,
+                include_meta=metadata,
+            ),
+            writer,
+            raw,
+        )
 
 
 @youte.command()
@@ -903,11 +1155,16 @@ def dehydrate(infile: Path, output: IO) -> None:
     type=click.INT,
     help="Maximum number of result pages to retrieve",
 )
+@queue_options
 @click_log.simple_verbosity_option(logger, "--verbosity")
 def full_archive(
     query: str,
     select: str,
     key: str,
+    record: str,
+    replay: str,
+    metrics_file: str,
+    metrics_interval: float,
     name: str,
     out_db: str | Path,
     from_: str,
@@ -930,6 +1187,9 @@ def full_archive(
     max_pages: int,
     max_results: int,
     metadata: bool,
+    queue_path: str,
+    worker_id: str,
+    lease: int,
 ) -> None:
     """Run full archive workflow
 
@@ -947,43 +1207,78 @@ def full_archive(
     thus collecting comment threads is a must before getting replies. Because of that,
     if you want to archive the replies, both 'thread' and 'reply' will have to be
     specified.
+
+    With --queue, the archive can be shared between several workers running the same
+    command with the same queue file. Each worker stores what it collects in its own
+    --out-db, and the databases can be merged with `youte queue merge`.
+
+    Data is stored in database tables rather than files, so --partition-by is not
+    available for this command.
     """
     _check_compatibility(select)
 
-    api_key = key if key else _get_api_key(name=name)
-    yob = Youte(api_key=api_key)
+    yob = _get_youte(
+        key=key,
+        name=name,
+        record=record,
+        replay=replay,
+        metrics_file=metrics_file,
+        metrics_interval=metrics_interval,
+    )
 
-    results = [
-        result
-        for result in yob.search(
-            query=query,
-            type_=type_,
-            start_time=from_,
-            end_time=to,
-            order=order,
-            safe_search=safe_search,
-            language=lang,
-            region=region,
-            video_duration=video_duration,
-            video_type=video_type,
-            caption=caption,
-            video_definition=video_definition,
-            video_embeddable=video_embeddable,
-            location=location,
-            location_radius=radius,
-            video_dimension=video_dimension,
-            max_pages_retrieved=max_pages,
-            max_result=max_results,
-            video_license=video_license,
-            channel_type=channel_type,
+    search_params = dict(
+        query=query,
+        type_=type_,
+        start_time=from_,
+        end_time=to,
+        order=order,
+        safe_search=safe_search,
+        language=lang,
+        region=region,
+        video_duration=video_duration,
+        video_type=video_type,
+        caption=caption,
+        video_definition=video_definition,
+        video_embeddable=video_embeddable,
+        location=location,
+        location_radius=radius,
+        video_dimension=video_dimension,
+        max_pages_retrieved=max_pages,
+        max_result=max_results,
+        video_license=video_license,
+        channel_type=channel_type,
+    )
+
+    if queue_path:
+        queue = WorkQueue(queue_path, lease_seconds=lease)
+        queue.put("search", search_params)
+        engine = database.set_up_database(out_db)
+        done = run_worker(
+            queue,
+            yob,
+            worker_id=worker_id,
+            sink=database_sink(engine),
+            follow=[
+                kind
+                for kind in ("video", "channel", "thread", "reply")
+                if kind in select
+            ],
             include_meta=metadata,
         )
-    ]
+        click.secho(
+            f"{done} units archived by {worker_id}. Data is stored in {out_db}",
+            fg="green",
+        )
+        return
 
-    searches = parser.parse_searches(results)
+    with _stage(yob, "collect"):
+        results = [r for r in yob.search(include_meta=metadata, **search_params)]
+    with _stage(yob, "parse"):
+        searches = parser.parse_searches(results)
 
     engine = database.set_up_database(out_db)
-    database.populate_searches(engine, [searches])
+    with _stage(yob, "database"):
+        database.populate_searches(engine, [searches])
 
     video_ids = [s.id for s in searches.items]
     channel_ids = [s.channel_id for s in searches.items]
@@ -991,44 +1286,64 @@ def full_archive(
     if "video" in select:
         click.echo("Retrieving video metadata")
         click.echo(f"{len(video_ids)} videos being retrieved")
-        results = [
-            result
-            for result in yob.get_video_metadata(video_ids, include_meta=metadata)
-        ]
-        _videos = parser.parse_videos(results)
-        database.populate_videos(engine, [_videos])
+        with _stage(yob, "collect"):
+            results = [
+                result
+                for result in yob.get_video_metadata(video_ids, include_meta=metadata)
+            ]
+        with _stage(yob, "parse"):
+            _videos = parser.parse_videos(results)
+        with _stage(yob, "database"):
+            database.populate_videos(engine, [_videos])
 
     if "channel" in select:
         click.echo("Retrieving channel metadata")
         click.echo(f"{len(channel_ids)} channels being retrieved")
-        results = [
-            result
-            for result in yob.get_channel_metadata(channel_ids, include_meta=metadata)
-        ]
-        _channels = parser.parse_channels(results)
-        database.populate_channels(engine, [_channels])
+        with _stage(yob, "collect"):
+            results = [
+                result
+                for result in yob.get_channel_metadata(
+                    channel_ids, include_meta=metadata
+                )
+            ]
+        with _stage(yob, "parse"):
+            _channels = parser.parse_channels(results)
+        with _stage(yob, "database"):
+            database.populate_channels(engine, [_channels])
 
     if "thread" in select:
         click.echo("Retrieving comment threads")
-        results = [r for r in yob.get_comment_threads(video_ids, include_meta=metadata)]
-        _comments = parser.parse_comments(results)
-
-        database.populate_comments(engine, [_comments])
+        with _stage(yob, "collect"):
+            results = [
+                r for r in yob.get_comment_threads(video_ids, include_meta=metadata)
+            ]
+        with _stage(yob, "parse"):
+            _comments = parser.parse_comments(results)
+        with _stage(yob, "database"):
+            database.populate_comments(engine, [_comments])
 
         if "reply" in select:
             thread_ids = [c.id for c in _comments.items if c.total_reply_count > 0]
-            results = [
-                r for r in yob.get_thread_replies(thread_ids, include_meta=metadata)
-            ]
-            _replies = parser.parse_comments(results)
-            database.populate_comments(engine, [_replies])
+            with _stage(yob, "collect"):
+                results = [
+                    r for r in yob.get_thread_replies(thread_ids, include_meta=metadata)
+                ]
+            with _stage(yob, "parse"):
+                _replies = parser.parse_comments(results)
+            with _stage(yob, "database"):
+                database.populate_comments(engine, [_replies])
 
     click.secho(f"ARCHIVING COMPLETED! Data is stored in {out_db}", fg="green")
 
 
 @youte.command()
-@click.argument("input", type=click.Path())
-@click.option("-o", "--output", type=click.Path(), help="Name of CSV output file")
+@click.argument("input", type=click.Path(allow_dash=True))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(),
+    help="Name of CSV output file, or Parquet file if it ends with .parquet",
+)
 @click.option(
     "-t",
     "--type",
@@ -1041,58 +1356,351 @@ def full_archive(
 @click.option(
     "--encoding", default="utf-8-sig", help="Encoding for CSV", show_default=True
 )
+@click.option(
+    "--validation",
+    type=click.Choice(["strict", "trusted", "sampled"]),
+    default="strict",
+    show_default=True,
+    help="Validate all items, none (faster, for data collected by youte) "
+    "or 1 in 1000 items",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of processes parsing a JSONL input, 0 for one per CPU",
+)
+@partition_options
 @click_log.simple_verbosity_option(logger, "--verbosity")
 def parse(
     input: str | Path,
     output: str | Path,
     type_: Literal["auto", "comment", "video", "channel", "search"],
     encoding: str,
+    validation: parser.Validation,
+    jobs: int,
+    partition_by: str | None,
+    max_file_size: int,
 ):
-    """Parse raw output JSON from youte to CSV format.
+    """Parse raw output JSON from youte to CSV or Parquet format.
 
-    INPUT: Input JSON file. Have to be JSON, not JSONL.
+    INPUT: Input JSON or JSONL file, which can be compressed with gzip (.gz) or
+    zstd (.zst), or - to read from standard input.
 
-    This function automatically detects YouTube resource type in the JSON and
-    assumes all items in the JSON are of the same type.
+    This function automatically detects YouTube resource type in the first page of
+    the input and assumes all items in it are of the same type. Pages are read and
+    rows are written one at a time, so files of any size can be parsed. Uncompressed
+    JSONL files are split into chunks parsed by --jobs processes.
+
+    With --partition-by, --output is a directory of partitions holding CSV files, or
+    Parquet files if its name ends with .parquet.
     """
-    parsed: None | Resources = None
-    with open(input) as f:
+    kind = None if type_ == "auto" else type_
+    to_parquet = str(output).endswith(".parquet")
+    if jobs != 1 and str(input).endswith(".jsonl") and not partition_by:
         try:
-            raw = json.loads(f.read())
-        except JSONDecodeError:
-            logger.error("Invalid JSON. Is it a JSON file?")
-            raise click.Abort()
+            if to_parquet:
+                records = parse_file(
+                    input, kind=kind, jobs=jobs or None, validation=validation
+                )
+                rows = write_parquet(records, output, kind=kind)
+            else:
+                rows = parse_file_to_csv(
+                    input,
+                    output,
+                    kind=kind,
+                    jobs=jobs or None,
+                    validation=validation,
+                    encoding=encoding,
+                )
+        except (ValueError, JSONDecodeError) as e:
+            raise click.ClickException(f"There was error parsing data: {e}")
+        except ImportError as e:
+            raise click.ClickException(str(e))
+        logger.info(f"{rows} rows written to {output}")
+        return
+    if jobs != 1:
+        logger.warning(
+            "--jobs is ignored: only uncompressed JSONL is parsed in parallel, "
+            "without --partition-by"
+        )
+
+    pages = read_pages(input)
+    try:
+        first = next(pages, None)
+    except JSONDecodeError:
+        logger.error("Invalid JSON. Is it a JSON or JSONL file?")
+        raise click.Abort()
+    if first is None:
+        raise click.ClickException(f"No data in {input}")
 
     if type_ == "auto":
-        type_, actual_type = _return_ytb_type(raw)  # type: ignore
+        detected = _return_ytb_type(first)
+        if detected is None:
+            raise click.ClickException(f"Cannot parse '{first.get('kind')}' objects.")
+        type_, actual_type = detected
         logger.info(
             f"Resource type '{type_}' detected for '{actual_type}' objects in JSON."
         )
 
-    if type_ == "search":
-        parsed = parser.parse_searches(raw)
-    elif type_ == "video":
-        parsed = parser.parse_videos(raw)
-    elif type_ == "comment":
-        parsed = parser.parse_comments(raw)
-    elif type_ == "channel":
-        parsed = parser.parse_channels(raw)
-
-    if parsed:
-        parsed.to_csv(output, encoding=encoding)
-    else:
+    iter_parse: Callable[..., Iterator[YouteClass]] | None = {
+        "search": parser.iter_searches,
+        "video": parser.iter_videos,
+        "comment": parser.iter_comments,
+        "channel": parser.iter_channels,
+    }.get(type_)
+
+    if not iter_parse:
         raise click.ClickException("There was error parsing data.")
+    try:
+        if partition_by:
+            with _partitioned(
+                output,
+                type_,
+                partition_by,
+                "parquet" if to_parquet else "csv",
+                max_file_size,
+                encoding=encoding,
+                validation=validation,
+            ) as writer:
+                for page in itertools.chain([first], pages):
+                    writer.write(page)
+        elif to_parquet:
+            with ParquetWriter(output, type_, validation=validation) as writer:
+                for page in itertools.chain([first], pages):
+                    writer.write(page)
+        else:
+            write_csv(
+                iter_parse(itertools.chain([first], pages), validation=validation),
+                output,
+                encoding=encoding,
+            )
+    except JSONDecodeError as e:
+        raise click.ClickException(f"Invalid JSON in {input}: {e}")
+    except ImportError as e:
+        raise click.ClickException(str(e))
+
+
+@youte.group()
+def queue():
+    """
+    Share a collection between several machines
+
+    Run `youte videos`, `youte comments --by-video-id`, `youte replies` or
+    `youte full-archive` with the same --queue file on each machine, e.g. on a shared
+    drive. The IDs are split into units that each worker leases from the queue. Units
+    held by a worker that stops responding are given to other workers.
 
+    Each worker writes what it collects to its own --outfile (always JSONL) or
+    --out-db. These shards can be merged with `youte queue merge`.
+    """
 
-def _return_ytb_type(obj: list[dict]) -> tuple | None:
-    ACCEPTED_TYPES = ("search", "comment", "video", "channel")
-    kind = obj[0]["kind"]
 
-    for k in ACCEPTED_TYPES:
-        if k in kind:
-            return (k, kind)
+@queue.command()
+@click.argument("queue_path", type=click.Path(exists=True))
+def status(queue_path: str) -> None:
+    """Show the number of units in each state"""
+    counts = WorkQueue(queue_path).counts()
+    if not counts:
+        click.echo("Queue is empty.")
+    for kind, states in counts.items():
+        click.echo(
+            f"{kind}: "
+            + ", ".join(f"{count} {state}" for state, count in states.items())
+        )
 
-    return None
+
+@queue.command()
+@click.argument("output", type=click.Path(), callback=_check_file_overwrite)
+@click.argument("shards", nargs=-1, required=True, type=click.Path(exists=True))
+def merge(output: Path, shards: tuple[str]) -> None:
+    """Merge shards written by workers into OUTPUT
+
+    SQLite shards from `youte full-archive` are merged into a database if OUTPUT ends
+    with .db. Other shards are concatenated into a JSONL file.
+    """
+    merge_shards(shards, output)
+    click.secho(f"{len(shards)} shards merged into {output}", fg="green")
+
+
+def _work_queue(
+    queue: WorkQueue,
+    yob: Youte,
+    worker_id: str,
+    outfile: Path,
+    output_format: Literal["json", "jsonl"] = "jsonl",
+    flush: FlushPolicy = "page",
+    follow: Sequence[str] = (),
+    include_meta: bool = True,
+    tidy_to: Path | None = None,
+    partition_by: str | None = None,
+) -> None:
+    ctx = click.get_current_context(silent=True)
+    explicit = (
+        ctx is None
+        or ctx.get_parameter_source("output_format") != ParameterSource.DEFAULT
+    )
+    if output_format == "json" and explicit:
+        logger.warning(
+            "--output-format json is ignored with --queue, pages are added to "
+            f"{outfile} as JSONL"
+        )
+    if partition_by:
+        logger.warning("--partition-by is ignored with --queue")
+    if tidy_to:
+        logger.warning(
+            "--tidy-to is ignored with --queue. Merge shards with `youte queue merge` "
+            "and tidy them with `youte parse`."
+        )
+
+    with RawWriter(outfile, "jsonl", append=True, flush=flush) as raw:
+
+        def sink(unit, pages):
+            for page in pages:
+                raw.write(page)
+
+        done = run_worker(
+            queue, yob, worker_id, sink=sink, follow=follow, include_meta=include_meta
+        )
+    click.secho(
+        f"{done} units collected by {worker_id} into {outfile}",
+        fg="green",
+        err=str(outfile) == "-",
+    )
+
+
+def _tidy_writer(
+    tidy_to: Path | None,
+    kind: Literal["search", "video", "channel", "comment"],
+    format_: Literal["json", "jsonl", "csv", "parquet"],
+    encoding: str,
+    pretty: bool = False,
+    partition_by: str | None = None,
+    max_file_size: int = 256,
+) -> ContextManager[TidyWriter | PartitionedWriter | None]:
+    """Open --tidy-to, if given"""
+    if not tidy_to:
+        return nullcontext()
+    if str(tidy_to).endswith(".parquet"):
+        format_ = "parquet"
+    if partition_by:
+        return _partitioned(
+            tidy_to,
+            kind,
+            partition_by,
+            format_,
+            max_file_size,
+            encoding=encoding,
+            pretty=pretty,
+        )
+    return TidyWriter(tidy_to, kind, format_, encoding=encoding, pretty=pretty)
+
+
+def _raw_writer(
+    outfile: Path,
+    kind: Literal["search", "video", "channel", "comment"],
+    output_format: Literal["json", "jsonl"],
+    pretty: bool,
+    flush: FlushPolicy,
+    partition_by: str | None,
+    max_file_size: int,
+) -> ContextManager[RawWriter | PartitionedWriter]:
+    """Open --outfile, or a directory of partitions if --partition-by is given"""
+    if str(outfile) == "-":
+        if partition_by:
+            raise click.BadParameter(
+                "cannot be used when writing to standard output",
+                param_hint="'--partition-by'",
+            )
+        # a JSON array would only be complete once collection ends
+        return RawWriter("-", "jsonl", flush=flush)
+    if partition_by:
+        return _partitioned(
+            outfile, kind, partition_by, "raw", max_file_size, flush=flush
+        )
+    return RawWriter(outfile, output_format, pretty=pretty, flush=flush)
+
+
+def _partitioned(
+    directory: Path,
+    kind: Literal["search", "video", "channel", "comment"],
+    partition_by: str,
+    file_format: PartitionFormat,
+    max_file_size: int,
+    **kwargs,
+) -> PartitionedWriter:
+    try:
+        return PartitionedWriter(
+            directory,
+            kind,
+            partition_by,
+            file_format,
+            max_file_size=max_file_size * 1024 * 1024,
+            **kwargs,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--partition-by'")
+
+
+def _collect(
+    yob: Youte,
+    pages: Iterable[dict],
+    writer: TidyWriter | PartitionedWriter | None,
+    raw: RawWriter | PartitionedWriter,
+) -> None:
+    """Collect pages of results, writing and tidying each page as soon as it is
+    fetched"""
+    iterator = iter(pages)
+    while True:
+        with _stage(yob, "collect"):
+            page = next(iterator, None)
+        if page is None:
+            return
+        with _stage(yob, "write"):
+            try:
+                raw.write(page)
+            except BrokenPipeError:
+                # the program reading --outfile - has exited, e.g. `| head`
+                logger.debug("Standard output was closed, stopping collection")
+                sys.exit(0)
+        if writer:
+            with _stage(yob, "tidy"):
+                writer.write(page)
+
+
+def _note_threads_with_replies(
+    pages: Iterable[dict], thread_videos: dict[str, str | None]
+) -> Iterator[dict]:
+    """Pass pages of comment threads through, adding the IDs of threads with replies
+    to `thread_videos`, with the ID of the video they are on"""
+    for page in pages:
+        thread_videos.update(
+            (comment.id, comment.video_id)
+            for comment in parser.iter_comments([page], validation="trusted")
+            if comment.total_reply_count
+        )
+        yield page
+
+
+def _fill_reply_videos(
+    pages: Iterable[dict], thread_videos: dict[str, str | None]
+) -> Iterator[dict]:
+    """Pass pages of replies through, setting the videoId of each reply to that of
+    its thread in `thread_videos`"""
+    for page in pages:
+        for item in page.get("items", []):
+            snippet = item.get("snippet", {})
+            video_id = thread_videos.get(snippet.get("parentId"))
+            if video_id and not snippet.get("videoId"):
+                snippet["videoId"] = video_id
+        yield page
+
+
+def _return_ytb_type(page: dict) -> tuple | None:
+    type_ = parser.detect_kind(page)
+    return (type_, page["kind"]) if type_ else None
 
 
 @youte.group()
@@ -1224,11 +1832,51 @@ def _read_ids(
         elif isinstance(string, str):
             ids = string.split(",")
     if file:
-        with open(file, mode="r") as f:
+        with open_file(file) as f:
             ids = [row.rstrip() for row in f.readlines()]
     return ids
 
 
+def _get_youte(
+    key: str | None = None,
+    name: str | None = None,
+    record: str | None = None,
+    replay: str | None = None,
+    metrics_file: str | None = None,
+    metrics_interval: float = 0,
+) -> Youte:
+    if record and replay:
+        raise click.BadOptionUsage(
+            option_name="--replay", message="Use only one of --record and --replay"
+        )
+
+    transport: Transport | None = None
+    if replay:
+        transport = ReplayTransport(replay)
+        api_key = key if key else "replay"
+    else:
+        api_key = key if key else _get_api_key(name=name)
+    if record:
+        transport = RecordTransport(record)
+
+    metrics: Metrics | None = None
+    if metrics_file:
+        metrics = Metrics()
+        reporter = MetricsReporter(metrics, metrics_file, interval=metrics_interval)
+        # written when the command exits, including on errors such as quota exceeded
+        click.get_current_context().call_on_close(reporter.stop)
+        reporter.start()
+
+    return Youte(
+        api_key=api_key, transport=transport, metrics=metrics, progress=LogProgress()
+    )
+
+
+def _stage(yob: Youte, name: str) -> ContextManager:
+    """Time a stage of a command if metrics are collected"""
+    return yob.metrics.stage(name) if yob.metrics else nullcontext()
+
+
 def _get_api_key(name=None, filename="config"):
     """Get API key from config file.
     If no name is given, use default API key
@@ -1241,7 +1889,7 @@ def _get_api_key(name=None, filename="config"):
         try:
             api_key = config_obj[name]["key"]
         except KeyError:
-            click.secho("ERROR", fg="red", bold=True)
+            click.secho("ERROR", fg="red", bold=True, err=True)
             click.secho(
                 "No API key found for %s. Did you use a different name?\n"
                 "Try:\n"
@@ -1250,6 +1898,7 @@ def _get_api_key(name=None, filename="config"):
                 "or `youte config add-key` to add a new API key" % name,
                 fg="red",
                 bold=True,
+                err=True,
             )
             sys.exit(1)
     else:
@@ -1262,6 +1911,7 @@ def _get_api_key(name=None, filename="config"):
                 "No API key name was specified, and you haven't got a default API key.",
                 fg="red",
                 bold=True,
+                err=True,
             )
             sys.exit(1)
         else:
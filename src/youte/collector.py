@@ -1,26 +1,62 @@
 from __future__ import annotations
 
 import logging
-import random
+import time
 import warnings
 from datetime import datetime, timedelta
-from typing import Iterator, Literal, Optional, Sequence
+from typing import Callable, Iterator, Literal, Optional, Sequence
 
 import requests
 from dateutil import tz
 
 from youte._typing import APIResponse, SearchOrder
 from youte.exceptions import APIError, CommentsDisabled, InvalidRequest, MaxQuotaReached
+from youte.metrics import Metrics
+from youte.progress import Progress, ProgressTracker
+from youte.transport import HTTPTransport, Transport
 from youte.utilities import create_utc_datetime_string
 from youte.version import user_agent, version
 
 logger = logging.getLogger(__name__)
 
+API_URL = "https://www.googleapis.com/youtube/v3"
+
+# Responses to retry, with exponential backoff starting from _BACKOFF seconds
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_MAX_RETRIES = 5
+_BACKOFF = 1.0
+
+_default_transport = HTTPTransport()
+
 
 class Youte:
-    def __init__(self, api_key: str):
-        """Requires an API key to instantiate."""
+    def __init__(
+        self,
+        api_key: str,
+        transport: Optional[Transport] = None,
+        base_url: str = API_URL,
+        metrics: Optional[Metrics] = None,
+        progress: Optional[Callable[[Progress], None]] = None,
+    ):
+        """Requires an API key to instantiate.
+
+        Args:
+            api_key (str): YouTube Data API key.
+            transport (Transport, optional): How requests are sent to the API.
+                Defaults to HTTPTransport. Pass a RecordTransport or ReplayTransport
+                from youte.transport to record responses or replay them offline.
+            base_url (str): Root URL of the API. Change it to use a server mimicking
+                the API, such as youte.stub.StubServer.
+            metrics (Metrics, optional): Record requests, latency, retries and quota
+                used in a youte.metrics.Metrics.
+            progress (callable, optional): Called with a youte.progress.Progress,
+                giving throughput and estimated time left, after every page collected.
+        """
         self.api_key: str = api_key
+        self.transport: Transport = transport if transport else HTTPTransport()
+        self.base_url: str = base_url.rstrip("/")
+        self.metrics: Optional[Metrics] = metrics
+        self.progress: Optional[Callable[[Progress], None]] = progress
 
     def search(
         self,
@@ -113,7 +149,7 @@ class Youte:
             Dict mappings containing API response.
         """
 
-        url: str = r"https://www.googleapis.com/youtube/v3/search"
+        url: str = f"{self.base_url}/search"
         params: dict = {
             "part": "snippet",
             "maxResults": max_result,
@@ -138,13 +174,23 @@ class Youte:
             "regionCode": region,
         }
         logger.debug(f"Search query: {params}")
+        tracker = self._track(
+            "search",
+            "pages",
+            items_cap=max_result * max_pages_retrieved if max_pages_retrieved else None,
+            total_from_page_info=True,
+        )
         yield from _paginate_results(
             url=url,
+            transport=self.transport,
+            metrics=self.metrics,
+            progress=tracker,
             max_pages_retrieved=max_pages_retrieved,
             include_meta=include_meta,
             meta=kwargs,
             **params,
         )
+        tracker.finish()
 
     def get_video_metadata(
         self,
@@ -176,7 +222,7 @@ class Youte:
         Raises:
             TypeError: If the value passed to ids is not a list, a TypeError will be raised.
         """
-        url: str = r"https://www.googleapis.com/youtube/v3/videos"
+        url: str = f"{self.base_url}/videos"
         if part is None:
             part = [
                 "snippet",
@@ -197,26 +243,24 @@ class Youte:
         if not isinstance(ids, (list, tuple)):
             raise TypeError(f"ids must be a list or tuple, got type {type(ids)}")
 
-        ids: list[str] = list(set(ids))
+        batches: list[list[str]] = _batch(ids)
+        tracker = self._track("videos", "batches", units_total=len(batches))
 
-        total_batches: int = int(len(ids) / 50)
-
-        while ids:
-            if len(ids) <= 50:
-                ids_string = ",".join(ids)
-                ids = []
-            else:
-                batch = random.sample(ids, k=50)
-                ids_string = ",".join(batch)
-                for elm in batch:
-                    ids.remove(elm)
-            params["id"] = ids_string
-            logger.info(f"Retrieving video metadata: {total_batches} batches left")
+        for i, batch in enumerate(batches):
+            params["id"] = ",".join(batch)
+            logger.info(f"Retrieving video metadata: {len(batches) - i} batches left")
             logger.debug(f"Retrieving metadata for videos: {params['id']}")
-            total_batches -= 1
             yield from _paginate_results(
-                url=url, include_meta=include_meta, meta=kwargs, **params
+                url=url,
+                transport=self.transport,
+                metrics=self.metrics,
+                progress=tracker,
+                include_meta=include_meta,
+                meta=kwargs,
+                **params,
             )
+            tracker.unit_done()
+        tracker.finish()
 
     def get_channel_metadata(
         self,
@@ -262,7 +306,7 @@ class Youte:
         if handles and not isinstance(handles, (list, tuple)):
             raise TypeError(f"handles must be a list, got type {type(handles)}")
 
-        url: str = r"https://www.googleapis.com/youtube/v3/channels"
+        url: str = f"{self.base_url}/channels"
 
         if part is None:
             part = [
@@ -280,29 +324,30 @@ class Youte:
             "key": self.api_key,
         }
 
+        batches: list[list[str]] = _batch(ids) if ids else []
+        tracker = self._track(
+            "channels",
+            "requests",
+            units_total=len(batches) + (len(handles) if handles else 0),
+        )
+
         if ids:
-            total_batches: int = int(len(ids) / 50)  # logging purpose only
-
-            while ids:
-                ids = list(set(ids))
-                if len(ids) <= 50:
-                    ids_string = ",".join(ids)
-                    ids = []
-                else:
-                    batch = random.sample(ids, k=50)
-                    ids_string = ",".join(batch)
-                    for elm in batch:
-                        ids.remove(elm)
-
-                params["id"] = ids_string
+            for i, batch in enumerate(batches):
+                params["id"] = ",".join(batch)
                 logger.info(
-                    f"Retrieving channel metadata: {total_batches} pages remaining"
+                    f"Retrieving channel metadata: {len(batches) - i} pages remaining"
                 )
                 logger.debug(f"Retrieving metadata for channels: {params['id']}")
-                total_batches -= 1
                 yield from _paginate_results(
-                    url=url, include_meta=include_meta, meta=kwargs, **params
+                    url=url,
+                    transport=self.transport,
+                    metrics=self.metrics,
+                    progress=tracker,
+                    include_meta=include_meta,
+                    meta=kwargs,
+                    **params,
                 )
+                tracker.unit_done()
 
         if handles:
             params.pop("id", None)
@@ -317,8 +362,17 @@ class Youte:
                 logger.debug(f"Query {url}: {params}")
                 i += 1
                 yield from _paginate_results(
-                    url=url, include_meta=include_meta, meta=kwargs, **params
+                    url=url,
+                    transport=self.transport,
+                    metrics=self.metrics,
+                    progress=tracker,
+                    include_meta=include_meta,
+                    meta=kwargs,
+                    **params,
                 )
+                tracker.unit_done()
+
+        tracker.finish()
 
     def get_comment_threads(
         self,
@@ -387,7 +441,7 @@ class Youte:
                 "video_ids, related_channel_ids, comment_ids"
             )
 
-        url: str = r"https://www.googleapis.com/youtube/v3/commentThreads"
+        url: str = f"{self.base_url}/commentThreads"
         params: dict[str, str | int] = {
             "part": "snippet",
             "textFormat": text_format,
@@ -401,6 +455,9 @@ class Youte:
             params["maxResults"] = max_results
             if search_terms:
                 params["searchTerms"] = search_terms
+            tracker = self._track(
+                "commentThreads", "videos", units_total=len(video_ids)
+            )
             for video_id in video_ids:
                 params["videoId"] = video_id
                 logger.info(
@@ -409,14 +466,25 @@ class Youte:
                 logger.debug(f"Query {url}: {params}")
                 i += 1
                 yield from _paginate_results(
-                    url=url, include_meta=include_meta, meta=kwargs, **params
+                    url=url,
+                    transport=self.transport,
+                    metrics=self.metrics,
+                    progress=tracker,
+                    include_meta=include_meta,
+                    meta=kwargs,
+                    **params,
                 )
+                tracker.unit_done()
+            tracker.finish()
 
         if related_channel_ids:
             params["order"] = order
             params["maxResults"] = max_results
             if search_terms:
                 params["searchTerms"] = search_terms
+            tracker = self._track(
+                "commentThreads", "channels", units_total=len(related_channel_ids)
+            )
             for channel_id in related_channel_ids:
                 params["allThreadsRelatedToChannelId"] = channel_id
                 logger.info(
@@ -426,30 +494,36 @@ class Youte:
                 logger.debug(f"Query {url}: {params}")
                 i += 1
                 yield from _paginate_results(
-                    url=url, include_meta=include_meta, meta=kwargs, **params
+                    url=url,
+                    transport=self.transport,
+                    metrics=self.metrics,
+                    progress=tracker,
+                    include_meta=include_meta,
+                    meta=kwargs,
+                    **params,
                 )
+                tracker.unit_done()
+            tracker.finish()
 
         if comment_ids:
-            comment_ids = list(set(comment_ids))
-            total_batches = int(len(comment_ids) / 50)  # logging purpose only
-
-            while comment_ids:
-                if len(comment_ids) <= 50:
-                    ids_string = ",".join(comment_ids)
-                    comment_ids = []
-                else:
-                    batch = random.sample(comment_ids, k=50)
-                    ids_string = ",".join(batch)
-                    for elm in batch:
-                        comment_ids.remove(elm)
-
-                params["id"] = ids_string
-                logger.info(f"Retrieving comments: {total_batches} pages remaining")
+            batches = _batch(comment_ids)
+            tracker = self._track("commentThreads", "batches", units_total=len(batches))
+
+            for i, batch in enumerate(batches):
+                params["id"] = ",".join(batch)
+                logger.info(f"Retrieving comments: {len(batches) - i} pages remaining")
                 logger.debug(f"Retrieving comments: {params['id']}")
-                total_batches -= 1
                 yield from _paginate_results(
-                    url=url, include_meta=include_meta, meta=kwargs, **params
+                    url=url,
+                    transport=self.transport,
+                    metrics=self.metrics,
+                    progress=tracker,
+                    include_meta=include_meta,
+                    meta=kwargs,
+                    **params,
                 )
+                tracker.unit_done()
+            tracker.finish()
 
     def get_thread_replies(
         self,
@@ -481,7 +555,7 @@ class Youte:
         Raises:
             TypeError: If thread_ids is not a list, a TypeError will be raised.
         """
-        url: str = r"https://www.googleapis.com/youtube/v3/comments"
+        url: str = f"{self.base_url}/comments"
         params: dict = {
             "part": "snippet",
             "maxResults": max_results,
@@ -494,7 +568,8 @@ class Youte:
                 f"thread_ids must be a list or tuple, got type {type(thread_ids)}"
             )
 
-        thread_ids = list(set(thread_ids))
+        thread_ids = list(dict.fromkeys(thread_ids))
+        tracker = self._track("comments", "threads", units_total=len(thread_ids))
         i: int = 1  # logging purpose only
         for thread_id in thread_ids:
             params["parentId"] = thread_id
@@ -504,8 +579,16 @@ class Youte:
             logger.debug(f"Query {url}: {params}")
             i += 1
             yield from _paginate_results(
-                url=url, include_meta=include_meta, meta=kwargs, **params
+                url=url,
+                transport=self.transport,
+                metrics=self.metrics,
+                progress=tracker,
+                include_meta=include_meta,
+                meta=kwargs,
+                **params,
             )
+            tracker.unit_done()
+        tracker.finish()
 
     def get_most_popular(
         self,
@@ -537,7 +620,7 @@ class Youte:
         Yields:
             Dict mappings containing API response.
         """
-        url: str = r"https://www.googleapis.com/youtube/v3/videos"
+        url: str = f"{self.base_url}/videos"
         if part is None:
             part = [
                 "snippet",
@@ -558,7 +641,19 @@ class Youte:
         }
         logger.debug(f"Query {url}: {params}")
 
-        yield from _paginate_results(url=url, meta=kwargs, **params)
+        tracker = self._track("videos", "pages")
+        yield from _paginate_results(
+            url=url,
+            transport=self.transport,
+            metrics=self.metrics,
+            progress=tracker,
+            meta=kwargs,
+            **params,
+        )
+        tracker.finish()
+
+    def _track(self, task: str, unit: str, **kwargs) -> ProgressTracker:
+        return ProgressTracker(task, unit, callback=self.progress, **kwargs)
 
 
 def _paginate_results(
@@ -566,34 +661,61 @@ def _paginate_results(
     max_pages_retrieved: Optional[int] = None,
     include_meta: bool = True,
     meta: dict = None,
+    transport: Optional[Transport] = None,
+    metrics: Optional[Metrics] = None,
+    progress: Optional[ProgressTracker] = None,
     **kwargs,
 ) -> Iterator[APIResponse]:
     page: int = 0
+    endpoint = _endpoint(url)
     logger.info(f"Getting page {page + 1}")
 
     try:
-        r = _request(url=url, params=kwargs)
+        r = _request(url=url, params=kwargs, transport=transport, metrics=metrics)
         page += 1
-        r = _request(url=url, params=kwargs)
-        response = _add_meta(r.json()) if include_meta else r.json()
+        data = r.json()
+        if metrics:
+            metrics.observe_page(endpoint, len(data.get("items", [])))
+        if progress:
+            progress.page(data)
+        response = _add_meta(data) if include_meta else data
         yield response
 
-        while "nextPageToken" in r.json():
+        while "nextPageToken" in data:
             if max_pages_retrieved and page >= max_pages_retrieved:
                 logger.info("Max pages reached")
                 break
             else:
                 logger.info(f"Getting page {page + 1}")
-                next_page_token = r.json()["nextPageToken"]
+                next_page_token = data["nextPageToken"]
                 kwargs["pageToken"] = next_page_token
-                r = _request(url=url, params=kwargs)
+                r = _request(
+                    url=url, params=kwargs, transport=transport, metrics=metrics
+                )
                 page += 1
-                response = _add_meta(r.json()) if include_meta else r.json()
+                data = r.json()
+                if metrics:
+                    metrics.observe_page(endpoint, len(data.get("items", [])))
+                if progress:
+                    progress.page(data)
+                response = _add_meta(data) if include_meta else data
                 yield response
     except CommentsDisabled:
         logger.warning("Comments are disabled.")
 
 
+def _endpoint(url: str) -> str:
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _batch(ids: Sequence[str], size: int = 50) -> list[list[str]]:
+    """Split IDs into batches of `size`, dropping duplicates. Batches are always made
+    in the same order so that runs are repeatable.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    return [unique_ids[i : i + size] for i in range(0, len(unique_ids), size)]
+
+
 def _add_meta(response: APIResponse, **kwargs) -> APIResponse:
     default_meta = {
         "version": version,
@@ -610,9 +732,35 @@ def _add_meta(response: APIResponse, **kwargs) -> APIResponse:
     return response
 
 
-def _request(url: str, params: dict[str, str | int]) -> requests.Response:
-    response = requests.get(url, params=params)
-    logger.debug(f"Getting {response.url}: {response.status_code}")
+def _request(
+    url: str,
+    params: dict[str, str | int],
+    transport: Optional[Transport] = None,
+    metrics: Optional[Metrics] = None,
+) -> requests.Response:
+    transport = transport if transport else _default_transport
+
+    for attempt in range(_MAX_RETRIES + 1):
+        start = time.perf_counter()
+        response = transport.get(url, params=params)
+        if metrics:
+            metrics.observe_request(
+                _endpoint(url),
+                response.status_code,
+                time.perf_counter() - start,
+                len(response.content),
+            )
+        logger.debug(f"Getting {response.url}: {response.status_code}")
+        if response.status_code not in _RETRY_STATUSES:
+            break
+        if attempt == _MAX_RETRIES:
+            logger.error(f"Error {response.status_code}: {response.url}")
+            raise APIError(f"Error {response.status_code} after {_MAX_RETRIES} retries")
+        if metrics:
+            metrics.observe_retry(_endpoint(url))
+        delay = _BACKOFF * 2**attempt
+        logger.warning(f"Error {response.status_code}: retrying in {delay} seconds")
+        time.sleep(delay)
 
     if response.status_code in [403, 400, 404]:
         try:
@@ -2,18 +2,72 @@ from __future__ import annotations
 
 import csv
 import json
+import logging
+import operator
+import types
+import typing
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Generic, Optional, TypeVar
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
+# Keys of the metadata youte adds to each page, see youte.collector._add_meta()
+META_KEYS = ("version", "collected_at", "user_agent")
+
 
 class YouteClass(BaseModel):
     class Config:
         orm_mode = True
 
 
+def field_types(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Return the types of the fields of a model in order, by name, without Optional,
+    e.g. {"id": str, "tags": List[str], "meta": dict}.
+
+    Types are read from the annotations of the model rather than from the fields of
+    pydantic, which differ between pydantic 1 and 2.
+    """
+    return {
+        name: _without_optional(type_)
+        for name, type_ in typing.get_type_hints(model).items()
+        if not name.startswith("_") and typing.get_origin(type_) is not ClassVar
+    }
+
+
+def construct(model: Type[BaseModel], values: Dict[str, Any]) -> Any:
+    """Create a model without validation, with model_construct() in pydantic 2 or
+    construct() in pydantic 1."""
+    if hasattr(model, "model_construct"):
+        return model.model_construct(**values)
+    return model.construct(**values)
+
+
+def _without_optional(type_: Any) -> Any:
+    if typing.get_origin(type_) in (Union, getattr(types, "UnionType", Union)):
+        args = [arg for arg in typing.get_args(type_) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return type_
+
+
 @dataclass
 class Resources:
     items: list[YouteClass]
@@ -26,24 +80,259 @@ class Resources:
                 raise TypeError(f"Objected added must be class {self.__class__}")
 
     def to_json(self, filepath: Path | str, pretty: bool = False) -> None:
-        json_array: list = []
-        indent: Optional[int] = 4 if pretty else None
-        for item in self.items:
-            json_array.append(_flatten_json(dict(item)))
-            with open(filepath, mode="w", encoding="utf-8") as f:
-                f.write(
-                    json.dumps(
-                        json_array, default=str, indent=indent, ensure_ascii=False
-                    )
-                )
+        write_json(self.items, filepath, pretty=pretty)
+
+    def to_jsonl(self, filepath: Path | str) -> None:
+        write_jsonl(self.items, filepath)
 
     def to_csv(self, filepath: Path | str, encoding: str = "utf-8-sig") -> None:
-        with open(filepath, "w", newline="", encoding=encoding) as csvfile:
-            fieldnames = _flatten_json(dict(self.items[0])).keys()
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for item in self.items:
-                writer.writerow(_flatten_json(dict(item)))
+        write_csv(self.items, filepath, encoding=encoding)
+
+    def to_parquet(self, filepath: Path | str) -> None:
+        """Write items to a Parquet file. Requires pyarrow."""
+        from youte.parquet import write_parquet
+
+        write_parquet(self, filepath)
+
+
+def write_json(
+    items: Resources | Iterable[YouteClass],
+    filepath: Path | str,
+    pretty: bool = False,
+) -> None:
+    """Write resources to a JSON array, one item at a time, so that items can be
+    consumed lazily, e.g. from youte.parser.iter_videos().
+
+    Args:
+        items: resources to write.
+        filepath: path of the JSON file.
+        pretty: indent the output.
+    """
+    encode = _encoder(pretty)
+    separator = ",\n" if pretty else ", "
+    with open(filepath, mode="w", encoding="utf-8") as f:
+        f.write("[")
+        for i, row in enumerate(_rows(items)):
+            if i:
+                f.write(separator)
+            f.write(encode(row))
+        f.write("]")
+
+
+def write_jsonl(items: Resources | Iterable[YouteClass], filepath: Path | str) -> None:
+    """Write resources to a JSONL file, one item per line, so that items can be
+    consumed lazily, e.g. from youte.parser.iter_videos().
+
+    Args:
+        items: resources to write.
+        filepath: path of the JSONL file.
+    """
+    encode = _encoder(pretty=False)
+    with open(filepath, mode="w", encoding="utf-8") as f:
+        for row in _rows(items):
+            f.write(encode(row))
+            f.write("\n")
+
+
+def write_csv(
+    items: Resources | Iterable[YouteClass],
+    filepath: Path | str,
+    encoding: str = "utf-8-sig",
+) -> None:
+    """Write resources to a CSV file, one item at a time, so that items can be
+    consumed lazily, e.g. from youte.parser.iter_videos(). The header is made of the
+    attributes of the resource and the metadata keys youte writes, plus other keys
+    of the first item's metadata, see Flattener.header_for(). Metadata columns
+    missing from an item are left empty.
+
+    Args:
+        items: resources to write.
+        filepath: path of the CSV file.
+        encoding: encoding of the CSV file.
+    """
+    with open(filepath, "w", newline="", encoding=encoding) as csvfile:
+        writer = csv.writer(csvfile)
+        flattener = None
+        for item in items.items if isinstance(items, Resources) else items:
+            if flattener is None:
+                flattener = Flattener.for_item(item)
+                writer.writerow(flattener.set_header(flattener.header_for(item)))
+            writer.writerow(flattener.row(item))
+
+
+def _rows(items: Resources | Iterable[YouteClass]) -> Iterator[dict[str, Any]]:
+    """Flatten each resource into a row"""
+    flattener = None
+    for item in items.items if isinstance(items, Resources) else items:
+        if flattener is None:
+            flattener = Flattener.for_item(item)
+        yield flattener.flatten(item)
+
+
+def _encoder(pretty: bool) -> Callable[[Any], str]:
+    """Return a function encoding rows to JSON, created once for all rows"""
+    return json.JSONEncoder(
+        default=str, indent=4 if pretty else None, ensure_ascii=False
+    ).encode
+
+
+class Flattener:
+    """Flatten resources of one type into rows, with the dictionaries they hold,
+    i.e. the page metadata, spread into one column per nested key, e.g.
+    meta_version.
+
+    All attributes are read by a single getter created once, and each dictionary is
+    flattened only once however many items share it, as the items of a page share
+    its metadata. Keys left out of rows because they are not in the header are
+    logged once.
+
+    Args:
+        names: attributes of the resources, in the order of the columns.
+        nested: attributes holding dictionaries.
+    """
+
+    def __init__(self, names: Sequence[str], nested: Sequence[str] = ("meta",)):
+        self.names: Tuple[str, ...] = tuple(names)
+        self.nested: List[Tuple[int, str]] = [
+            (i, name) for i, name in enumerate(self.names) if name in nested
+        ]
+        self.header: Optional[Tuple[str, ...]] = None
+        getter = operator.attrgetter(*self.names)
+        self._get: Callable[[Any], tuple] = (
+            getter if len(self.names) > 1 else lambda item: (getter(item),)
+        )
+        self._header_keys: List[Tuple[str, ...]] = []
+        self._dropped: set[str] = set()
+        self._cache: Dict[Tuple[str, int], tuple] = {}
+        # nested values in the order of the header, by attribute and identity
+        self._projected: Dict[Tuple[str, int], tuple] = {}
+
+    @classmethod
+    def for_model(cls, model: Type[YouteClass]) -> Flattener:
+        """Return a flattener of the resources of a model, e.g. youte.resources.Video,
+        or of the records of the model."""
+        fields = field_types(model)
+        return cls(
+            list(fields), [name for name, type_ in fields.items() if type_ is dict]
+        )
+
+    @classmethod
+    def for_item(cls, item: Any) -> Flattener:
+        """Return a flattener of resources of the same type as `item`"""
+        model = type(item) if isinstance(item, BaseModel) else item.model
+        return cls.for_model(model)
+
+    def columns(self, item: Any) -> Tuple[str, ...]:
+        """Return the columns of the row of an item"""
+        values = self._get(item)
+        columns: Tuple[str, ...] = ()
+        start = 0
+        for i, name in self.nested:
+            columns += self.names[start:i] + self._flatten(name, values[i])[1]
+            start = i + 1
+        return columns + self.names[start:]
+
+    def header_for(self, item: Any) -> Tuple[str, ...]:
+        """Return the header of rows of items like `item`.
+
+        The page metadata is spread into a column for each key youte writes
+        (META_KEYS), whichever of them the item has, followed by the other keys of
+        its metadata.
+        """
+        values = self._get(item)
+        return self.header_with({name: values[i] for i, name in self.nested})
+
+    def header_with(self, nested: Dict[str, Any]) -> Tuple[str, ...]:
+        """Return the header of rows whose nested attributes hold the dictionaries
+        in `nested`, e.g. {"meta": page["_youte"]}, see header_for()."""
+        columns: Tuple[str, ...] = ()
+        start = 0
+        for i, name in self.nested:
+            keys = self._flatten(name, nested.get(name))[1]
+            if name == "meta" and keys:
+                known = tuple(f"meta_{key}" for key in META_KEYS)
+                keys = known + tuple(k for k in keys if k not in known)
+            columns += self.names[start:i] + keys
+            start = i + 1
+        return columns + self.names[start:]
+
+    def set_header(self, columns: Sequence[str]) -> Tuple[str, ...]:
+        """Set the columns of the rows returned by row(), e.g. from header_for() of
+        the first item, and return them."""
+        self.header = tuple(columns)
+        self._projected.clear()
+        names = set(self.names)
+        self._header_keys = [
+            tuple(
+                c
+                for c in self.header
+                if c not in names and (c == name or c.startswith(name + "_"))
+            )
+            for _, name in self.nested
+        ]
+        return self.header
+
+    def row(self, item: Any) -> tuple:
+        """Return the values of an item in the order of the header.
+
+        The header is set from the first item if it was not set. Nested keys which
+        are not in the header are left out with a warning, and those missing from
+        the item are None.
+        """
+        if self.header is None:
+            self.set_header(self.header_for(item))
+        values = self._get(item)
+        row: tuple = ()
+        start = 0
+        for n, (i, name) in enumerate(self.nested):
+            value = values[i]
+            entry = self._projected.get((name, id(value)))
+            if entry is None or entry[0] is not value:
+                _, keys, flat = self._flatten(name, value)
+                self._check_dropped(keys)
+                by_key = dict(zip(keys, flat))
+                entry = (value, tuple(by_key.get(k) for k in self._header_keys[n]))
+                if len(self._projected) > 1000:
+                    self._projected.clear()
+                self._projected[(name, id(value))] = entry
+            row += values[start:i] + entry[1]
+            start = i + 1
+        return row + values[start:]
+
+    def flatten(self, item: Any) -> Dict[str, Any]:
+        """Return the flattened attributes of an item as a dictionary, with its own
+        nested keys."""
+        values = self._get(item)
+        row: Dict[str, Any] = {}
+        start = 0
+        for i, name in self.nested:
+            _, keys, flat = self._flatten(name, values[i])
+            row.update(zip(self.names[start:i], values[start:i]))
+            row.update(zip(keys, flat))
+            start = i + 1
+        row.update(zip(self.names[start:], values[start:]))
+        return row
+
+    def _check_dropped(self, keys: Sequence[str]) -> None:
+        """Warn about nested keys which are not in the header, once for each key"""
+        dropped = set(keys).difference(self.header or (), self._dropped)
+        if dropped:
+            self._dropped.update(dropped)
+            logger.warning(
+                f"{', '.join(sorted(dropped))} not in the header, left out of rows"
+            )
+
+    def _flatten(self, name: str, value: Any) -> tuple:
+        """Return (value, columns, values) of a nested attribute, cached by identity"""
+        key = (name, id(value))
+        entry = self._cache.get(key)
+        if entry is None or entry[0] is not value:
+            if len(self._cache) > 1000:
+                self._cache.clear()
+            flat = _flatten_json({name: value})
+            entry = (value, tuple(flat), tuple(flat.values()))
+            self._cache[key] = entry
+        return entry
 
 
 def _flatten_json(obj: dict[str, Any]) -> dict[str, Any]:
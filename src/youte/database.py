@@ -3,12 +3,15 @@ from __future__ import annotations
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Iterable, Iterator, Optional, Type
 
 import sqlalchemy.exc
 from sqlalchemy.engine import Engine, create_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
+from youte import resources, schema
+from youte.common import Resources, YouteClass
+from youte.records import Record
 from youte.resources import Channels, Comments, Searches, Videos
 
 logger = logging.getLogger(__name__)
@@ -149,8 +152,8 @@ def type_check(func) -> Callable:
     """Decorator to type check database populating functions"""
 
     def new_func(engine, data):
-        if not isinstance(data, list):
-            raise TypeError(f"data is type {type(data)}, not list")
+        if isinstance(data, (str, bytes, dict)) or not isinstance(data, Iterable):
+            raise TypeError(f"data is type {type(data)}, not an iterable")
 
         if not isinstance(engine, Engine):
             raise TypeError(f"engine must be Engine, not {type(engine)}")
@@ -160,188 +163,114 @@ def type_check(func) -> Callable:
     return new_func
 
 
+def _items(
+    data: Iterable[Resources | YouteClass | Record],
+) -> Iterator[YouteClass | Record]:
+    """Yield resources from pages of parsed results, or from resources or records
+    themselves"""
+    for each in data:
+        if isinstance(each, Resources):
+            yield from each.items
+        else:
+            yield each
+
+
 @type_check
-def populate_searches(engine: Engine, data: list[Searches]) -> None:
+def populate_searches(
+    engine: Engine, data: Iterable[Searches | resources.Search]
+) -> None:
     """Populate search data into a database.
 
     Args:
         engine: an Engine instance that has been initiated using
             youte.database.set_up_database()
-        data: a list of Searches object
+        data: a list or iterable of Searches objects, or of Search
+            objects such as those yielded by youte.parser.iter_searches(), or of
+            compact SearchRecord objects
 
     Returns
         No value is returned as the function interacts with the database only.
     """
-    with Session(engine) as s:
-        for page in data:
-            for search in page.items:
-                search_data = Search(
-                    id=search.id,
-                    title=search.title,
-                    kind=search.kind,
-                    published_at=search.published_at,
-                    description=search.description,
-                    thumbnail_width=search.thumbnail_width,
-                    thumbnail_height=search.thumbnail_height,
-                    channel_title=search.channel_title,
-                    channel_id=search.channel_id,
-                    live_broadcast_content=search.live_broadcast_content,
-                )
-                try:
-                    s.add(search_data)
-                    s.commit()
-                except sqlalchemy.exc.IntegrityError as e:
-                    logger.warning(f"{search_data.id} - {search_data.title}: {e}")
-                    s.rollback()
+    _populate(engine, data, Search, schema.SEARCH)
 
 
 @type_check
-def populate_videos(engine: Engine, data: list[Videos]) -> None:
+def populate_videos(engine: Engine, data: Iterable[Videos | resources.Video]) -> None:
     """Populate video data into a database.
 
     Args:
         engine: an Engine instance that has been initiated using
             youte.database.set_up_database()
-        data: a list of Videos object
+        data: a list or iterable of Videos objects, or of Video
+            objects such as those yielded by youte.parser.iter_videos(), or of
+            compact VideoRecord objects
 
     Returns
         No value is returned as the function interacts with the database only.
     """
-    with Session(engine) as s:
-        for page in data:
-            for video in page.items:
-                video_data = Video(
-                    id=video.id,
-                    title=video.title,
-                    kind=video.kind,
-                    published_at=video.published_at,
-                    channel_id=video.channel_id,
-                    description=video.description,
-                    thumbnail_width=video.thumbnail_width,
-                    thumbnail_height=video.thumbnail_height,
-                    thumbnail_url=video.thumbnail_url,
-                    channel_title=video.channel_title,
-                    tags=str(video.tags),
-                    category_id=video.category_id,
-                    localized_title=video.localized_title,
-                    localized_description=video.localized_description,
-                    default_language=video.default_language,
-                    default_audio_language=video.default_audio_language,
-                    duration=video.duration,
-                    dimension=video.dimension,
-                    definition=video.definition,
-                    caption=video.caption,
-                    licensed_content=video.licensed_content,
-                    projection=video.projection,
-                    upload_status=video.upload_status,
-                    privacy_status=video.privacy_status,
-                    license=video.license,
-                    embeddable=video.embeddable,
-                    public_stats_viewable=video.public_stats_viewable,
-                    made_for_kids=video.made_for_kids,
-                    view_count=video.view_count,
-                    like_count=video.like_count,
-                    comment_count=video.comment_count,
-                    topic_categories=str(video.topic_categories),
-                    live_streaming_start_actual=video.live_streaming_start_actual,
-                    live_streaming_end_actual=video.live_streaming_end_actual,
-                    live_streaming_start_scheduled=video.live_streaming_start_scheduled,
-                    live_streaming_end_scheduled=video.live_streaming_end_scheduled,
-                    live_streaming_concurrent_viewers=video.live_streaming_concurrent_viewers,
-                )
-                try:
-                    s.add(video_data)
-                    s.commit()
-                except sqlalchemy.exc.IntegrityError as e:
-                    logger.warning(f"{video_data.id} - {video_data.title}: {e}")
-                    s.rollback()
+    _populate(engine, data, Video, schema.VIDEO)
 
 
 @type_check
-def populate_channels(engine: Engine, data: list[Channels]) -> None:
+def populate_channels(
+    engine: Engine, data: Iterable[Channels | resources.Channel]
+) -> None:
     """Populate channel data into a database.
 
     Args:
         engine: an Engine instance that has been initiated using
             youte.database.set_up_database()
-        data: a list of Channels object
+        data: a list or iterable of Channels objects, or of Channel
+            objects such as those yielded by youte.parser.iter_channels(), or of
+            compact ChannelRecord objects
 
     Returns
         No value is returned as the function interacts with the database only.
     """
-    with Session(engine) as s:
-        for page in data:
-            for channel in page.items:
-                channel_data = Channel(
-                    id=channel.id,
-                    kind=channel.kind,
-                    title=channel.title,
-                    description=channel.description,
-                    custom_url=channel.custom_url,
-                    published_at=channel.published_at,
-                    thumbnail_url=channel.thumbnail_url,
-                    thumbnail_height=channel.thumbnail_height,
-                    thumbnail_width=channel.thumbnail_width,
-                    default_language=channel.default_language,
-                    localized_title=channel.localized_title,
-                    localized_description=channel.localized_description,
-                    country=channel.country,
-                    view_count=channel.view_count,
-                    subscriber_count=channel.subscriber_count,
-                    hidden_subscriber_count=channel.hidden_subscriber_count,
-                    video_count=channel.video_count,
-                    topic_categories=str(channel.topic_categories),
-                    privacy_status=channel.privacy_status,
-                    is_linked=channel.is_linked,
-                    made_for_kids=channel.made_for_kids,
-                    branding_keywords=str(channel.branding_keywords),
-                    moderated_comments=channel.moderated_comments,
-                )
-                try:
-                    s.add(channel_data)
-                    s.commit()
-                except sqlalchemy.exc.IntegrityError as e:
-                    logger.warning(f"{channel_data.id} - {channel_data.title}: {e}")
-                    s.rollback()
+    _populate(engine, data, Channel, schema.CHANNEL)
 
 
 @type_check
-def populate_comments(engine: Engine, data: list[Comments]) -> None:
+def populate_comments(
+    engine: Engine, data: Iterable[Comments | resources.Comment]
+) -> None:
     """Populate channel data into a database.
 
     Args:
         engine: an Engine instance that has been initiated using
             youte.database.set_up_database()
-        data: a list of Comments object
+        data: a list or iterable of Comments objects, or of Comment
+            objects such as those yielded by youte.parser.iter_comments(), or of
+            compact CommentRecord objects
 
     Returns
         No value is returned as the function interacts with the database only.
     """
+    _populate(engine, data, Comment, schema.COMMENT)
+
+
+def _populate(
+    engine: Engine,
+    data: Iterable[Resources | YouteClass | Record],
+    table: Type[Base],
+    schema_: schema.Schema,
+) -> None:
+    """Insert resources into `table`, one row at a time, with the columns stored
+    according to `schema_`"""
+    columns = [(f.name, f.to_db) for f in schema_.stored]
     with Session(engine) as s:
-        for page in data:
-            for cmt in page.items:
-                cmt_data = Comment(
-                    id=cmt.id,
-                    video_id=cmt.video_id,
-                    parent_id=cmt.parent_id,
-                    can_reply=cmt.can_reply,
-                    total_reply_count=cmt.total_reply_count,
-                    is_public=cmt.is_public,
-                    author_display_name=cmt.author_display_name,
-                    author_profile_image_url=cmt.author_profile_image_url,
-                    author_channel_url=cmt.author_channel_url,
-                    author_channel_id=cmt.author_channel_id,
-                    text_display=cmt.text_display,
-                    text_original=cmt.text_original,
-                    can_rate=cmt.can_rate,
-                    viewer_rating=cmt.viewer_rating,
-                    like_count=cmt.like_count,
-                    published_at=cmt.published_at,
-                    updated_at=cmt.updated_at,
+        for item in _items(data):
+            values = {}
+            for name, to_db in columns:
+                value = getattr(item, name)
+                values[name] = to_db(value) if to_db else value
+            row = table(**values)
+            try:
+                s.add(row)
+                s.commit()
+            except sqlalchemy.exc.IntegrityError as e:
+                title = getattr(row, "title", None)
+                logger.warning(
+                    f"{row.id} - {title}: {e}" if title else f"{row.id}: {e}"
                 )
-                try:
-                    s.add(cmt_data)
-                    s.commit()
-                except sqlalchemy.exc.IntegrityError as e:
-                    logger.warning(f"{cmt_data.id}: {e}")
-                    s.rollback()
+                s.rollback()
@@ -28,3 +28,7 @@ class CommentsDisabled(Exception):
 
 class MaxQuotaReached(APIError):
     pass
+
+
+class RecordingNotFound(Exception):
+    pass
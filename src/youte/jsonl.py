@@ -0,0 +1,128 @@
+"""Memory-mapped access to raw JSONL files written by youte.
+
+Pages are decoded straight from a memory map of the file, one line at a time, so
+only the page being decoded is held in memory. The file can be split into byte
+ranges of whole lines for parallel workers, and pages can be counted and read by
+position from an index of line offsets, built in memory when first needed.
+
+    from youte.jsonl import JsonlFile
+
+    with JsonlFile("comments.jsonl") as pages:
+        print(pages.count(), pages[-1]["nextPageToken"])
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+from array import array
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlFile:
+    """A JSONL file of raw API responses, read through a memory map.
+
+    Blank lines are skipped. The index of line offsets is built the first time it
+    is needed, to count pages or to get a page by position. Iterating over the file
+    or reading ranges of it does not need the index.
+
+    Args:
+        filepath: path of the JSONL file.
+    """
+
+    def __init__(self, filepath: str | Path):
+        self.path = Path(filepath)
+        self._index: Optional[array] = None
+        with open(self.path, "rb") as f:
+            # empty files cannot be mapped
+            self._map: bytes | mmap.mmap = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if os.fstat(f.fileno()).st_size
+                else b""
+            )
+
+    def __enter__(self) -> JsonlFile:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+    @property
+    def index(self) -> array:
+        """Start and end offsets of each page, as a flat array of integers"""
+        if self._index is None:
+            self._index = array("q")
+            for start, end in self._lines(0, len(self._map)):
+                self._index.append(start)
+                self._index.append(end)
+        return self._index
+
+    def count(self) -> int:
+        """Return the number of pages in the file"""
+        return len(self.index) // 2
+
+    def __getitem__(self, i: int) -> dict:
+        count = self.count()
+        if i < 0:
+            i += count
+        if not 0 <= i < count:
+            raise IndexError(f"page {i} out of range")
+        return json.loads(self._map[self.index[2 * i] : self.index[2 * i + 1]])
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.read(0, len(self._map))
+
+    def read(self, start: int, end: int) -> Iterator[dict]:
+        """Decode the pages on the lines between two byte offsets.
+
+        Args:
+            start: offset of the first line, e.g. from ranges().
+            end: offset after the last line.
+
+        Yields:
+            Each page as a dictionary.
+        """
+        data = self._map
+        for line_start, line_end in self._lines(start, end):
+            yield json.loads(data[line_start:line_end])
+
+    def ranges(self, chunk_size: int) -> List[Tuple[int, int]]:
+        """Split the file into chunks of whole lines of about `chunk_size` bytes.
+
+        Args:
+            chunk_size: approximate size of chunks, in bytes.
+
+        Returns:
+            A list of (start, end) byte offsets, each chunk ending after a new line or
+            at the end of the file.
+        """
+        data = self._map
+        size = len(data)
+        offsets = [0]
+        while offsets[-1] < size:
+            newline = data.find(b"\n", min(offsets[-1] + chunk_size, size) - 1)
+            offsets.append(size if newline == -1 else newline + 1)
+        return list(zip(offsets, offsets[1:]))
+
+    def _lines(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Yield the offsets of the non-blank lines between two offsets"""
+        data = self._map
+        find = data.find
+        while start < end:
+            newline = find(b"\n", start, end)
+            line_end = end if newline == -1 else newline
+            if (
+                data[start : start + 1] not in b" \t\r\n"
+                or data[start:line_end].strip()
+            ):
+                yield start, line_end
+            start = line_end + 1
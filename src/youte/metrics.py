@@ -0,0 +1,293 @@
+"""Runtime metrics for collection runs: requests, latency, bytes, retries, quota and
+time spent in each stage, exported as a Prometheus text file or a JSON snapshot.
+
+    metrics = Metrics()
+    yob = Youte(api_key=API_KEY, metrics=metrics)
+    with MetricsReporter(metrics, "youte.prom", interval=60):
+        for page in yob.search("aukus"):
+            ...
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Quota cost of one request to each endpoint
+QUOTA_COSTS = {
+    "search": 100,
+    "videos": 1,
+    "channels": 1,
+    "commentThreads": 1,
+    "comments": 1,
+}
+
+# Upper bounds, in seconds, of request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Count observations falling into each of a set of buckets."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Return (upper bound, count of observations <= bound) pairs, ending with
+        "+Inf".
+        """
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == float("inf") else str(bound), total))
+        return pairs
+
+
+class _Endpoint:
+    def __init__(self):
+        self.requests: dict[int, int] = defaultdict(int)
+        self.latency = Histogram()
+        self.bytes = 0
+        self.retries = 0
+        self.quota_units = 0
+        self.pages = 0
+        self.items = 0
+
+
+class Metrics:
+    """Thread-safe counters describing a collection run.
+
+    Pass an instance to Youte(metrics=...) to record every request it makes, and use
+    stage() to time other parts of a run such as parsing and writing.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now(tz=timezone.utc)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, _Endpoint] = defaultdict(_Endpoint)
+        self._stages: dict[str, float] = defaultdict(float)
+
+    def observe_request(
+        self, endpoint: str, status: int, seconds: float, size: int
+    ) -> None:
+        """Record one response received from endpoint. Quota units are counted for
+        successful requests.
+        """
+        with self._lock:
+            stats = self._endpoints[endpoint]
+            stats.requests[status] += 1
+            stats.latency.observe(seconds)
+            stats.bytes += size
+            if 200 <= status < 300:
+                stats.quota_units += QUOTA_COSTS.get(endpoint, 1)
+
+    def observe_retry(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoints[endpoint].retries += 1
+
+    def observe_page(self, endpoint: str, items: int) -> None:
+        with self._lock:
+            stats = self._endpoints[endpoint]
+            stats.pages += 1
+            stats.items += items
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Add the time spent in the with block to the named stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stages[name] += elapsed
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def snapshot(self) -> dict:
+        """Return the current state of all metrics as a JSON-serialisable dict."""
+        with self._lock:
+            elapsed = self.elapsed
+            endpoints = {
+                name: {
+                    "requests": {str(k): v for k, v in sorted(stats.requests.items())},
+                    "latency_seconds": {
+                        "count": stats.latency.count,
+                        "sum": round(stats.latency.sum, 6),
+                        "buckets": dict(stats.latency.cumulative()),
+                    },
+                    "bytes_received": stats.bytes,
+                    "retries": stats.retries,
+                    "quota_units": stats.quota_units,
+                    "pages": stats.pages,
+                    "items": stats.items,
+                }
+                for name, stats in sorted(self._endpoints.items())
+            }
+            stages = {k: round(v, 6) for k, v in sorted(self._stages.items())}
+
+        pages = sum(e["pages"] for e in endpoints.values())
+        return {
+            "started_at": self.started_at.isoformat(),
+            "elapsed_seconds": round(elapsed, 6),
+            "pages": pages,
+            "pages_per_second": round(pages / elapsed, 3) if elapsed else 0.0,
+            "quota_units": sum(e["quota_units"] for e in endpoints.values()),
+            "endpoints": endpoints,
+            "stage_seconds": stages,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Return metrics in Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        endpoints = snapshot["endpoints"]
+        lines: list[str] = []
+
+        def metric(name: str, type_: str, help_: str, samples: list) -> None:
+            lines.append(f"# HELP youte_{name} {help_}")
+            lines.append(f"# TYPE youte_{name} {type_}")
+            for suffix, labels, value in samples:
+                label = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                label = f"{{{label}}}" if label else ""
+                lines.append(f"youte_{name}{suffix}{label} {value}")
+
+        metric(
+            "requests_total",
+            "counter",
+            "Responses received from YouTube API by endpoint and HTTP status.",
+            [
+                ("", {"endpoint": name, "status": status}, count)
+                for name, e in endpoints.items()
+                for status, count in e["requests"].items()
+            ],
+        )
+
+        samples = []
+        for name, e in endpoints.items():
+            latency = e["latency_seconds"]
+            for bound, count in latency["buckets"].items():
+                samples.append(("_bucket", {"endpoint": name, "le": bound}, count))
+            samples.append(("_sum", {"endpoint": name}, latency["sum"]))
+            samples.append(("_count", {"endpoint": name}, latency["count"]))
+        metric(
+            "request_duration_seconds",
+            "histogram",
+            "Time taken by requests to YouTube API.",
+            samples,
+        )
+
+        for field, help_ in (
+            ("bytes_received", "Bytes of response bodies received."),
+            ("retries", "Requests retried after a server error or rate limit."),
+            ("quota_units", "Quota units used by successful requests."),
+            ("pages", "Result pages collected."),
+            ("items", "Resources collected."),
+        ):
+            metric(
+                f"{field}_total",
+                "counter",
+                help_,
+                [("", {"endpoint": name}, e[field]) for name, e in endpoints.items()],
+            )
+
+        metric(
+            "stage_seconds_total",
+            "counter",
+            "Time spent in each stage of a run.",
+            [("", {"stage": k}, v) for k, v in snapshot["stage_seconds"].items()],
+        )
+        metric(
+            "elapsed_seconds",
+            "gauge",
+            "Time since the run started.",
+            [("", {}, snapshot["elapsed_seconds"])],
+        )
+        return "\n".join(lines) + "\n"
+
+    def write(self, filepath: str | Path) -> None:
+        """Write metrics to filepath, as JSON if it ends with .json and in Prometheus
+        text format otherwise. The file is replaced atomically, so it can be read by
+        the node_exporter textfile collector while a run is going.
+        """
+        filepath = Path(filepath)
+        text = self.to_json() if filepath.suffix == ".json" else self.to_prometheus()
+        tmp = filepath.with_name(f".{filepath.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, filepath)
+
+
+class MetricsReporter:
+    """Write metrics to a file every `interval` seconds from a background thread,
+    and once more when stopped.
+
+    Args:
+        metrics: Metrics to report.
+        filepath: file to write, see Metrics.write().
+        interval: seconds between writes. If None or 0, only write when stopped.
+    """
+
+    def __init__(
+        self, metrics: Metrics, filepath: str | Path, interval: Optional[float] = None
+    ):
+        self.metrics = metrics
+        self.filepath = filepath
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> MetricsReporter:
+        if self.interval:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.metrics.write(self.filepath)
+        logger.info(f"Metrics written to {self.filepath}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.metrics.write(self.filepath)
+            except OSError as e:
+                logger.warning(f"Could not write metrics: {e}")
+
+    def __enter__(self) -> MetricsReporter:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
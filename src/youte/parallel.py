@@ -0,0 +1,294 @@
+"""Parse large raw JSONL files on several cores.
+
+A file is split into chunks of whole lines by byte offset. Each chunk is parsed by
+a process of a pool, which returns compact records, CSV text or database rows, and
+results are collected in the order of the file, or as soon as they are ready.
+
+    from youte.parallel import parse_file_to_csv
+
+    parse_file_to_csv("comments.jsonl", "comments.csv", jobs=8)
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple
+
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+from youte import database, parser, schema
+from youte.common import Flattener
+from youte.jsonl import JsonlFile
+from youte.records import Record
+
+logger = logging.getLogger(__name__)
+
+Kind = Literal["search", "video", "channel", "comment"]
+Sink = Literal["records", "csv", "rows"]
+
+# Size of the chunks files are split into, in bytes
+CHUNK_SIZE = 8 * 1024 * 1024
+
+_PARSERS: Dict[str, Callable[..., Iterator]] = {
+    "search": parser.iter_searches,
+    "video": parser.iter_videos,
+    "channel": parser.iter_channels,
+    "comment": parser.iter_comments,
+}
+
+_TABLES: Dict[str, Tuple[Any, schema.Schema]] = {
+    "search": (database.Search, schema.SEARCH),
+    "video": (database.Video, schema.VIDEO),
+    "channel": (database.Channel, schema.CHANNEL),
+    "comment": (database.Comment, schema.COMMENT),
+}
+
+
+@dataclass(frozen=True)
+class _Task:
+    path: str
+    start: int
+    end: int
+    kind: str
+    validation: parser.Validation
+    sink: Sink
+    header: Optional[Tuple[str, ...]] = None
+
+
+def split_file(
+    filepath: str | Path, chunk_size: int = CHUNK_SIZE
+) -> List[Tuple[int, int]]:
+    """Split a file into chunks of whole lines of about `chunk_size` bytes.
+
+    Args:
+        filepath: path of the file.
+        chunk_size: approximate size of chunks, in bytes.
+
+    Returns:
+        A list of (start, end) byte offsets, each chunk ending after a new line or
+        at the end of the file.
+    """
+    with JsonlFile(filepath) as f:
+        return f.ranges(chunk_size)
+
+
+def parse_file(
+    filepath: str | Path,
+    kind: Optional[Kind] = None,
+    jobs: Optional[int] = None,
+    validation: parser.Validation = "strict",
+    ordered: bool = True,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Record]:
+    """Parse a raw JSONL file from youte in parallel, yielding compact records.
+
+    Args:
+        filepath: path of a JSONL file, with one page of results per line.
+        kind: type of resources in the file. Detected from the first page if None.
+        jobs: number of processes. Defaults to the number of CPUs.
+        validation ("strict", "trusted", "sampled"): see youte.parser.
+        ordered: yield records in the order of the file. If False, records of each
+            chunk are yielded as soon as the chunk is parsed.
+        chunk_size: approximate size of the chunks parsed by each process, in bytes.
+
+    Yields:
+        SearchRecord, VideoRecord, ChannelRecord or CommentRecord objects.
+    """
+    for records in _run(
+        filepath, kind, jobs, validation, "records", ordered, chunk_size
+    ):
+        yield from records
+
+
+def parse_file_to_csv(
+    filepath: str | Path,
+    output: str | Path,
+    kind: Optional[Kind] = None,
+    jobs: Optional[int] = None,
+    validation: parser.Validation = "strict",
+    ordered: bool = True,
+    encoding: str = "utf-8-sig",
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """Parse a raw JSONL file from youte in parallel into a CSV file.
+
+    Each process formats its own rows. The columns are the attributes of the
+    resource and the metadata of the first page, like with youte.tidy.TidyWriter.
+
+    Args:
+        filepath: path of a JSONL file, with one page of results per line.
+        output: path of the CSV file.
+        kind: type of resources in the file. Detected from the first page if None.
+        jobs: number of processes. Defaults to the number of CPUs.
+        validation ("strict", "trusted", "sampled"): see youte.parser.
+        ordered: write rows in the order of the file.
+        encoding: encoding of the CSV file.
+        chunk_size: approximate size of the chunks parsed by each process, in bytes.
+
+    Returns:
+        The number of rows written.
+    """
+    kind = kind or _detect_kind(filepath)
+    header = _csv_header(filepath, kind) if kind else None
+    count = 0
+    with open(output, "w", newline="", encoding=encoding) as f:
+        if header:
+            csv.writer(f).writerow(header)
+        chunks = _run(
+            filepath, kind, jobs, validation, "csv", ordered, chunk_size, header
+        )
+        for rows, text in chunks:
+            f.write(text)
+            count += rows
+    return count
+
+
+def parse_file_to_database(
+    filepath: str | Path,
+    engine: Engine,
+    kind: Optional[Kind] = None,
+    jobs: Optional[int] = None,
+    validation: parser.Validation = "strict",
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """Parse a raw JSONL file from youte in parallel into a database.
+
+    Rows are inserted one chunk at a time, in the order chunks are parsed. Items
+    already in the database are skipped.
+
+    Args:
+        filepath: path of a JSONL file, with one page of results per line.
+        engine: an Engine instance that has been initiated using
+            youte.database.set_up_database()
+        kind: type of resources in the file. Detected from the first page if None.
+        jobs: number of processes. Defaults to the number of CPUs.
+        validation ("strict", "trusted", "sampled"): see youte.parser.
+        chunk_size: approximate size of the chunks parsed by each process, in bytes.
+
+    Returns:
+        The number of rows inserted.
+    """
+    kind = kind or _detect_kind(filepath)
+    if not kind:
+        return 0
+    table = _TABLES[kind][0]
+    statement = sqlalchemy.insert(table).prefix_with("OR IGNORE")
+    inserted = 0
+    for rows in _run(filepath, kind, jobs, validation, "rows", False, chunk_size):
+        if not rows:
+            continue
+        with engine.begin() as conn:
+            result = conn.execute(statement, rows)
+        if result.rowcount >= 0:
+            inserted += result.rowcount
+            if result.rowcount < len(rows):
+                logger.warning(
+                    f"{len(rows) - result.rowcount} {kind}s already in the database"
+                )
+    return inserted
+
+
+def _run(
+    filepath: str | Path,
+    kind: Optional[str],
+    jobs: Optional[int],
+    validation: parser.Validation,
+    sink: Sink,
+    ordered: bool,
+    chunk_size: int,
+    header: Optional[Tuple[str, ...]] = None,
+) -> Iterator[Any]:
+    """Parse chunks of a file in a pool of processes and yield what they return"""
+    kind = kind or _detect_kind(filepath)
+    if kind is None:
+        return
+    if kind not in _PARSERS:
+        raise ValueError(f"kind has to be one of {tuple(_PARSERS)}, not {kind}")
+
+    tasks = [
+        _Task(str(filepath), start, end, kind, validation, sink, header)
+        for start, end in split_file(filepath, chunk_size)
+    ]
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    logger.info(f"Parsing {len(tasks)} chunks of {filepath} in {jobs} processes")
+
+    start = time.perf_counter()
+    if jobs <= 1:
+        yield from map(_parse_chunk, tasks)
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            if ordered:
+                yield from pool.imap(_parse_chunk, tasks)
+            else:
+                yield from pool.imap_unordered(_parse_chunk, tasks)
+    logger.info(f"Parsed {filepath} in {time.perf_counter() - start:.1f}s")
+
+
+def _parse_chunk(task: _Task) -> Any:
+    with JsonlFile(task.path) as f:
+        return _parse_pages(task, f.read(task.start, task.end))
+
+
+def _parse_pages(task: _Task, pages: Iterator[dict]) -> Any:
+    items = _PARSERS[task.kind](
+        pages, task.validation, compact=True, intern=task.sink == "records"
+    )
+
+    if task.sink == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        flattener = Flattener.for_model(_TABLES[task.kind][1].model)
+        flattener.set_header(task.header or ())
+        rows = 0
+        for item in items:
+            writer.writerow(flattener.row(item))
+            rows += 1
+        return rows, buffer.getvalue()
+
+    if task.sink == "rows":
+        columns = [(f.name, f.to_db) for f in _TABLES[task.kind][1].stored]
+        result = []
+        for item in items:
+            values = {}
+            for name, to_db in columns:
+                value = getattr(item, name)
+                values[name] = to_db(value) if to_db else value
+            result.append(values)
+        return result
+
+    return list(items)
+
+
+def _first_page(filepath: str | Path) -> Optional[dict]:
+    with JsonlFile(filepath) as f:
+        page = next(iter(f), None)
+    if page is not None and not isinstance(page, dict):
+        raise ValueError(f"The first line of {filepath} is not a page of results")
+    return page
+
+
+def _detect_kind(filepath: str | Path) -> Optional[str]:
+    page = _first_page(filepath)
+    if page is None:
+        logger.warning(f"{filepath} is empty")
+        return None
+    kind = parser.detect_kind(page)
+    if kind is None:
+        raise ValueError(f"Cannot parse {page.get('kind')} objects in {filepath}")
+    return kind
+
+
+def _csv_header(filepath: str | Path, kind: str) -> Tuple[str, ...]:
+    """Return the CSV columns of a file, from the resource model and the metadata
+    of the first page, which may have no items"""
+    page = _first_page(filepath) or {}
+    flattener = Flattener.for_model(_TABLES[kind][1].model)
+    return flattener.header_with({"meta": page.get("_youte", {})})
@@ -0,0 +1,227 @@
+"""Export parsed resources to Parquet files.
+
+Items are parsed into a Table (see youte.table) and written one row group at a
+time, so memory use is bounded by the size of a row group. Counts, flags and
+timestamps get their own Parquet types, lists of strings become list columns, and
+the page metadata is stored as a JSON string.
+
+Requires pyarrow, which is installed with `pip install youte[parquet]`.
+
+    from youte.parquet import ParquetWriter
+
+    with ParquetWriter("videos.parquet", "video") as writer:
+        for page in yob.get_video_metadata(ids):
+            writer.write(page)
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import typing
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Literal, Optional, Tuple, Type
+
+from youte import parser
+from youte.common import Resources, YouteClass
+from youte.records import Record
+from youte.resources import Channel, Comment, Search, Video
+from youte.table import Column, Table, _arrow_types, _import
+
+Kind = Literal["search", "video", "channel", "comment"]
+
+# Codec used to compress columns
+COMPRESSION = "zstd"
+
+# Number of rows parsed before they are written as a row group
+ROW_GROUP_SIZE = 100_000
+
+# Bytes per row assumed for the size of a file before a row group is written
+ROW_SIZE = 512
+
+_KINDS: Dict[str, Tuple[Type[YouteClass], Callable[..., Any]]] = {
+    "search": (Search, parser._parse_search),
+    "video": (Video, parser._parse_video),
+    "channel": (Channel, parser._parse_channel),
+    "comment": (Comment, parser._parse_comment),
+}
+
+
+def arrow_schema(model: Type[YouteClass]) -> Any:
+    """Return the Arrow schema of Parquet files of a resource model.
+
+    Args:
+        model: resource model, e.g. youte.resources.Video.
+
+    Returns:
+        A pyarrow.Schema with one field per attribute of the model.
+    """
+    pa = _import("pyarrow")
+    types = _arrow_types(pa)
+    return pa.schema(
+        [
+            pa.field(name, types[column.arrow_type or "string"])
+            for name, column in Table(model).columns.items()
+        ]
+    )
+
+
+def to_arrow(table: Table) -> Any:
+    """Convert a Table to a pyarrow.Table with the schema of arrow_schema().
+
+    Columns of other objects than numbers, flags, timestamps and strings, such as
+    the page metadata, are encoded as JSON strings.
+    """
+    pa = _import("pyarrow")
+    return pa.Table.from_arrays(
+        [_to_arrow(pa, column) for column in table.columns.values()],
+        schema=arrow_schema(table.model),
+    )
+
+
+def _to_arrow(pa: Any, column: Column) -> Any:
+    if column.arrow_type is None:
+        return pa.array(
+            [
+                None if value is None else json.dumps(value, default=str)
+                for value in column.values
+            ],
+            type=pa.string(),
+        )
+    return column.to_arrow()
+
+
+class ParquetWriter:
+    """Parse pages of results and write their items to a Parquet file, one row
+    group at a time.
+
+    Args:
+        filepath: path of the Parquet file.
+        kind: type of resources in the pages.
+        validation, sample_every: see youte.parser.
+        row_group_size: number of rows in each row group.
+        compression: compression codec, e.g. "zstd", "snappy" or "none".
+    """
+
+    def __init__(
+        self,
+        filepath: str | Path,
+        kind: Kind,
+        validation: parser.Validation = "sampled",
+        sample_every: int = 1000,
+        row_group_size: int = ROW_GROUP_SIZE,
+        compression: str = COMPRESSION,
+    ):
+        pq = _import("pyarrow.parquet")
+        self.model, self._parse = _KINDS[kind]
+        self.filepath = filepath
+        self.row_group_size = row_group_size
+        self.count = 0
+        self._table = Table(self.model)
+        self._build = parser._TableBuilder(
+            self._table, validation, sample_every, intern=True
+        )
+        self._writer = pq.ParquetWriter(
+            str(filepath), arrow_schema(self.model), compression=compression
+        )
+
+    def __enter__(self) -> ParquetWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, page: dict) -> int:
+        """Parse a page of results and add its items to the file.
+
+        Args:
+            page: a page of results, as returned by the Youte methods.
+
+        Returns:
+            The number of items added.
+        """
+        before = len(self._table)
+        for _ in self._parse(page, self._build):
+            pass
+        added = len(self._table) - before
+        self.count += added
+        if len(self._table) >= self.row_group_size:
+            self.flush()
+        return added
+
+    def write_items(self, items: Iterable[YouteClass | Record]) -> int:
+        """Add parsed items, e.g. from youte.parser.iter_videos(), to the file.
+
+        Returns:
+            The number of items added.
+        """
+        added = 0
+        for item in items:
+            self._table.append(dict(item))
+            added += 1
+            if len(self._table) >= self.row_group_size:
+                self.flush()
+        self.count += added
+        return added
+
+    def flush(self) -> None:
+        """Write the rows parsed so far as a row group"""
+        if len(self._table):
+            self._writer.write_table(to_arrow(self._table))
+            self._table = Table(self.model)
+            self._build.table = self._table
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of the file, counting the rows not written yet at the
+        average size of the rows already written, or ROW_SIZE before the first row
+        group is written"""
+        written = os.path.getsize(self.filepath)
+        pending = len(self._table)
+        flushed = self.count - pending
+        row_size = written / flushed if flushed else ROW_SIZE
+        return int(written + pending * row_size)
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+def write_parquet(
+    items: Resources | Iterable[YouteClass | Record],
+    filepath: str | Path,
+    kind: Optional[Kind] = None,
+    row_group_size: int = ROW_GROUP_SIZE,
+    compression: str = COMPRESSION,
+) -> int:
+    """Write resources to a Parquet file, one row group at a time, so that items
+    can be consumed lazily, e.g. from youte.parser.iter_videos().
+
+    Args:
+        items: resources to write, all of the same type.
+        filepath: path of the Parquet file.
+        kind: type of resources. Detected from the items if None.
+        row_group_size: number of rows in each row group.
+        compression: compression codec, e.g. "zstd", "snappy" or "none".
+
+    Returns:
+        The number of items written.
+    """
+    if isinstance(items, Resources):
+        model = typing.get_args(typing.get_type_hints(type(items))["items"])[0]
+        iterator = iter(items.items)
+    else:
+        iterator = iter(items)
+        first = next(iterator, None)
+        if first is None and kind is None:
+            raise ValueError("Cannot detect the type of resources: no items to write")
+        if first is not None:
+            model = first.model if isinstance(first, Record) else type(first)
+            iterator = itertools.chain([first], iterator)
+    if kind is None:
+        kind = {model_: kind_ for kind_, (model_, _) in _KINDS.items()}[model]
+    with ParquetWriter(
+        filepath, kind, row_group_size=row_group_size, compression=compression
+    ) as writer:
+        return writer.write_items(iterator)
@@ -1,13 +1,30 @@
+"""Parse pages of results from YouTube API into resource objects, e.g. Video, or into
+tables of columns.
+
+The parse_*, iter_* and tabulate_* functions share these options:
+
+    validation ("strict", "trusted", "sampled"): "strict" validates every item with
+        pydantic. "trusted" builds items without validation, which is much faster;
+        use it for data collected by youte. "sampled" validates 1 in `sample_every`
+        items, starting with the first one, to catch changes in the API schema while
+        keeping most of the speed of "trusted".
+    sample_every (int): How often items are validated with "sampled".
+    compact (bool): Create compact records, e.g. VideoRecord, instead of pydantic
+        objects. See youte.records.
+    intern (bool): Share a single copy of strings repeated across items, e.g.
+        channel IDs, and of the metadata of each page, to use less memory.
+"""
+
 from __future__ import annotations
 
-import html
 import logging
-from datetime import datetime
-from typing import Callable, Iterable, Iterator, Optional
+from typing import Callable, Iterable, Iterator, Literal, Optional, Type
 
 from pydantic import ValidationError
 
 from youte._typing import SearchResult, StandardResult, VideoChannelResult
+from youte.common import YouteClass, construct
+from youte.records import RECORDS, Record
 from youte.resources import (
     Channel,
     Channels,
@@ -18,26 +35,129 @@ from youte.resources import (
     Video,
     Videos,
 )
+from youte.schema import CHANNEL, COMMENT, SEARCH, VIDEO, Schema
+from youte.table import Table
 
 logger = logging.getLogger(__name__)
 
+# How parsed items are checked against resource models, see the module docstring
+Validation = Literal["strict", "trusted", "sampled"]
+
 
-def parse_search(data: SearchResult) -> Searches:
+class _Builder:
+    """Create resource objects or compact records, validating all, none or a sample
+    of them"""
+
+    def __init__(
+        self,
+        validation: Validation = "strict",
+        sample_every: int = 1000,
+        compact: bool = False,
+        intern: bool = False,
+    ):
+        if validation not in ("strict", "trusted", "sampled"):
+            raise ValueError(
+                f"validation must be 'strict', 'trusted' or 'sampled', not {validation}"
+            )
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.validation = validation
+        self.sample_every = sample_every
+        self.compact = compact
+        # strings shared across items, see Schema.extract()
+        self.strings: Optional[dict] = {} if intern else None
+        self._count = 0
+
+    def __call__(self, model: Type[YouteClass], values: dict) -> YouteClass | Record:
+        validated = self._validate(model, values) if self._validates() else None
+        if self.compact:
+            return RECORDS[model](**values)
+        if validated is not None:
+            if self.strings is not None:
+                # pydantic copies dictionaries, so share the page metadata again
+                validated.meta = values["meta"]
+            return validated
+        return construct(model, values)
+
+    def _validates(self) -> bool:
+        """Whether the next item should be validated."""
+        if self.validation == "sampled":
+            self._count += 1
+            return (self._count - 1) % self.sample_every == 0
+        return self.validation == "strict"
+
+    def _validate(self, model: Type[YouteClass], values: dict) -> YouteClass:
+        try:
+            return model(**values)
+        except ValidationError:
+            if self.validation == "sampled":
+                logger.error(
+                    f"{model.__name__} {values.get('id')} does not match the "
+                    "expected schema. Has YouTube API changed?"
+                )
+            raise
+
+
+class _TableBuilder(_Builder):
+    """Add items to a Table instead of creating resource objects, validating all,
+    none or a sample of them"""
+
+    def __init__(
+        self,
+        table: Table,
+        validation: Validation = "sampled",
+        sample_every: int = 1000,
+        intern: bool = False,
+    ):
+        super().__init__(validation, sample_every, intern=intern)
+        self.table = table
+
+    def __call__(self, model: Type[YouteClass], values: dict) -> None:  # type: ignore
+        if self._validates():
+            self._validate(model, values)
+        self.table.append(values)
+
+
+_validated = _Builder("strict")
+
+# Number of distinct strings kept for interning before starting afresh
+_MAX_INTERNED = 100_000
+
+
+def parse_search(
+    data: SearchResult,
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Searches:
     """Parse a single page of search results from Youte.search() into a list
     of Search objects. These Search objects are like dictionaries with keys
     representing attributes of the search results.
 
     Args:
         data (dict): A single dictionary as returned by Youte.search()
+        validation, sample_every, compact, intern: see the module docstring.
 
     Returns:
         A list of Search objects.
     """
-    searches = [search for search in _parse_search(data)]
+    searches = [
+        search
+        for search in _parse_search(
+            data, _Builder(validation, sample_every, compact, intern)
+        )
+    ]
     return Searches(items=searches)
 
 
-def parse_searches(data: Iterable[SearchResult]) -> Searches:
+def parse_searches(
+    data: Iterable[SearchResult],
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Searches:
     """Parse a list or iterable of result pages from Youte.search() into a list of
     Search objects. Works very similarly to parse_search except over a list of search
     results.
@@ -45,19 +165,49 @@ def parse_searches(data: Iterable[SearchResult]) -> Searches:
     Args:
         data (Iterable[dict]):
             A list or iterator of dictionaries returned by Youte.search()
+        validation, sample_every, compact, intern: see the module docstring.
 
     Returns:
         A list of Search objects.
     """
-    searches: list[Search] = []
+    return Searches(
+        items=list(iter_searches(data, validation, sample_every, compact, intern))
+    )
+
+
+def iter_searches(
+    data: Iterable[SearchResult],
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Iterator[Search]:
+    """Lazily parse an iterable of result pages from Youte.search(), yielding Search
+    objects one at a time. Only one page is held in memory at a time if `data` is an
+    iterator, e.g. one reading pages from a file.
+
+    Args:
+        data (Iterable[dict]):
+            A list or iterator of dictionaries returned by Youte.search()
+        validation, sample_every, compact, intern: see the module docstring.
+
+    Yields:
+        Search objects.
+    """
+    build = _Builder(validation, sample_every, compact, intern)
     for each in data:
-        for search in _parse_search(each):
+        for search in _parse_search(each, build):
             logger.debug(f"Parsing search item {search.id}: {search.title}")
-            searches.append(search)
-    return Searches(items=searches)
+            yield search
 
 
-def parse_video(data: VideoChannelResult) -> Videos:
+def parse_video(
+    data: VideoChannelResult,
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Videos:
     """Parse a single page of results from Youte.get_video_metadata() or
     Youte.get_most_popular() into a list of Video objects. These Video objects are
     like dictionaries with keys representing video attributes.
@@ -66,15 +216,27 @@ def parse_video(data: VideoChannelResult) -> Videos:
         data (dict):
             A single dictionary returned by Youte.get_video_metadata() or
             Youte.get_most_popular()
+        validation, sample_every, compact, intern: see the module docstring.
 
     Returns:
         A Videos object containing a list of Video objects.
     """
-    videos = [video for video in _parse_video(data)]
+    videos = [
+        video
+        for video in _parse_video(
+            data, _Builder(validation, sample_every, compact, intern)
+        )
+    ]
     return Videos(items=videos)
 
 
-def parse_videos(data: Iterable[VideoChannelResult]) -> Videos:
+def parse_videos(
+    data: Iterable[VideoChannelResult],
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Videos:
     """Parse a list or iterable of result pages from Youte.get_video_metadata() or
     Youte.get_most_popular() into a list of Video objects. These Video objects are
     like dictionaries with keys representing video attributes.
@@ -83,19 +245,49 @@ def parse_videos(data: Iterable[VideoChannelResult]) -> Videos:
         data (Iterable[dict]):
             A list or iterator of dictionaries returned by Youte.get_video_metadata() or
             Youte.get_most_popular()
+        validation, sample_every, compact, intern: see the module docstring.
 
     Returns:
         A Videos object containing a list of Video objects.
     """
-    videos: list[Video] = []
+    return Videos(
+        items=list(iter_videos(data, validation, sample_every, compact, intern))
+    )
+
+
+def iter_videos(
+    data: Iterable[VideoChannelResult],
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Iterator[Video]:
+    """Lazily parse an iterable of result pages from Youte.get_video_metadata() or
+    Youte.get_most_popular(), yielding Video objects one at a time.
+
+    Args:
+        data (Iterable[dict]):
+            A list or iterator of dictionaries returned by Youte.get_video_metadata() or
+            Youte.get_most_popular()
+        validation, sample_every, compact, intern: see the module docstring.
+
+    Yields:
+        Video objects.
+    """
+    build = _Builder(validation, sample_every, compact, intern)
     for each in data:
-        for video in _parse_video(each):
+        for video in _parse_video(each, build):
             logger.debug(f"Parsing video {video.id}: {video.title}")
-            videos.append(video)
-    return Videos(items=videos)
+            yield video
 
 
-def parse_channel(data: VideoChannelResult) -> Channels:
+def parse_channel(
+    data: VideoChannelResult,
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Channels:
     """Parse a single page of results from Youte.get_channel_metadata() into a list of
     Channel objects. These Channel objects are like dictionaries with keys representing
     channel attributes.
@@ -103,15 +295,27 @@ def parse_channel(data: VideoChannelResult) -> Channels:
     Args:
         data (dict):
             A single dictionary returned by Youte.get_channel_metadata()
+        validation, sample_every, compact, intern: see the module docstring.
 
     Returns:
         A Channels object containing a list of Channel objects.
     """
-    channels = [channel for channel in _parse_channel(data)]
+    channels = [
+        channel
+        for channel in _parse_channel(
+            data, _Builder(validation, sample_every, compact, intern)
+        )
+    ]
     return Channels(items=channels)
 
 
-def parse_channels(data: Iterable[VideoChannelResult]) -> Channels:
+def parse_channels(
+    data: Iterable[VideoChannelResult],
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Channels:
     """Parse an iterable of pages of results from Youte.get_channel_metadata() into a
     list of Channel objects. These Channel objects are like dictionaries with keys
     representing channel attributes.
@@ -119,19 +323,48 @@ def parse_channels(data: Iterable[VideoChannelResult]) -> Channels:
     Args:
         data (Iterable[dict]):
             A list or iterator of dictionaries returned by Youte.get_channel_metadata()
+        validation, sample_every, compact, intern: see the module docstring.
 
     Returns:
         A Channels object containing a list of Channel objects.
     """
-    channels: list[Channel] = []
+    return Channels(
+        items=list(iter_channels(data, validation, sample_every, compact, intern))
+    )
+
+
+def iter_channels(
+    data: Iterable[VideoChannelResult],
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Iterator[Channel]:
+    """Lazily parse an iterable of result pages from Youte.get_channel_metadata(),
+    yielding Channel objects one at a time.
+
+    Args:
+        data (Iterable[dict]):
+            A list or iterator of dictionaries returned by Youte.get_channel_metadata()
+        validation, sample_every, compact, intern: see the module docstring.
+
+    Yields:
+        Channel objects.
+    """
+    build = _Builder(validation, sample_every, compact, intern)
     for each in data:
-        for channel in _parse_channel(each):
+        for channel in _parse_channel(each, build):
             logger.debug(f"Parsing channel {channel.id}: {channel.title}")
-            channels.append(channel)
-    return Channels(items=channels)
+            yield channel
 
 
-def parse_comment(data: StandardResult) -> Comments:
+def parse_comment(
+    data: StandardResult,
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Comments:
     """Parse a single page of results from Youte.get_comment_thread() or
      Youte.get_thread_replies() into a list of Comments objects. These Comment objects
      are like dictionaries with keys representing comment attributes.
@@ -140,15 +373,27 @@ def parse_comment(data: StandardResult) -> Comments:
         data (dict):
             A single dictionary returned by Youte.get_comment_thread() or
             Youte.get_thread_replies()
+        validation, sample_every, compact, intern: see the module docstring.
 
     Returns:
         A Comments object containing a list of Comment objects.
     """
-    cmt = [cmt for cmt in _parse_comment(data)]
+    cmt = [
+        cmt
+        for cmt in _parse_comment(
+            data, _Builder(validation, sample_every, compact, intern)
+        )
+    ]
     return Comments(items=cmt)
 
 
-def parse_comments(data: Iterable[StandardResult]) -> Comments:
+def parse_comments(
+    data: Iterable[StandardResult],
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Comments:
     """Parse multiple pages of results from Youte.get_comment_thread() or
      Youte.get_thread_replies() into a list of Comments objects. These Comment objects
      are like dictionaries with keys representing comment attributes.
@@ -157,259 +402,206 @@ def parse_comments(data: Iterable[StandardResult]) -> Comments:
         data (dict):
             A list or iterator of dictionaries returned by Youte.get_comment_thread() or
             Youte.get_thread_replies()
+        validation, sample_every, compact, intern: see the module docstring.
 
     Returns:
         A Comments object containing a list of Comment objects.
     """
-    cmts: list[Comment] = []
+    return Comments(
+        items=list(iter_comments(data, validation, sample_every, compact, intern))
+    )
+
+
+def iter_comments(
+    data: Iterable[StandardResult],
+    validation: Validation = "strict",
+    sample_every: int = 1000,
+    compact: bool = False,
+    intern: bool = True,
+) -> Iterator[Comment]:
+    """Lazily parse an iterable of result pages from Youte.get_comment_thread() or
+    Youte.get_thread_replies(), yielding Comment objects one at a time.
+
+    Args:
+        data (Iterable[dict]):
+            A list or iterator of dictionaries returned by Youte.get_comment_thread() or
+            Youte.get_thread_replies()
+        validation, sample_every, compact, intern: see the module docstring.
+
+    Yields:
+        Comment objects.
+    """
+    build = _Builder(validation, sample_every, compact, intern)
     for each in data:
-        for cmt in _parse_comment(each):
+        for cmt in _parse_comment(each, build):
             logger.debug(f"Parsing comment {cmt.id}")
-            cmts.append(cmt)
-    return Comments(items=cmts)
+            yield cmt
 
 
-def _parse_search(input_: SearchResult) -> Iterator[Search]:
-    if "searchListResponse" not in input_["kind"]:
-        raise ValueError(
-            f"Object passed to input is {input_['kind']} not a searchListResponse"
-        )
+def tabulate_searches(
+    data: Iterable[SearchResult],
+    validation: Validation = "sampled",
+    sample_every: int = 1000,
+    intern: bool = True,
+) -> Table:
+    """Parse an iterable of result pages from Youte.search() into a Table, with one
+    column per Search attribute, without creating Search objects.
 
-    items: list[dict] = input_["items"]
-    if "_youte" in input_:
-        meta: dict = input_["_youte"]
-    else:
-        meta: dict = {}
-
-    for item in items:
-        snippet = item["snippet"]
-
-        for elem in item["id"]:
-            if "id" in elem or "Id" in elem:
-                id_: str = item["id"][elem]
-
-        search = Search(
-            kind=item["id"]["kind"],
-            id=id_,  # type: ignore
-            description=snippet["description"],
-            published_at=_parse_rfc3339(snippet["publishedAt"]),
-            title=html.unescape(snippet["title"]),
-            thumbnail_url=snippet["thumbnails"]["high"]["url"],
-            thumbnail_height=snippet["thumbnails"]["high"].get("height"),
-            thumbnail_width=snippet["thumbnails"]["high"].get("width"),
-            channel_title=snippet.get("channelTitle"),
-            live_broadcast_content=snippet["liveBroadcastContent"],
-            channel_id=snippet["channelId"],
-            meta=meta,
-        )
-        yield search
+    Args:
+        data (Iterable[dict]):
+            A list or iterator of dictionaries returned by Youte.search()
+        validation, sample_every, intern: see the module docstring.
 
+    Returns:
+        A Table of search results.
+    """
+    return _tabulate(data, Search, _parse_search, validation, sample_every, intern)
 
-def _parse_video(input_: VideoChannelResult) -> Iterator[Video]:
-    if "videoListResponse" not in input_["kind"]:
-        raise ValueError(
-            f"Object passed to input is {input_['kind']} not a videoListResponse"
-        )
 
-    items: list[dict] = input_["items"]
-    if "_youte" in input_:
-        meta: dict = input_["_youte"]
-    else:
-        meta: dict = {}
-
-    for item in items:
-        snippet = item["snippet"]
-        content_details = item["contentDetails"]
-        status = item["status"]
-        statistics = item["statistics"]
-        topic_details = item.get("topicDetails")
-        live_stream = (
-            item["liveStreamingDetails"] if "liveStreamingDetails" in item else {}
-        )
+def tabulate_videos(
+    data: Iterable[VideoChannelResult],
+    validation: Validation = "sampled",
+    sample_every: int = 1000,
+    intern: bool = True,
+) -> Table:
+    """Parse an iterable of result pages from Youte.get_video_metadata() or
+    Youte.get_most_popular() into a Table, with one column per Video attribute,
+    without creating Video objects.
 
-        # noinspection PyArgumentList
-        search = Video(
-            kind=item["kind"],
-            id=item["id"],
-            description=snippet["description"],
-            published_at=_parse_rfc3339(snippet["publishedAt"]),
-            title=snippet["title"],
-            thumbnail_url=snippet["thumbnails"]["high"]["url"],
-            thumbnail_height=snippet["thumbnails"]["high"]["height"],
-            thumbnail_width=snippet["thumbnails"]["high"]["width"],
-            channel_title=snippet["channelTitle"],
-            tags=snippet.get("tags"),
-            channel_id=snippet["channelId"],
-            category_id=snippet["categoryId"],
-            localized_title=snippet["localized"]["title"],
-            localized_description=snippet["localized"]["description"],
-            default_audio_language=snippet.get("defaultAudioLanguage"),
-            default_language=snippet.get("defaultLanguage"),
-            duration=content_details.get("duration"),
-            dimension=content_details["dimension"],
-            definition=content_details["definition"],
-            caption=True if content_details["caption"] is True else False,
-            licensed_content=content_details["licensedContent"],
-            projection=content_details["projection"],
-            upload_status=status["uploadStatus"],
-            privacy_status=status["privacyStatus"],
-            license=status["license"],
-            embeddable=status["embeddable"],
-            public_stats_viewable=status["publicStatsViewable"],
-            made_for_kids=status["madeForKids"],
-            view_count=statistics.get("viewCount"),
-            like_count=statistics.get("likeCount"),
-            comment_count=statistics.get("commentCount"),
-            topic_categories=(
-                topic_details["topicCategories"] if topic_details else None
-            ),
-            live_streaming_start_actual=(
-                _parse_rfc3339(live_stream["actualStartTime"])
-                if "actualStartTime" in live_stream
-                else None
-            ),
-            live_streaming_end_actual=(
-                _parse_rfc3339(live_stream["actualEndTime"])
-                if "actualEndTime" in live_stream
-                else None
-            ),
-            live_streaming_start_scheduled=(
-                _parse_rfc3339(live_stream["scheduledStartTime"])
-                if "scheduledStartTime" in live_stream
-                else None
-            ),
-            live_streaming_end_scheduled=(
-                _parse_rfc3339(live_stream["scheduledEndTime"])
-                if "scheduledEndTime" in live_stream
-                else None
-            ),
-            live_streaming_concurrent_viewers=(
-                int(live_stream["concurrentViewers"])
-                if "concurrentViewers" in live_stream
-                else None
-            ),
-            meta=meta,
-        )
-        yield search
+    Args:
+        data (Iterable[dict]):
+            A list or iterator of dictionaries returned by Youte.get_video_metadata() or
+            Youte.get_most_popular()
+        validation, sample_every, intern: see the module docstring.
 
+    Returns:
+        A Table of videos.
+    """
+    return _tabulate(data, Video, _parse_video, validation, sample_every, intern)
 
-def _parse_channel(input_: VideoChannelResult) -> Iterator[Channel]:
-    if "channelListResponse" not in input_["kind"]:
-        raise ValueError("Object passed to input is not a channelListResponse")
 
-    items: list[dict] = input_["items"]
-    if "_youte" in input_:
-        meta: dict = input_["_youte"]
-    else:
-        meta: dict = {}
+def tabulate_channels(
+    data: Iterable[VideoChannelResult],
+    validation: Validation = "sampled",
+    sample_every: int = 1000,
+    intern: bool = True,
+) -> Table:
+    """Parse an iterable of result pages from Youte.get_channel_metadata() into a
+    Table, with one column per Channel attribute, without creating Channel objects.
 
-    for item in items:
-        snippet = item["snippet"]
-        status = item["status"]
-        statistics = item["statistics"]
-        topic_details = item.get("topicDetails")
-        branding = item["brandingSettings"]
+    Args:
+        data (Iterable[dict]):
+            A list or iterator of dictionaries returned by Youte.get_channel_metadata()
+        validation, sample_every, intern: see the module docstring.
 
-        try:
-            # noinspection PyArgumentList
-            channel = Channel(
-                kind=item["kind"],
-                id=item["id"],
-                title=snippet["title"],
-                description=snippet["description"],
-                custom_url=snippet.get("customUrl"),
-                published_at=_parse_rfc3339(snippet["publishedAt"]),
-                thumbnail_url=snippet["thumbnails"]["high"]["url"],
-                thumbnail_height=snippet["thumbnails"]["high"]["height"],
-                thumbnail_width=snippet["thumbnails"]["high"]["width"],
-                default_language=snippet.get("defaultLanguage"),
-                localized_title=snippet["localized"]["title"],
-                localized_description=snippet["localized"]["description"],
-                country=branding["channel"].get("country"),
-                view_count=statistics["viewCount"],
-                subscriber_count=statistics["subscriberCount"],
-                video_count=statistics["videoCount"],
-                hidden_subscriber_count=statistics["hiddenSubscriberCount"],
-                topic_categories=(
-                    topic_details["topicCategories"] if topic_details else None
-                ),
-                privacy_status=status["privacyStatus"],
-                is_linked=status["isLinked"],
-                made_for_kids=status.get("madeForKids"),
-                branding_keywords=_list(branding["channel"].get("keywords")),
-                moderated_comments=branding["channel"].get("moderatedComments"),
-                meta=meta,
-            )
-        except Exception as e:
-            # print(branding["channel"].get("keywords"))
-            logger.error(e.__traceback__)
-            raise e
+    Returns:
+        A Table of channels.
+    """
+    return _tabulate(data, Channel, _parse_channel, validation, sample_every, intern)
 
-        yield channel
 
+def tabulate_comments(
+    data: Iterable[StandardResult],
+    validation: Validation = "sampled",
+    sample_every: int = 1000,
+    intern: bool = True,
+) -> Table:
+    """Parse an iterable of result pages from Youte.get_comment_thread() or
+    Youte.get_thread_replies() into a Table, with one column per Comment attribute,
+    without creating Comment objects.
 
-def _parse_comment(input_: StandardResult) -> Iterable[Comment]:
-    if "comment" not in input_["kind"]:
-        raise ValueError("Object passed to input is not a comment")
+    Args:
+        data (Iterable[dict]):
+            A list or iterator of dictionaries returned by Youte.get_comment_thread() or
+            Youte.get_thread_replies()
+        validation, sample_every, intern: see the module docstring.
+
+    Returns:
+        A Table of comments.
+    """
+    return _tabulate(data, Comment, _parse_comment, validation, sample_every, intern)
 
-    items: list[dict] = input_["items"]
-    if "_youte" in input_:
-        meta: dict = input_["_youte"]
-    else:
-        meta: dict = {}
-
-    for item in items:
-        can_reply: Optional[bool] = None
-        total_reply_count: Optional[int] = None
-        is_public: Optional[bool] = None
-        if "topLevelComment" in item["snippet"]:
-            snippet = item["snippet"]["topLevelComment"]["snippet"]
-            can_reply = item["snippet"]["canReply"]
-            total_reply_count = item["snippet"]["totalReplyCount"]
-            is_public = item["snippet"]["isPublic"]
-        else:
-            snippet = item["snippet"]
-
-        # noinspection PyArgumentList
-        comment = Comment(
-            id=item["id"],
-            video_id=snippet.get("videoId"),
-            author_display_name=snippet["authorDisplayName"],
-            author_profile_image_url=snippet["authorProfileImageUrl"],
-            author_channel_id=(
-                snippet["authorChannelId"]["value"]
-                if "authorChannelId" in snippet
-                else None
-            ),
-            author_channel_url=snippet["authorChannelUrl"],
-            text_display=snippet["textDisplay"],
-            text_original=snippet["textOriginal"],
-            parent_id=snippet.get("parentId"),
-            can_rate=snippet["canRate"],
-            viewer_rating=snippet["viewerRating"],
-            like_count=snippet["likeCount"],
-            published_at=_parse_rfc3339(snippet["publishedAt"]),
-            updated_at=_parse_rfc3339(snippet["updatedAt"]),
-            can_reply=can_reply,
-            is_public=is_public,
-            total_reply_count=total_reply_count,
-            meta=meta,
-        )
-        yield comment
 
+def detect_kind(input_: dict) -> Optional[str]:
+    """Detect the type of resources in a page of results from YouTube API.
 
-def _parse_rfc3339(string: str) -> datetime:
-    """Parser function for RFC3339 datetime string returned from YouTube.
-    fromisoformat() does not work with this format, except in Python 3.11
+    Args:
+        input_: a page of results.
+
+    Returns:
+        "search", "comment", "video" or "channel", or None if the page holds other
+        resources.
     """
-    try:
-        return datetime.strptime(string, "%Y-%m-%dT%H:%M:%S.%f%z")
-    except ValueError:
-        return datetime.strptime(string, "%Y-%m-%dT%H:%M:%S%z")
+    kind = input_.get("kind", "")
+    for type_ in ("search", "comment", "video", "channel"):
+        if type_ in kind:
+            return type_
+    return None
+
+
+def _tabulate(
+    data: Iterable[dict],
+    model: Type[YouteClass],
+    parse: Callable[..., Iterable],
+    validation: Validation,
+    sample_every: int,
+    intern: bool,
+) -> Table:
+    table = Table(model)
+    build = _TableBuilder(table, validation, sample_every, intern)
+    for each in data:
+        for _ in parse(each, build):
+            pass
+    return table
+
+
+def _parse_search(
+    input_: SearchResult, build: Callable[..., YouteClass] = _validated
+) -> Iterator[Search]:
+    if "searchListResponse" not in input_["kind"]:
+        raise ValueError(
+            f"Object passed to input is {input_['kind']} not a searchListResponse"
+        )
+    return _parse_items(input_, SEARCH, build)
+
+
+def _parse_video(
+    input_: VideoChannelResult, build: Callable[..., YouteClass] = _validated
+) -> Iterator[Video]:
+    if "videoListResponse" not in input_["kind"]:
+        raise ValueError(
+            f"Object passed to input is {input_['kind']} not a videoListResponse"
+        )
+    return _parse_items(input_, VIDEO, build)
 
 
-def _list(string: str | None) -> list | None:
-    if string:
-        return string.split(" ")
-    else:
-        return string
+def _parse_channel(
+    input_: VideoChannelResult, build: Callable[..., YouteClass] = _validated
+) -> Iterator[Channel]:
+    if "channelListResponse" not in input_["kind"]:
+        raise ValueError("Object passed to input is not a channelListResponse")
+    return _parse_items(input_, CHANNEL, build)
+
+
+def _parse_comment(
+    input_: StandardResult, build: Callable[..., YouteClass] = _validated
+) -> Iterator[Comment]:
+    if "comment" not in input_["kind"]:
+        raise ValueError("Object passed to input is not a comment")
+    return _parse_items(input_, COMMENT, build)
+
+
+def _parse_items(
+    input_: dict, schema: Schema, build: Callable[..., YouteClass]
+) -> Iterator:
+    """Extract the fields of `schema` from each item of a page and build resources
+    from them"""
+    meta: dict = input_["_youte"] if "_youte" in input_ else {}
+    model = schema.model
+    extract = schema.extract
+    strings: Optional[dict] = getattr(build, "strings", None)
+    if strings is not None and len(strings) > _MAX_INTERNED:
+        # keep memory bounded when items are consumed as they are parsed
+        strings.clear()
+    for item in input_["items"]:
+        yield build(model, extract(item, meta, strings))
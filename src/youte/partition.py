@@ -0,0 +1,254 @@
+"""Write pages of results to directories partitioned by an attribute of the items.
+
+Items are split by the value of one attribute into Hive-style directories named
+after it, e.g. published_date=2023-05-01/ or video_id=dQw4w9WgXcQ/, which Spark,
+DuckDB or pyarrow.dataset read as a column and use to skip partitions. Each
+partition holds numbered files, and a new file is started when the current one
+grows past a given size. Existing files are never overwritten, so a directory can
+be updated by writing more pages to it.
+
+Only a limited number of files are kept open. A raw, CSV or JSONL file closed to
+make room for another partition is reopened and added to when more items of its
+partition come, so the number of files does not depend on the order of the items.
+
+    from youte.partition import PartitionedWriter
+
+    with PartitionedWriter("comments", "comment", "video_id", "parquet") as writer:
+        for page in yob.get_comment_threads(video_ids=ids):
+            writer.write(page)
+"""
+
+from __future__ import annotations
+
+import logging
+import typing
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Tuple, Union
+from urllib.parse import quote
+
+from youte import parser
+from youte.common import field_types
+from youte.parquet import ParquetWriter
+from youte.schema import CHANNEL, COMMENT, SEARCH, VIDEO, Schema
+from youte.tidy import TidyWriter
+from youte.utilities import FlushPolicy, RawWriter
+
+logger = logging.getLogger(__name__)
+
+Kind = Literal["search", "video", "channel", "comment"]
+PartitionFormat = Literal["raw", "csv", "json", "jsonl", "parquet"]
+
+# Partition by the UTC date of the published_at attribute
+PUBLISHED_DATE = "published_date"
+
+# Directory of items without a value, as named by Hive
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Size in bytes after which a new file is started in a partition
+MAX_FILE_SIZE = 256 * 1024 * 1024
+
+# Number of files kept open at once, the least recently written being closed first
+MAX_OPEN_FILES = 64
+
+# Formats whose files can be reopened to add more items
+_APPENDABLE = ("raw", "csv", "jsonl")
+
+Writer = Union[RawWriter, TidyWriter, ParquetWriter]
+
+_SCHEMAS: Dict[str, Schema] = {
+    "search": SEARCH,
+    "video": VIDEO,
+    "channel": CHANNEL,
+    "comment": COMMENT,
+}
+
+
+def partition_columns(kind: Kind) -> List[str]:
+    """Return the attributes items of a kind can be partitioned by.
+
+    These are the attributes of the resource, except the page metadata and lists,
+    and "published_date" for the date of publication.
+    """
+    fields = field_types(_SCHEMAS[kind].model)
+    names = [
+        name
+        for name, type_ in fields.items()
+        if name != "meta" and typing.get_origin(type_) is not list
+    ]
+    return names + [PUBLISHED_DATE]
+
+
+def partition_name(column: str, value: Any) -> str:
+    """Return the name of the directory of a partition, e.g. channel_id=UC123.
+
+    Characters which cannot be used in file names are percent-encoded, and missing
+    values are stored in the __HIVE_DEFAULT_PARTITION__ directory.
+    """
+    if value is None or value == "":
+        return f"{column}={DEFAULT_PARTITION}"
+    if isinstance(value, datetime):
+        value = value.date() if column == PUBLISHED_DATE else value.isoformat()
+    return f"{column}={quote(str(value), safe='')}"
+
+
+class PartitionedWriter:
+    """Split pages of results by an attribute of their items and write each part to
+    the files of its partition.
+
+    Raw pages are written as JSONL, one page per line, keeping only the items of
+    the partition. Tidy formats are written with youte.tidy.TidyWriter, and Parquet
+    with youte.parquet.ParquetWriter, whose size includes the rows it holds until
+    they are written.
+
+    Args:
+        directory: directory of the partitions, created if it does not exist.
+        kind: type of resources in the pages.
+        partition_by: attribute to partition items by, see partition_columns().
+        file_format ("raw", "csv", "json", "jsonl", "parquet"): format of the files.
+        max_file_size: size in bytes after which a new file is started.
+        encoding: encoding of CSV files.
+        pretty: indent JSON.
+        validation ("strict", "trusted", "sampled"): see youte.parser.
+        flush ("none", "page", "fsync"): when raw pages are written to disk, see
+            youte.utilities.RawWriter.
+
+    Raises:
+        ValueError: items of this kind cannot be partitioned by this attribute.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        kind: Kind,
+        partition_by: str,
+        file_format: PartitionFormat = "raw",
+        max_file_size: int = MAX_FILE_SIZE,
+        encoding: str = "utf-8-sig",
+        pretty: bool = False,
+        validation: parser.Validation = "strict",
+        flush: FlushPolicy = "page",
+    ):
+        if partition_by not in partition_columns(kind):
+            raise ValueError(
+                f"{kind} items cannot be partitioned by {partition_by}, "
+                f"choose one of {', '.join(partition_columns(kind))}"
+            )
+        self.directory = Path(directory)
+        self.kind = kind
+        self.partition_by = partition_by
+        self.file_format = file_format
+        self.max_file_size = max_file_size
+        self.encoding = encoding
+        self.pretty = pretty
+        self.validation = validation
+        self.flush = flush
+        self.count = 0
+        self.files: List[Path] = []
+        self._column = (
+            "published_at" if partition_by == PUBLISHED_DATE else partition_by
+        )
+        self._extract = _SCHEMAS[kind].select([self._column]).extract
+        self._open: OrderedDict[str, Tuple[Writer, Path]] = OrderedDict()
+        self._next_part: Dict[str, int] = {}
+        # last file of each partition, reopened after it is closed to save files
+        self._current: Dict[str, Path] = {}
+
+    def __enter__(self) -> PartitionedWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, page: dict) -> int:
+        """Split a page of results by partition and write each part.
+
+        Args:
+            page: a page of results, as returned by the Youte methods.
+
+        Returns:
+            The number of items written.
+        """
+        parts: Dict[str, List[dict]] = {}
+        extract = self._extract
+        column = self._column
+        for item in page.get("items", []):
+            name = partition_name(self.partition_by, extract(item, {})[column])
+            parts.setdefault(name, []).append(item)
+
+        written = 0
+        for name, items in parts.items():
+            writer, path = self._writer(name)
+            written += writer.write({**page, "items": items})
+            if self._full(writer, path):
+                writer.close()
+                del self._open[name]
+                self._current.pop(name, None)
+        self.count += written
+        return written
+
+    def close(self) -> None:
+        """Close the files of all partitions"""
+        while self._open:
+            writer, _ = self._open.popitem(last=False)[1]
+            writer.close()
+
+    def _full(self, writer: Writer, path: Path) -> bool:
+        """Whether a file has reached the maximum size"""
+        if not isinstance(writer, ParquetWriter):
+            return path.stat().st_size >= self.max_file_size
+        if writer.nbytes < self.max_file_size:
+            return False
+        # the size of the rows held in memory is estimated, write them to check
+        writer.flush()
+        return writer.nbytes >= self.max_file_size
+
+    def _writer(self, name: str) -> Tuple[Writer, Path]:
+        """Return the open file of a partition, reopen its last file, or start a
+        new one"""
+        if name in self._open:
+            self._open.move_to_end(name)
+            return self._open[name]
+        if len(self._open) >= MAX_OPEN_FILES:
+            writer, _ = self._open.popitem(last=False)[1]
+            writer.close()
+
+        append = name in self._current
+        if append:
+            path = self._current[name]
+        else:
+            path = self._new_part(name)
+            self.files.append(path)
+            if self.file_format in _APPENDABLE:
+                self._current[name] = path
+
+        writer: Writer
+        if self.file_format == "raw":
+            writer = RawWriter(path, "jsonl", append=append, flush=self.flush)
+        elif self.file_format == "parquet":
+            writer = ParquetWriter(path, self.kind, validation=self.validation)
+        else:
+            writer = TidyWriter(
+                path,
+                self.kind,
+                self.file_format,
+                encoding=self.encoding,
+                pretty=self.pretty,
+                validation=self.validation,
+                append=append,
+            )
+        logger.debug(f"{'Adding to' if append else 'Writing to'} {path}")
+        self._open[name] = (writer, path)
+        return writer, path
+
+    def _new_part(self, name: str) -> Path:
+        """Return the path of the next numbered file of a partition"""
+        partition = self.directory / name
+        partition.mkdir(parents=True, exist_ok=True)
+        extension = "jsonl" if self.file_format == "raw" else self.file_format
+        part = self._next_part.get(name, 0)
+        while (partition / f"part-{part:05d}.{extension}").exists():
+            part += 1
+        self._next_part[name] = part + 1
+        return partition / f"part-{part:05d}.{extension}"
@@ -0,0 +1,167 @@
+"""Progress of Youte method calls, with throughput and estimated time remaining.
+
+Pass a callback to Youte(progress=...) to receive a Progress after every page:
+
+    def show(progress: Progress) -> None:
+        print(progress.items, progress.eta)
+
+    yob = Youte(api_key=API_KEY, progress=show)
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Progress:
+    """Snapshot of the progress of one Youte method call.
+
+    Attributes:
+        task: API endpoint being queried, e.g. "videos" or "commentThreads".
+        unit: what units_done counts, e.g. "batches" or "videos".
+        units_done: number of batches, videos, channels or threads completed.
+        units_total: number of units to collect, if known.
+        pages: pages collected.
+        items: resources collected.
+        items_total: number of resources to collect, if known. Only searches report
+            it, from pageInfo.totalResults, which YouTube gives as an estimate.
+        elapsed: seconds since the call started.
+        finished: whether the call has collected everything.
+    """
+
+    task: str
+    unit: str
+    units_done: int = 0
+    units_total: Optional[int] = None
+    pages: int = 0
+    items: int = 0
+    items_total: Optional[int] = None
+    elapsed: float = 0.0
+    finished: bool = False
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Share of the work done, between 0 and 1, if it can be known."""
+        if self.finished:
+            return 1.0
+        if self.items_total:
+            return min(self.items / self.items_total, 1.0)
+        if self.units_total:
+            return self.units_done / self.units_total
+        return None
+
+    @property
+    def eta(self) -> Optional[timedelta]:
+        """Estimated time left, based on the throughput so far."""
+        fraction = self.fraction
+        if not fraction:
+            return None
+        return timedelta(seconds=round(self.elapsed * (1 - fraction) / fraction))
+
+    def __str__(self) -> str:
+        parts = [self.task + ":"]
+        if self.units_total is not None:
+            parts.append(f"{self.units_done}/{self.units_total} {self.unit},")
+        items = str(self.items)
+        if self.items_total is not None:
+            items += f"/~{self.items_total}"
+        parts.append(f"{items} items, {self.items_per_second:.1f} items/s")
+        eta = self.eta
+        if self.finished:
+            parts.append(f"- done in {timedelta(seconds=round(self.elapsed))}")
+        elif eta is not None:
+            finish = datetime.now() + eta
+            parts.append(f"- ETA {eta} (at {finish:%H:%M})")
+        return " ".join(parts)
+
+
+class ProgressTracker:
+    """Keep track of the progress of a Youte method call and report it to a callback.
+
+    Args:
+        task: API endpoint being queried.
+        unit: name of the units of work, e.g. "batches".
+        callback: called with a Progress after every page and unit. If None,
+            nothing is reported.
+        units_total: number of units to collect, if known.
+        items_cap: maximum number of items the call will return, e.g. pages * page
+            size for a search with max_pages_retrieved.
+        total_from_page_info: read the number of items to collect from
+            pageInfo.totalResults of the first page.
+    """
+
+    def __init__(
+        self,
+        task: str,
+        unit: str = "units",
+        callback: Optional[Callable[[Progress], None]] = None,
+        units_total: Optional[int] = None,
+        items_cap: Optional[int] = None,
+        total_from_page_info: bool = False,
+    ):
+        self.callback = callback
+        self.items_cap = items_cap
+        self.total_from_page_info = total_from_page_info
+        self._start = time.perf_counter()
+        self._progress = Progress(task=task, unit=unit, units_total=units_total)
+
+    @property
+    def progress(self) -> Progress:
+        return replace(self._progress, elapsed=time.perf_counter() - self._start)
+
+    def page(self, data: dict) -> None:
+        """Count a page of results."""
+        p = self._progress
+        items_total = p.items_total
+        if self.total_from_page_info and items_total is None:
+            items_total = data.get("pageInfo", {}).get("totalResults")
+            if items_total is not None and self.items_cap:
+                items_total = min(items_total, self.items_cap)
+        self._progress = replace(
+            p,
+            pages=p.pages + 1,
+            items=p.items + len(data.get("items", [])),
+            items_total=items_total,
+        )
+        self._report()
+
+    def unit_done(self) -> None:
+        self._progress = replace(
+            self._progress, units_done=self._progress.units_done + 1
+        )
+        self._report()
+
+    def finish(self) -> None:
+        self._progress = replace(self._progress, finished=True)
+        self._report()
+
+    def _report(self) -> None:
+        if self.callback:
+            self.callback(self.progress)
+
+
+class LogProgress:
+    """Progress callback logging progress at most every `interval` seconds, and when
+    a call finishes.
+    """
+
+    def __init__(self, interval: float = 10.0):
+        self.interval = interval
+        self._last = time.monotonic()
+
+    def __call__(self, progress: Progress) -> None:
+        now = time.monotonic()
+        if progress.finished or now - self._last >= self.interval:
+            self._last = now
+            logger.info(str(progress))
@@ -0,0 +1,78 @@
+"""Compact alternatives to the resource models in youte.resources.
+
+A record has the same attributes as the corresponding model, e.g. VideoRecord and
+Video, but stores them in __slots__, without the per-instance dictionaries kept by
+pydantic, so that large collections take much less memory. Records are not validated.
+They can be exported and loaded into databases like resource objects.
+
+Use parse_videos(data, compact=True) and the other parser functions to get records.
+"""
+
+from __future__ import annotations
+
+from typing import Any, ClassVar, Dict, Iterator, Tuple, Type
+
+from youte.common import YouteClass, field_types
+from youte.resources import Channel, Comment, Search, Video
+
+
+class Record:
+    """Base class of records, with one slot per field of `model`."""
+
+    __slots__: Tuple[str, ...] = ()
+    model: ClassVar[Type[YouteClass]]
+
+    def __init__(self, **values: Any):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        """Yield (field, value) pairs, like pydantic models, so that dict(record)
+        works."""
+        for name in self.__slots__:
+            yield name, getattr(self, name)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self)
+        return f"{type(self).__name__}({fields})"
+
+    def dict(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def to_model(self) -> YouteClass:
+        """Return the resource object with the same values, validating them."""
+        return self.model(**dict(self))
+
+
+def _record_class(model: Type[YouteClass]) -> Type[Record]:
+    name = f"{model.__name__}Record"
+    return type(
+        name,
+        (Record,),
+        {
+            "__slots__": tuple(field_types(model)),
+            "__module__": __name__,
+            "__qualname__": name,
+            "__doc__": f"Compact {model.__name__}, see youte.resources."
+            f"{model.__name__}",
+            "model": model,
+        },
+    )
+
+
+SearchRecord = _record_class(Search)
+VideoRecord = _record_class(Video)
+ChannelRecord = _record_class(Channel)
+CommentRecord = _record_class(Comment)
+
+RECORDS: Dict[Type[YouteClass], Type[Record]] = {
+    Search: SearchRecord,
+    Video: VideoRecord,
+    Channel: ChannelRecord,
+    Comment: CommentRecord,
+}
@@ -0,0 +1,366 @@
+"""Where each attribute of the resources in youte.resources comes from in the data
+returned by YouTube API.
+
+Each Schema lists its fields in the order of the attributes of the resource model.
+A field has a path of keys separated by dots, e.g. "snippet.thumbnails.high.url".
+A key ending with "?" may be missing, in which case the field, and any key after it
+in the path, is None. A path starting with "@" begins at a root computed from each
+item instead of the item itself, and "@meta" is the youte metadata of the page.
+
+A Schema is compiled once into a function extracting the values of all fields from
+an item, with the lookups written out and shared prefixes looked up only once. The
+parsers, the CSV column order and the columns loaded into databases all follow
+these schemas.
+"""
+
+from __future__ import annotations
+
+import html
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type
+
+from youte.common import YouteClass
+from youte.resources import Channel, Comment, Search, Video
+from youte.timestamps import parse_rfc3339
+
+_EMPTY: Mapping = MappingProxyType({})
+
+Extractor = Callable[..., Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class Field:
+    """Attribute of a resource, and where to find it in an item.
+
+    Attributes:
+        name: name of the attribute.
+        path: keys leading to the value, separated by dots.
+        convert: function converting the value, if it is not None.
+        stored: whether the attribute is a column of the database table.
+        to_db: function converting the value before storing it in the database.
+        interned: whether the value is a string often repeated across items, e.g. a
+            channel ID, of which a single copy can be shared.
+        shared_with: name of an earlier field often equal to this one, e.g. the
+            displayed and original text of a comment, whose value is then shared.
+    """
+
+    name: str
+    path: str
+    convert: Optional[Callable[[Any], Any]] = None
+    stored: bool = True
+    to_db: Optional[Callable[[Any], Any]] = None
+    interned: bool = False
+    shared_with: Optional[str] = None
+
+
+@dataclass
+class Schema:
+    """Fields of a resource model, compiled into a function extracting them from
+    items.
+
+    Args:
+        model: resource model.
+        fields: fields, in the order of the attributes of the model.
+        roots: functions computing other starting points of paths from an item, by
+            name.
+    """
+
+    model: Type[YouteClass]
+    fields: List[Field]
+    roots: Dict[str, Callable[[dict], Mapping]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.names: List[str] = [f.name for f in self.fields]
+        self.stored: List[Field] = [f for f in self.fields if f.stored]
+        self.source: str = ""
+        self.extract: Extractor = self._compile()
+
+    def select(self, names: List[str]) -> Schema:
+        """Return a schema of some of the fields only, whose extract() skips the
+        lookups of the other fields.
+
+        Args:
+            names: names of the fields to keep.
+        """
+        fields = [
+            f if f.shared_with in names else replace(f, shared_with=None)
+            for f in self.fields
+            if f.name in names
+        ]
+        return Schema(self.model, fields, self.roots)
+
+    def _compile(self) -> Extractor:
+        """Write and compile the function extracting all fields from an item.
+
+        It takes an item, the metadata of its page and optionally a dictionary of
+        strings already seen, and returns a dictionary of attribute values. If the
+        dictionary is given, values of interned fields are replaced with the equal
+        string from it, or added to it, and fields equal to the field they are
+        shared with reuse its value.
+        """
+        namespace: Dict[str, Any] = {"_EMPTY": _EMPTY}
+        lines = ["def extract(item, meta, strings=None):"]
+        variables: Dict[Tuple[str, ...], str] = {("item",): "item", ("@meta",): "meta"}
+        for name, root in self.roots.items():
+            namespace[f"_root_{name}"] = root
+            variables[(f"@{name}",)] = f"root_{name}"
+            lines.append(f"    root_{name} = _root_{name}(item)")
+
+        values = []
+        interned = []
+        shared = []
+        locals_: Dict[str, str] = {}
+        referenced = {f.shared_with for f in self.fields if f.shared_with}
+        for i, f in enumerate(self.fields):
+            keys = f.path.split(".")
+            start = (keys.pop(0),) if keys[0].startswith("@") else ("item",)
+            expression = variables[start]
+            prefix = start
+            optional = False
+            for position, key in enumerate(keys):
+                optional = optional or key.endswith("?")
+                key = key.rstrip("?")
+                prefix += (key + "?" if optional else key,)
+                if position == len(keys) - 1:
+                    expression = (
+                        f"{expression}.get({key!r})"
+                        if optional
+                        else f"{expression}[{key!r}]"
+                    )
+                    break
+                if prefix not in variables:
+                    variables[prefix] = f"v{len(variables)}"
+                    lookup = (
+                        f"({expression}.get({key!r}) or _EMPTY)"
+                        if optional
+                        else f"{expression}[{key!r}]"
+                    )
+                    lines.append(f"    {variables[prefix]} = {lookup}")
+                expression = variables[prefix]
+
+            if f.convert is not None:
+                namespace[f"_convert{i}"] = f.convert
+                if optional:
+                    lines.append(f"    value{i} = {expression}")
+                    lines.append(f"    if value{i} is not None:")
+                    lines.append(f"        value{i} = _convert{i}(value{i})")
+                    expression = f"value{i}"
+                else:
+                    expression = f"_convert{i}({expression})"
+            if f.interned or f.shared_with or f.name in referenced:
+                if expression != f"value{i}":
+                    lines.append(f"    value{i} = {expression}")
+                    expression = f"value{i}"
+                locals_[f.name] = expression
+            if f.interned:
+                interned.append(expression)
+            if f.shared_with:
+                shared.append((expression, locals_[f.shared_with]))
+            values.append(f"        {f.name!r}: {expression},")
+
+        if interned or shared:
+            lines.append("    if strings is not None:")
+        if interned:
+            lines.append("        intern = strings.setdefault")
+            lines += [
+                f"        {value} = intern({value}, {value})" for value in interned
+            ]
+        for value, other in shared:
+            lines.append(f"        if {value} == {other}:")
+            lines.append(f"            {value} = {other}")
+        lines += ["    return {", *values, "    }"]
+        self.source = "\n".join(lines)
+        code = compile(self.source, f"<youte.schema {self.model.__name__}>", "exec")
+        exec(code, namespace)
+        return namespace["extract"]
+
+
+def _search_id(id_: dict) -> str:
+    """Return the ID of a video, channel or playlist found by a search"""
+    for key in id_:
+        if "id" in key or "Id" in key:
+            value = id_[key]
+    return value
+
+
+def _is_true(value: Any) -> bool:
+    return value is True
+
+
+def _list(string: Optional[str]) -> Optional[list]:
+    if string:
+        return string.split(" ")
+    else:
+        return string
+
+
+def _comment(item: dict) -> dict:
+    """Return the snippet of a reply, or of the top-level comment of a thread"""
+    snippet = item["snippet"]
+    if "topLevelComment" in snippet:
+        return snippet["topLevelComment"]["snippet"]
+    return snippet
+
+
+def _thread(item: dict) -> Mapping:
+    """Return the snippet of a comment thread, or nothing for a reply"""
+    snippet = item["snippet"]
+    return snippet if "topLevelComment" in snippet else _EMPTY
+
+
+SEARCH = Schema(
+    Search,
+    [
+        Field("kind", "id.kind", interned=True),
+        Field("id", "id", _search_id),
+        Field("published_at", "snippet.publishedAt", parse_rfc3339),
+        Field("title", "snippet.title", html.unescape),
+        Field("description", "snippet.description"),
+        Field("channel_id", "snippet.channelId", interned=True),
+        Field("thumbnail_url", "snippet.thumbnails.high.url", stored=False),
+        Field("thumbnail_width", "snippet.thumbnails.high.width?"),
+        Field("thumbnail_height", "snippet.thumbnails.high.height?"),
+        Field("channel_title", "snippet.channelTitle?", interned=True),
+        Field("live_broadcast_content", "snippet.liveBroadcastContent", interned=True),
+        Field("meta", "@meta", stored=False),
+    ],
+)
+
+VIDEO = Schema(
+    Video,
+    [
+        Field("kind", "kind", interned=True),
+        Field("id", "id"),
+        Field("published_at", "snippet.publishedAt", parse_rfc3339),
+        Field("channel_id", "snippet.channelId", interned=True),
+        Field("title", "snippet.title"),
+        Field("description", "snippet.description"),
+        Field("thumbnail_url", "snippet.thumbnails.high.url"),
+        Field("thumbnail_width", "snippet.thumbnails.high.width"),
+        Field("thumbnail_height", "snippet.thumbnails.high.height"),
+        Field("channel_title", "snippet.channelTitle", interned=True),
+        Field("tags", "snippet.tags?", to_db=str),
+        Field("category_id", "snippet.categoryId", interned=True),
+        Field("localized_title", "snippet.localized.title", shared_with="title"),
+        Field(
+            "localized_description",
+            "snippet.localized.description",
+            shared_with="description",
+        ),
+        Field("default_language", "snippet.defaultLanguage?", interned=True),
+        Field("default_audio_language", "snippet.defaultAudioLanguage?", interned=True),
+        Field("duration", "contentDetails.duration?"),
+        Field("dimension", "contentDetails.dimension", interned=True),
+        Field("definition", "contentDetails.definition", interned=True),
+        Field("caption", "contentDetails.caption", _is_true),
+        Field("licensed_content", "contentDetails.licensedContent"),
+        Field("projection", "contentDetails.projection", interned=True),
+        Field("upload_status", "status.uploadStatus", interned=True),
+        Field("privacy_status", "status.privacyStatus", interned=True),
+        Field("license", "status.license", interned=True),
+        Field("embeddable", "status.embeddable"),
+        Field("public_stats_viewable", "status.publicStatsViewable"),
+        Field("made_for_kids", "status.madeForKids"),
+        Field("view_count", "statistics.viewCount?", int),
+        Field("like_count", "statistics.likeCount?", int),
+        Field("comment_count", "statistics.commentCount?", int),
+        Field("topic_categories", "topicDetails?.topicCategories", to_db=str),
+        Field(
+            "live_streaming_start_actual",
+            "liveStreamingDetails?.actualStartTime",
+            parse_rfc3339,
+        ),
+        Field(
+            "live_streaming_end_actual",
+            "liveStreamingDetails?.actualEndTime",
+            parse_rfc3339,
+        ),
+        Field(
+            "live_streaming_start_scheduled",
+            "liveStreamingDetails?.scheduledStartTime",
+            parse_rfc3339,
+        ),
+        Field(
+            "live_streaming_end_scheduled",
+            "liveStreamingDetails?.scheduledEndTime",
+            parse_rfc3339,
+        ),
+        Field(
+            "live_streaming_concurrent_viewers",
+            "liveStreamingDetails?.concurrentViewers",
+            int,
+        ),
+        Field("meta", "@meta", stored=False),
+    ],
+)
+
+CHANNEL = Schema(
+    Channel,
+    [
+        Field("kind", "kind", interned=True),
+        Field("id", "id"),
+        Field("title", "snippet.title"),
+        Field("description", "snippet.description"),
+        Field("custom_url", "snippet.customUrl?"),
+        Field("published_at", "snippet.publishedAt", parse_rfc3339),
+        Field("thumbnail_url", "snippet.thumbnails.high.url"),
+        Field("thumbnail_height", "snippet.thumbnails.high.height"),
+        Field("thumbnail_width", "snippet.thumbnails.high.width"),
+        Field("default_language", "snippet.defaultLanguage?", interned=True),
+        Field("localized_title", "snippet.localized.title", shared_with="title"),
+        Field(
+            "localized_description",
+            "snippet.localized.description",
+            shared_with="description",
+        ),
+        Field("country", "brandingSettings.channel.country?", interned=True),
+        Field("view_count", "statistics.viewCount"),
+        Field("subscriber_count", "statistics.subscriberCount"),
+        Field("hidden_subscriber_count", "statistics.hiddenSubscriberCount"),
+        Field("video_count", "statistics.videoCount", int),
+        Field("topic_categories", "topicDetails?.topicCategories", to_db=str),
+        Field("privacy_status", "status.privacyStatus", interned=True),
+        Field("is_linked", "status.isLinked"),
+        Field("made_for_kids", "status.madeForKids?"),
+        Field(
+            "branding_keywords", "brandingSettings.channel.keywords?", _list, to_db=str
+        ),
+        Field("moderated_comments", "brandingSettings.channel.moderatedComments?"),
+        Field("meta", "@meta", stored=False),
+    ],
+)
+
+COMMENT = Schema(
+    Comment,
+    [
+        Field("id", "id"),
+        Field("video_id", "@comment.videoId?", interned=True),
+        Field("parent_id", "@comment.parentId?", interned=True),
+        Field("can_reply", "@thread.canReply?"),
+        Field("total_reply_count", "@thread.totalReplyCount?"),
+        Field("is_public", "@thread.isPublic?"),
+        Field("author_display_name", "@comment.authorDisplayName", interned=True),
+        Field(
+            "author_profile_image_url", "@comment.authorProfileImageUrl", interned=True
+        ),
+        Field("author_channel_url", "@comment.authorChannelUrl", interned=True),
+        Field("author_channel_id", "@comment.authorChannelId?.value", interned=True),
+        Field("text_display", "@comment.textDisplay"),
+        Field("text_original", "@comment.textOriginal", shared_with="text_display"),
+        Field("can_rate", "@comment.canRate"),
+        Field("viewer_rating", "@comment.viewerRating", interned=True),
+        Field("like_count", "@comment.likeCount"),
+        Field("published_at", "@comment.publishedAt", parse_rfc3339),
+        Field("updated_at", "@comment.updatedAt", parse_rfc3339),
+        Field("meta", "@meta", stored=False),
+    ],
+    roots={"comment": _comment, "thread": _thread},
+)
+
+SCHEMAS: Dict[Type[YouteClass], Schema] = {
+    Search: SEARCH,
+    Video: VIDEO,
+    Channel: CHANNEL,
+    Comment: COMMENT,
+}
@@ -0,0 +1,430 @@
+"""A local server mimicking YouTube Data API, to test and load test youte without
+touching Google.
+
+Start it from the command line:
+
+    python -m youte.stub --port 8000 --latency 0.2 --jitter 0.1 --error-rate 0.01
+
+then point Youte at it with Youte(api_key="any", base_url="http://127.0.0.1:8000").
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import click
+
+from youte.metrics import QUOTA_COSTS
+from youte.synthetic import (
+    make_channel,
+    make_comment_thread,
+    make_id,
+    make_reply,
+    make_search_result,
+    make_video,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _StubError(Exception):
+    def __init__(self, status: int, reason: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.message = message
+
+    def body(self) -> dict:
+        return {
+            "error": {
+                "code": self.status,
+                "message": self.message,
+                "errors": [
+                    {
+                        "message": self.message,
+                        "domain": "youtube",
+                        "reason": self.reason,
+                    }
+                ],
+            }
+        }
+
+
+@dataclass
+class StubConfig:
+    """Settings of a StubServer.
+
+    Attributes:
+        latency: seconds added to every request.
+        jitter: up to this many seconds are randomly added on top of latency.
+        error_rate: share of requests answered with a 500 backendError.
+        quota: quota units available before requests fail with quotaExceeded.
+            Unlimited if None.
+        videos: number of videos in the corpus.
+        channels: number of channels the videos belong to.
+        search_results: number of results for any search, capped at videos.
+        threads_per_video: average number of comment threads on a video.
+        replies_per_thread: average number of replies to a comment thread.
+        comments_disabled_rate: share of videos with comments disabled.
+        seed: seed for generating the corpus.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    quota: Optional[int] = None
+    videos: int = 1000
+    channels: int = 100
+    search_results: int = 500
+    threads_per_video: int = 50
+    replies_per_thread: int = 1
+    comments_disabled_rate: float = 0.0
+    seed: int = 0
+
+
+@dataclass
+class StubStats:
+    requests: dict = field(default_factory=dict)
+    errors: int = 0
+    quota_used: int = 0
+
+
+class StubServer:
+    """A local HTTP server serving a synthetic corpus through the same endpoints as
+    YouTube Data API v3: /search, /videos, /channels, /commentThreads and /comments.
+
+    Pagination tokens, 50-ID batches, quota and error responses work as they do in the
+    API. Use it as a context manager to run it in a background thread:
+
+        with StubServer(StubConfig(latency=0.1)) as server:
+            yt = Youte(api_key="any", base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        config: Optional[StubConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.config = config if config else StubConfig()
+        self.stats = StubStats()
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self  # type: ignore
+        self._thread: Optional[threading.Thread] = None
+
+        self.video_ids = [
+            make_id("video", n, seed=self.config.seed)
+            for n in range(self.config.videos)
+        ]
+        self.channel_ids = [
+            "UC" + make_id("channel", n, 22, self.config.seed)
+            for n in range(self.config.channels)
+        ]
+        self._channel_of = {
+            video_id: self.channel_ids[n % self.config.channels]
+            for n, video_id in enumerate(self.video_ids)
+        }
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> StubServer:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Stub YouTube API listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def __enter__(self) -> StubServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def handle(self, endpoint: str, params: dict[str, str]) -> dict:
+        """Answer a request to an endpoint. Raises _StubError for error responses."""
+        handlers: dict[str, Callable[[dict], dict]] = {
+            "search": self._search,
+            "videos": self._videos,
+            "channels": self._channels,
+            "commentThreads": self._comment_threads,
+            "comments": self._comments,
+        }
+        if endpoint not in handlers:
+            raise _StubError(404, "notFound", f"Endpoint {endpoint} not found")
+
+        with self._lock:
+            self.stats.requests[endpoint] = self.stats.requests.get(endpoint, 0) + 1
+            delay = self.config.latency + self._random.uniform(0, self.config.jitter)
+            failed = self._random.random() < self.config.error_rate
+            quota = self.config.quota
+            if quota is not None and self.stats.quota_used >= quota:
+                raise _StubError(
+                    403,
+                    "quotaExceeded",
+                    "The request cannot be completed because you have exceeded your "
+                    "quota.",
+                )
+            if not failed:
+                self.stats.quota_used += QUOTA_COSTS[endpoint]
+            else:
+                self.stats.errors += 1
+
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise _StubError(500, "backendError", "Backend Error")
+
+        return handlers[endpoint](params)
+
+    def _page(
+        self,
+        kind: str,
+        params: dict,
+        total: int,
+        make_item: Callable[[int], dict],
+        max_allowed: int,
+    ) -> dict:
+        max_results = int(params.get("maxResults", 5))
+        if not 0 <= max_results <= max_allowed:
+            raise _StubError(
+                400,
+                "invalidParameter",
+                f"maxResults has to be between 0 and {max_allowed}",
+            )
+        token = params.get("pageToken")
+        try:
+            offset = int(token[1:]) if token else 0
+        except ValueError:
+            raise _StubError(400, "invalidPageToken", "Invalid page token")
+
+        end = min(offset + max_results, total)
+        page = {
+            "kind": f"youtube#{kind}ListResponse",
+            "etag": make_id("etag", f"{kind}:{offset}", 27, self.config.seed),
+            "pageInfo": {"totalResults": total, "resultsPerPage": max_results},
+            "items": [make_item(i) for i in range(offset, end)],
+        }
+        if end < total:
+            page["nextPageToken"] = f"p{end}"
+        if offset:
+            page["prevPageToken"] = f"p{offset}"
+        return page
+
+    def _ids(self, params: dict, name: str = "id") -> list[str]:
+        ids = [id_ for id_ in params.get(name, "").split(",") if id_]
+        if len(ids) > 50:
+            raise _StubError(
+                400, "invalidParameter", f"No more than 50 values allowed in {name}"
+            )
+        return ids
+
+    def _search(self, params: dict) -> dict:
+        total = min(self.config.search_results, len(self.video_ids))
+        page = self._page(
+            "search",
+            params,
+            total,
+            lambda i: make_search_result(
+                self.video_ids[i],
+                self._channel_of[self.video_ids[i]],
+                self.config.seed,
+            ),
+            max_allowed=50,
+        )
+        page["regionCode"] = params.get("regionCode") or "US"
+        return page
+
+    def _videos(self, params: dict) -> dict:
+        if params.get("chart") == "mostPopular":
+            return self._page(
+                "video",
+                params,
+                min(200, len(self.video_ids)),
+                lambda i: make_video(
+                    self.video_ids[i],
+                    self._channel_of[self.video_ids[i]],
+                    self.config.seed,
+                ),
+                max_allowed=50,
+            )
+
+        ids = [id_ for id_ in self._ids(params) if id_ in self._channel_of]
+        return self._page(
+            "video",
+            {**params, "maxResults": 50},
+            len(ids),
+            lambda i: make_video(ids[i], self._channel_of[ids[i]], self.config.seed),
+            max_allowed=50,
+        )
+
+    def _channels(self, params: dict) -> dict:
+        if "forHandle" in params:
+            handle = params["forHandle"].lstrip("@").lower()
+            ids = [id_ for id_ in self.channel_ids if id_.lower() == handle]
+        else:
+            known = set(self.channel_ids)
+            ids = [id_ for id_ in self._ids(params) if id_ in known]
+        return self._page(
+            "channel",
+            {**params, "maxResults": 50},
+            len(ids),
+            lambda i: make_channel(ids[i], self.config.seed),
+            max_allowed=50,
+        )
+
+    def n_threads(self, video_id: str) -> int:
+        """Number of comment threads on a video, or -1 if comments are disabled."""
+        rng = random.Random(f"{self.config.seed}:threads:{video_id}")
+        if rng.random() < self.config.comments_disabled_rate:
+            return -1
+        return rng.randint(0, 2 * self.config.threads_per_video)
+
+    def n_replies(self, thread_id: str) -> int:
+        # 30% of threads have replies, averaging replies_per_thread over all threads
+        rng = random.Random(f"{self.config.seed}:replies:{thread_id}")
+        if rng.random() < 0.7 or not self.config.replies_per_thread:
+            return 0
+        return rng.randint(1, max(round(self.config.replies_per_thread / 0.15) - 1, 1))
+
+    def _make_thread(self, video_id: str, n: int) -> dict:
+        thread_id = f"Ug{video_id}{n:06d}"
+        return make_comment_thread(
+            thread_id,
+            video_id,
+            self._channel_of[video_id],
+            self.n_replies(thread_id),
+            self.config.seed,
+        )
+
+    def _comment_threads(self, params: dict) -> dict:
+        if "videoId" in params:
+            video_id = params["videoId"]
+            if video_id not in self._channel_of:
+                raise _StubError(404, "videoNotFound", "Video not found")
+            total = self.n_threads(video_id)
+            if total < 0:
+                raise _StubError(403, "commentsDisabled", "Comments are disabled")
+            return self._page(
+                "commentThread",
+                params,
+                total,
+                lambda i: self._make_thread(video_id, i),
+                max_allowed=100,
+            )
+
+        if "allThreadsRelatedToChannelId" in params:
+            channel_id = params["allThreadsRelatedToChannelId"]
+            threads = [
+                (video_id, n)
+                for video_id in self.video_ids
+                if self._channel_of[video_id] == channel_id
+                for n in range(max(self.n_threads(video_id), 0))
+            ]
+            return self._page(
+                "commentThread",
+                params,
+                len(threads),
+                lambda i: self._make_thread(*threads[i]),
+                max_allowed=100,
+            )
+
+        threads = [
+            (thread_id[2:13], int(thread_id[13:]))
+            for thread_id in self._ids(params)
+            if thread_id[2:13] in self._channel_of
+        ]
+        return self._page(
+            "commentThread",
+            {**params, "maxResults": 50},
+            len(threads),
+            lambda i: self._make_thread(*threads[i]),
+            max_allowed=50,
+        )
+
+    def _comments(self, params: dict) -> dict:
+        parent_id = params.get("parentId", "")
+        video_id = parent_id[2:13]
+        if video_id not in self._channel_of:
+            raise _StubError(404, "commentNotFound", "Comment not found")
+        return self._page(
+            "comment",
+            params,
+            self.n_replies(parent_id),
+            lambda i: make_reply(
+                f"{parent_id}.{make_id('reply', i, 22, self.config.seed)}",
+                parent_id,
+                self._channel_of[video_id],
+                self.config.seed,
+            ),
+            max_allowed=100,
+        )
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        try:
+            status, body = 200, self.server.stub.handle(endpoint, params)  # type: ignore
+        except _StubError as e:
+            status, body = e.status, e.body()
+
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8000, show_default=True)
+@click.option("--latency", default=0.0, help="Seconds added to every request")
+@click.option("--jitter", default=0.0, help="Random extra seconds per request")
+@click.option("--error-rate", default=0.0, help="Share of requests failing with 500")
+@click.option("--quota", type=click.INT, help="Quota units before quotaExceeded")
+@click.option("--videos", default=1000, show_default=True, help="Corpus size")
+@click.option("--channels", default=100, show_default=True)
+@click.option("--threads-per-video", default=50, show_default=True)
+@click.option("--replies-per-thread", default=1, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+def main(host: str, port: int, **kwargs) -> None:
+    """Run a local server mimicking YouTube Data API"""
+    logging.basicConfig(level=logging.INFO)
+    server = StubServer(StubConfig(**kwargs), host=host, port=port)
+    click.echo(f"Serving stub YouTube API on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+"""Fake YouTube resources and result pages shaped like YouTube Data API responses.
+
+Resources made by the make_* functions are generated from their ID, so the same ID
+always gives the same resource for a given seed. generate_pages() and write_corpus()
+produce whole corpora of result pages, e.g. to benchmark parsing and exporting:
+
+    python -m youte.synthetic comments.jsonl.gz --kind comment --pages 100000
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import random
+import string
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Literal, Optional, Tuple
+
+import click
+
+from youte.version import user_agent, version
+
+logger = logging.getLogger(__name__)
+
+PageKind = Literal["search", "video", "channel", "comment", "reply"]
+
+_ID_CHARS = string.ascii_letters + string.digits + "-_"
+_EPOCH = datetime(2010, 1, 1, tzinfo=timezone.utc)
+_WORDS = (
+    "the of and to in is you that it he was for on are as with his they at be this "
+    "have from or one had by word but not what all were we when your can said there "
+    "use an each which she do how their if will up other about out many then them "
+    "these so some her would make like him into time has look two more write go see "
+    "number no way could people my than first water been call who oil its now find "
+    "long down day did get come made may part video music news live review reaction "
+    "Việt Nam ngày đẹp trời 日本語 のビデオ 🎉 😂 ❤️ &amp; &quot;quoted&quot; <br>"
+).split()
+
+
+@dataclass
+class CorpusSpec:
+    """Size distributions of generated resources.
+
+    Word counts are drawn uniformly between the (min, max) bounds.
+
+    Attributes:
+        title_words: number of words in video titles.
+        description_words: number of words in video and channel descriptions.
+        comment_words: number of words in comments.
+        tags: number of tags on a video.
+        reply_rate: share of comment threads with replies.
+        mean_replies: average number of replies to threads with replies.
+        view_alpha: shape of the Pareto distribution of view counts. Lower is
+            more skewed.
+        live_rate: share of videos that were live streams.
+        authors: number of distinct comment authors.
+        channels: number of distinct channels.
+    """
+
+    title_words: Tuple[int, int] = (3, 12)
+    description_words: Tuple[int, int] = (0, 200)
+    comment_words: Tuple[int, int] = (1, 60)
+    tags: Tuple[int, int] = (0, 15)
+    reply_rate: float = 0.3
+    mean_replies: float = 3.0
+    view_alpha: float = 1.2
+    live_rate: float = 0.02
+    authors: int = 100_000
+    channels: int = 1_000
+
+
+DEFAULT_SPEC = CorpusSpec()
+
+
+def make_id(prefix: str, key: int | str, length: int = 11, seed: int = 0) -> str:
+    """Deterministic ID of `length` characters looking like a YouTube ID."""
+    digest = hashlib.sha1(f"{seed}:{prefix}:{key}".encode("utf-8")).digest()
+    return "".join(_ID_CHARS[b % len(_ID_CHARS)] for b in digest)[:length]
+
+
+def _rng(seed: int, id_: str) -> random.Random:
+    return random.Random(f"{seed}:{id_}")
+
+
+def _text(rng: random.Random, bounds: Tuple[int, int]) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(*bounds)))
+
+
+def _timestamp(rng: random.Random, fractional: bool = False) -> str:
+    moment = _EPOCH + timedelta(seconds=rng.randrange(0, 14 * 365 * 24 * 3600))
+    if fractional:
+        return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{rng.randrange(10**6):06d}Z"
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _thumbnails(id_: str) -> dict:
+    return {
+        size: {
+            "url": f"https://i.ytimg.com/vi/{id_}/{size}.jpg",
+            "width": width,
+            "height": height,
+        }
+        for size, width, height in (
+            ("default", 120, 90),
+            ("medium", 320, 180),
+            ("high", 480, 360),
+        )
+    }
+
+
+def make_search_result(
+    video_id: str,
+    channel_id: str,
+    seed: int = 0,
+    spec: CorpusSpec = DEFAULT_SPEC,
+    rng: Optional[random.Random] = None,
+) -> dict:
+    rng = rng if rng else _rng(seed, video_id)
+    published_at = _timestamp(rng)
+    return {
+        "kind": "youtube#searchResult",
+        "etag": make_id("etag", video_id, 27, seed),
+        "id": {"kind": "youtube#video", "videoId": video_id},
+        "snippet": {
+            "publishedAt": published_at,
+            "channelId": channel_id,
+            "title": _text(rng, spec.title_words),
+            "description": _text(rng, (0, min(spec.description_words[1], 30))),
+            "thumbnails": _thumbnails(video_id),
+            "channelTitle": f"Channel {channel_id}",
+            "liveBroadcastContent": "none",
+            "publishTime": published_at,
+        },
+    }
+
+
+def make_video(
+    video_id: str,
+    channel_id: str,
+    seed: int = 0,
+    spec: CorpusSpec = DEFAULT_SPEC,
+    rng: Optional[random.Random] = None,
+) -> dict:
+    rng = rng if rng else _rng(seed, video_id)
+    title = _text(rng, spec.title_words)
+    description = _text(rng, spec.description_words)
+    views = int(rng.paretovariate(spec.view_alpha) * 100)
+    video = {
+        "kind": "youtube#video",
+        "etag": make_id("etag", video_id, 27, seed),
+        "id": video_id,
+        "snippet": {
+            "publishedAt": _timestamp(rng),
+            "channelId": channel_id,
+            "title": title,
+            "description": description,
+            "thumbnails": _thumbnails(video_id),
+            "channelTitle": f"Channel {channel_id}",
+            "tags": [rng.choice(_WORDS) for _ in range(rng.randint(*spec.tags))],
+            "categoryId": str(rng.choice((1, 10, 17, 20, 22, 24, 25, 27, 28))),
+            "liveBroadcastContent": "none",
+            "defaultAudioLanguage": rng.choice(("en", "en-US", "vi", "fr")),
+            "localized": {"title": title, "description": description},
+        },
+        "contentDetails": {
+            "duration": f"PT{rng.randint(0, 59)}M{rng.randint(0, 59)}S",
+            "dimension": "2d",
+            "definition": rng.choice(("hd", "sd")),
+            "caption": rng.choice(("true", "false")),
+            "licensedContent": rng.random() < 0.5,
+            "contentRating": {},
+            "projection": "rectangular",
+        },
+        "status": {
+            "uploadStatus": "processed",
+            "privacyStatus": "public",
+            "license": rng.choice(("youtube", "creativeCommon")),
+            "embeddable": True,
+            "publicStatsViewable": True,
+            "madeForKids": rng.random() < 0.05,
+        },
+        "statistics": {
+            "viewCount": str(views),
+            "likeCount": str(views // rng.randint(10, 100)),
+            "favoriteCount": "0",
+            "commentCount": str(views // rng.randint(50, 500)),
+        },
+        "topicDetails": {
+            "topicCategories": ["https://en.wikipedia.org/wiki/Entertainment"]
+        },
+    }
+    if rng.random() < spec.live_rate:
+        start = _timestamp(rng)
+        video["liveStreamingDetails"] = {
+            "actualStartTime": start,
+            "actualEndTime": start,
+            "scheduledStartTime": start,
+            "concurrentViewers": str(rng.randint(0, 10000)),
+        }
+    return video
+
+
+def make_channel(
+    channel_id: str,
+    seed: int = 0,
+    spec: CorpusSpec = DEFAULT_SPEC,
+    rng: Optional[random.Random] = None,
+) -> dict:
+    rng = rng if rng else _rng(seed, channel_id)
+    title = f"Channel {channel_id}"
+    description = _text(rng, spec.description_words)
+    return {
+        "kind": "youtube#channel",
+        "etag": make_id("etag", channel_id, 27, seed),
+        "id": channel_id,
+        "snippet": {
+            "title": title,
+            "description": description,
+            "customUrl": f"@{channel_id.lower()}",
+            "publishedAt": _timestamp(rng, fractional=rng.random() < 0.5),
+            "thumbnails": _thumbnails(channel_id),
+            "localized": {"title": title, "description": description},
+            "country": rng.choice(("US", "AU", "VN", "GB")),
+        },
+        "contentDetails": {"relatedPlaylists": {"likes": "", "uploads": channel_id}},
+        "statistics": {
+            "viewCount": str(rng.randint(0, 10**9)),
+            "subscriberCount": str(rng.randint(0, 10**7)),
+            "hiddenSubscriberCount": False,
+            "videoCount": str(rng.randint(0, 5000)),
+        },
+        "topicDetails": {"topicCategories": ["https://en.wikipedia.org/wiki/Society"]},
+        "status": {
+            "privacyStatus": "public",
+            "isLinked": True,
+            "longUploadsStatus": "longUploadsUnspecified",
+            "madeForKids": False,
+        },
+        "brandingSettings": {
+            "channel": {
+                "title": title,
+                "description": description,
+                "keywords": " ".join(rng.choice(_WORDS) for _ in range(5)),
+                "country": "US",
+            }
+        },
+    }
+
+
+def _comment_snippet(
+    comment_id: str,
+    video_id: str | None,
+    channel_id: str,
+    seed: int,
+    spec: CorpusSpec,
+    rng: Optional[random.Random],
+) -> dict:
+    rng = rng if rng else _rng(seed, comment_id)
+    author = make_id("author", rng.randrange(spec.authors), 22, seed)
+    text = _text(rng, spec.comment_words)
+    published_at = _timestamp(rng)
+    snippet = {
+        "channelId": channel_id,
+        "textDisplay": text,
+        "textOriginal": text,
+        "authorDisplayName": f"@user-{author[:8].lower()}",
+        "authorProfileImageUrl": f"https://yt3.ggpht.com/{author}=s48-c-k-c0x00ffffff",
+        "authorChannelUrl": f"http://www.youtube.com/@user-{author[:8].lower()}",
+        "authorChannelId": {"value": f"UC{author}"},
+        "canRate": True,
+        "viewerRating": "none",
+        "likeCount": int(rng.paretovariate(1.5)) - 1,
+        "publishedAt": published_at,
+        "updatedAt": published_at,
+    }
+    if video_id:
+        snippet = {"videoId": video_id, **snippet}
+    return snippet
+
+
+def make_comment_thread(
+    thread_id: str,
+    video_id: str,
+    channel_id: str,
+    total_reply_count: int,
+    seed: int = 0,
+    spec: CorpusSpec = DEFAULT_SPEC,
+    rng: Optional[random.Random] = None,
+) -> dict:
+    return {
+        "kind": "youtube#commentThread",
+        "etag": make_id("etag", thread_id, 27, seed),
+        "id": thread_id,
+        "snippet": {
+            "channelId": channel_id,
+            "videoId": video_id,
+            "topLevelComment": {
+                "kind": "youtube#comment",
+                "etag": make_id("etag", f"{thread_id}.top", 27, seed),
+                "id": thread_id,
+                "snippet": _comment_snippet(
+                    thread_id, video_id, channel_id, seed, spec, rng
+                ),
+            },
+            "canReply": True,
+            "totalReplyCount": total_reply_count,
+            "isPublic": True,
+        },
+    }
+
+
+def make_reply(
+    reply_id: str,
+    parent_id: str,
+    channel_id: str,
+    seed: int = 0,
+    spec: CorpusSpec = DEFAULT_SPEC,
+    rng: Optional[random.Random] = None,
+) -> dict:
+    snippet = _comment_snippet(reply_id, None, channel_id, seed, spec, rng)
+    snippet["parentId"] = parent_id
+    return {
+        "kind": "youtube#comment",
+        "etag": make_id("etag", reply_id, 27, seed),
+        "id": reply_id,
+        "snippet": snippet,
+    }
+
+
+_LIST_KINDS = {
+    "search": "youtube#searchListResponse",
+    "video": "youtube#videoListResponse",
+    "channel": "youtube#channelListResponse",
+    "comment": "youtube#commentThreadListResponse",
+    "reply": "youtube#commentListResponse",
+}
+
+
+def generate_pages(
+    kind: PageKind,
+    pages: int,
+    items_per_page: int = 50,
+    seed: int = 0,
+    spec: CorpusSpec = DEFAULT_SPEC,
+    include_meta: bool = True,
+) -> Iterator[dict]:
+    """Generate result pages as returned by Youte.
+
+    Args:
+        kind: "search", "video", "channel", "comment" (comment threads) or "reply".
+        pages: number of pages to generate.
+        items_per_page: number of items in each page.
+        seed: the same seed always gives the same pages.
+        spec: size distributions of the generated resources.
+        include_meta: include `_youte` metadata, as Youte does by default.
+
+    Yields:
+        Dict mappings shaped like API responses.
+    """
+    if kind not in _LIST_KINDS:
+        raise ValueError(f"kind has to be one of {tuple(_LIST_KINDS)}")
+
+    rng = random.Random(seed)
+    channel_ids = ["UC" + make_id("channel", n, 22, seed) for n in range(spec.channels)]
+    collected_at = _EPOCH + timedelta(days=5000)
+
+    for n in range(pages):
+        items = []
+        for i in range(items_per_page):
+            key = n * items_per_page + i
+            channel_id = rng.choice(channel_ids)
+            if kind == "search":
+                video_id = make_id("video", key, seed=seed)
+                items.append(make_search_result(video_id, channel_id, seed, spec, rng))
+            elif kind == "video":
+                video_id = make_id("video", key, seed=seed)
+                items.append(make_video(video_id, channel_id, seed, spec, rng))
+            elif kind == "channel":
+                items.append(
+                    make_channel(channel_ids[key % spec.channels], seed, spec, rng)
+                )
+            elif kind == "comment":
+                replies = 0
+                if rng.random() < spec.reply_rate:
+                    replies = 1 + int(
+                        rng.expovariate(1 / max(spec.mean_replies - 1, 1))
+                    )
+                video_id = make_id("video", key // 100, seed=seed)
+                thread_id = "Ug" + make_id("thread", key, 24, seed)
+                items.append(
+                    make_comment_thread(
+                        thread_id, video_id, channel_id, replies, seed, spec, rng
+                    )
+                )
+            elif kind == "reply":
+                parent_id = "Ug" + make_id("thread", key // 5, 24, seed)
+                reply_id = f"{parent_id}.{make_id('reply', key, 22, seed)}"
+                items.append(
+                    make_reply(reply_id, parent_id, channel_id, seed, spec, rng)
+                )
+
+        page = {
+            "kind": _LIST_KINDS[kind],
+            "etag": make_id("etag", f"{kind}:{n}", 27, seed),
+            "pageInfo": {
+                "totalResults": pages * items_per_page,
+                "resultsPerPage": items_per_page,
+            },
+            "items": items,
+        }
+        if n + 1 < pages:
+            page["nextPageToken"] = make_id("page", f"{kind}:{n}", 12, seed)
+        if include_meta:
+            page["_youte"] = {
+                "version": version,
+                "collected_at": str(collected_at + timedelta(seconds=n)),
+                "user_agent": user_agent,
+            }
+        yield page
+
+
+def write_corpus(
+    filepath: str | Path,
+    kind: PageKind,
+    pages: int,
+    items_per_page: int = 50,
+    seed: int = 0,
+    spec: CorpusSpec = DEFAULT_SPEC,
+    include_meta: bool = True,
+) -> Path:
+    """Write generated pages to a file, one page at a time.
+
+    The format is given by the file name: .json for a JSON array of pages, .jsonl
+    for one page per line. Add .gz to compress the file with gzip, e.g.
+    comments.jsonl.gz.
+
+    Returns:
+        Path to the written file.
+    """
+    filepath = Path(filepath)
+    suffixes = filepath.suffixes
+    compressed = suffixes[-1:] == [".gz"]
+    file_format = suffixes[-2] if compressed and len(suffixes) > 1 else filepath.suffix
+    if file_format not in (".json", ".jsonl"):
+        raise ValueError("File name must end in .json, .jsonl, .json.gz or .jsonl.gz")
+
+    generated = generate_pages(kind, pages, items_per_page, seed, spec, include_meta)
+    with (
+        gzip.open(filepath, "wt", encoding="utf-8", compresslevel=6)
+        if compressed
+        else open(filepath, "w", encoding="utf-8")
+    ) as f:
+        if file_format == ".jsonl":
+            for page in generated:
+                f.write(json.dumps(page, ensure_ascii=False) + "\n")
+        else:
+            f.write("[")
+            for n, page in enumerate(generated):
+                if n:
+                    f.write(",\n")
+                f.write(json.dumps(page, ensure_ascii=False))
+            f.write("]\n")
+
+    logger.info(f"Wrote {pages} {kind} pages to {filepath}")
+    return filepath
+
+
+@click.command()
+@click.argument("output", type=click.Path())
+@click.option(
+    "--kind",
+    type=click.Choice(list(_LIST_KINDS)),
+    default="comment",
+    show_default=True,
+)
+@click.option("--pages", default=1000, show_default=True)
+@click.option("--items-per-page", default=50, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+@click.option("--comment-words", nargs=2, type=int, default=DEFAULT_SPEC.comment_words)
+@click.option(
+    "--description-words", nargs=2, type=int, default=DEFAULT_SPEC.description_words
+)
+@click.option("--tags", nargs=2, type=int, default=DEFAULT_SPEC.tags)
+@click.option("--reply-rate", default=DEFAULT_SPEC.reply_rate, show_default=True)
+@click.option("--mean-replies", default=DEFAULT_SPEC.mean_replies, show_default=True)
+@click.option("--no-metadata", is_flag=True, help="Leave out `_youte` metadata")
+def main(
+    output: str,
+    kind: PageKind,
+    pages: int,
+    items_per_page: int,
+    seed: int,
+    no_metadata: bool,
+    **distributions,
+) -> None:
+    """Write a synthetic corpus of API result pages to OUTPUT
+
+    OUTPUT: .json, .jsonl, .json.gz or .jsonl.gz file
+    """
+    spec = CorpusSpec(**distributions)
+    write_corpus(output, kind, pages, items_per_page, seed, spec, not no_metadata)
+    click.echo(f"{pages * items_per_page} {kind} items written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Columnar tables of parsed resources.
+
+A Table stores each field of a resource model in its own column instead of creating
+one object per item. Counts, flags and timestamps are kept in typed arrays, which
+NumPy and Arrow can use without copying them. Text fields are kept in lists.
+
+Columns are derived from the fields of the models in youte.resources, so a Table of
+videos has the same column names and types as Video objects.
+"""
+
+from __future__ import annotations
+
+import importlib
+import typing
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from youte.common import YouteClass, construct, field_types
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _import(module: str) -> Any:
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        package = module.split(".")[0]
+        raise ImportError(
+            f"{package} is required for this, run pip install {package}"
+        ) from e
+
+
+class Column:
+    """Column of Python objects, e.g. strings or lists of strings."""
+
+    arrow_type: Optional[str] = None
+
+    def __init__(self) -> None:
+        self.values: list = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, value: Any) -> None:
+        self.values.append(value)
+
+    def to_list(self) -> list:
+        return list(self.values)
+
+    def to_numpy(self) -> Any:
+        np = _import("numpy")
+        column = np.empty(len(self.values), dtype=object)
+        column[:] = self.values
+        return column
+
+    def to_arrow(self) -> Any:
+        pa = _import("pyarrow")
+        type_ = _arrow_types(pa).get(self.arrow_type) if self.arrow_type else None
+        return pa.array(self.values, type=type_)
+
+
+class StringColumn(Column):
+    arrow_type = "string"
+
+
+class ListColumn(Column):
+    arrow_type = "list<string>"
+
+
+class ArrayColumn(Column):
+    """Column of numbers, booleans or timestamps, stored in an array.array, with a
+    mask marking missing values.
+
+    Attributes:
+        values: values, with 0 in place of missing values.
+        mask: 1 for each missing value, 0 otherwise.
+        null_count: number of missing values.
+    """
+
+    typecode = "q"
+    numpy_dtype = "int64"
+    arrow_type = "int64"
+
+    def __init__(self) -> None:
+        self.values: array = array(self.typecode)  # type: ignore[assignment]
+        self.mask = bytearray()
+        self.null_count = 0
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.values.append(0)
+            self.mask.append(1)
+            self.null_count += 1
+        else:
+            self.values.append(self.encode(value))
+            self.mask.append(0)
+
+    def encode(self, value: Any) -> int:
+        return value
+
+    def decode(self, value: int) -> Any:
+        return value
+
+    def to_list(self) -> list:
+        decode = self.decode
+        return [
+            None if missing else decode(value)
+            for value, missing in zip(self.values, self.mask)
+        ]
+
+    def to_numpy(self) -> Any:
+        """Return the column as a NumPy array sharing the memory of the column, or a
+        masked array if values are missing.
+        """
+        np = _import("numpy")
+        values = np.frombuffer(self.values, dtype=self.numpy_dtype)
+        if not self.null_count:
+            return values
+        return np.ma.MaskedArray(values, mask=np.frombuffer(self.mask, dtype=bool))
+
+    def to_arrow(self) -> Any:
+        """Return the column as an Arrow array sharing the memory of the column."""
+        pa = _import("pyarrow")
+        validity = None
+        if self.null_count:
+            np = _import("numpy")
+            is_valid = np.frombuffer(self.mask, dtype=bool) == 0
+            validity = pa.py_buffer(np.packbits(is_valid, bitorder="little"))
+        return pa.Array.from_buffers(
+            _arrow_types(pa)[self.arrow_type],
+            len(self.values),
+            [validity, pa.py_buffer(self.values)],
+            null_count=self.null_count,
+        )
+
+
+class IntColumn(ArrayColumn):
+    pass
+
+
+class BoolColumn(ArrayColumn):
+    typecode = "b"
+    numpy_dtype = "bool"
+    arrow_type = "bool"
+
+    def encode(self, value: Any) -> int:
+        return 1 if value else 0
+
+    def decode(self, value: int) -> Any:
+        return bool(value)
+
+    def to_arrow(self) -> Any:
+        # Arrow packs booleans into bits, so they cannot be shared
+        pa = _import("pyarrow")
+        np = _import("numpy")
+        mask = np.frombuffer(self.mask, dtype=bool) if self.null_count else None
+        return pa.array(
+            np.frombuffer(self.values, dtype=bool), mask=mask, type=pa.bool_()
+        )
+
+
+class TimestampColumn(ArrayColumn):
+    """Column of timestamps, stored as microseconds since the Unix epoch, in UTC."""
+
+    numpy_dtype = "datetime64[us]"
+    arrow_type = "timestamp[us, UTC]"
+
+    def encode(self, value: datetime) -> int:
+        return (value - _EPOCH) // _MICROSECOND
+
+    def decode(self, value: int) -> datetime:
+        return _EPOCH + timedelta(microseconds=value)
+
+
+def _arrow_types(pa: Any) -> Dict[str, Any]:
+    return {
+        "int64": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp[us, UTC]": pa.timestamp("us", tz="UTC"),
+        "string": pa.string(),
+        "list<string>": pa.list_(pa.string()),
+    }
+
+
+def column_for(type_: Any) -> Column:
+    """Create an empty column for a field of a resource model, from its type as
+    returned by youte.common.field_types()."""
+    if typing.get_origin(type_) is list:
+        return ListColumn()
+    if type_ is bool:
+        return BoolColumn()
+    if type_ is int:
+        return IntColumn()
+    if type_ is datetime:
+        return TimestampColumn()
+    if type_ is str or typing.get_origin(type_) is typing.Literal:
+        return StringColumn()
+    return Column()
+
+
+class Table:
+    """Parsed resources, stored column by column.
+
+    Args:
+        model: resource model, e.g. youte.resources.Video, whose fields become the
+            columns of the table.
+
+    Attributes:
+        model: resource model.
+        columns: columns, by field name.
+    """
+
+    def __init__(self, model: Type[YouteClass]):
+        self.model = model
+        self.columns: Dict[str, Column] = {
+            name: column_for(type_) for name, type_ in field_types(model).items()
+        }
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, name: str) -> list:
+        """Return the values of a column as a list of Python objects."""
+        return self.columns[name].to_list()
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    def append(self, values: Dict[str, Any]) -> None:
+        """Add a row, from field values as passed to the resource model."""
+        for name, column in self.columns.items():
+            value = values.get(name)
+            try:
+                column.append(value)
+            except (TypeError, ValueError, OverflowError) as e:
+                raise ValueError(f"Cannot store {value!r} in column {name}") from e
+        self._length += 1
+
+    def rows(self) -> Iterator[YouteClass]:
+        """Yield the rows of the table as resource objects, without validation."""
+        lists = [self[name] for name in self.names]
+        for values in zip(*lists):
+            yield construct(self.model, dict(zip(self.names, values)))
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Return the columns as NumPy arrays. Numbers, booleans and timestamps share
+        the memory of the table; columns with missing values are masked arrays.
+        Requires numpy.
+        """
+        return {name: column.to_numpy() for name, column in self.columns.items()}
+
+    def to_arrow(self) -> Any:
+        """Return the table as a pyarrow.Table. Numbers and timestamps share the
+        memory of the table. Requires pyarrow and numpy.
+
+        Use table.to_arrow().to_pandas() to get a pandas DataFrame.
+        """
+        pa = _import("pyarrow")
+        return pa.table(
+            {name: column.to_arrow() for name, column in self.columns.items()}
+        )
@@ -0,0 +1,158 @@
+"""Tidy pages of results into a file as they are collected.
+
+Each page is parsed and its items are written as soon as the page is passed to the
+writer, which is how the --tidy-to option of the collecting commands works.
+
+    from youte.tidy import TidyWriter
+
+    with TidyWriter("videos.csv", "video") as writer:
+        for page in yob.get_video_metadata(ids):
+            writer.write(page)
+"""
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterable, Literal, Optional, Tuple
+
+from youte import parser
+from youte.common import Flattener, YouteClass, _encoder
+from youte.parquet import ParquetWriter
+from youte.schema import CHANNEL, COMMENT, SEARCH, VIDEO, Schema
+
+Kind = Literal["search", "video", "channel", "comment"]
+TidyFormat = Literal["csv", "json", "jsonl", "parquet"]
+
+_KINDS: Dict[str, Tuple[Callable[..., Iterable[YouteClass]], Schema]] = {
+    "search": (parser._parse_search, SEARCH),
+    "video": (parser._parse_video, VIDEO),
+    "channel": (parser._parse_channel, CHANNEL),
+    "comment": (parser._parse_comment, COMMENT),
+}
+
+
+class TidyWriter:
+    """Parse pages of results and write their items to a file, one page at a time,
+    so that only the current page is held in memory.
+
+    CSV columns are the attributes of the resource, with the metadata of the first
+    page flattened into meta_* columns, like Resources.to_csv(). They are written
+    even if no items are collected. Parquet files are written with
+    youte.parquet.ParquetWriter, which requires pyarrow.
+
+    Args:
+        filepath: path of the file.
+        kind: type of resources in the pages.
+        file_format ("csv", "json", "jsonl", "parquet"): a CSV file, a JSON array of
+            items, a JSONL file with one item per line or a Parquet file.
+        encoding: encoding of CSV files. JSON is always written in UTF-8.
+        pretty: indent JSON.
+        validation ("strict", "trusted", "sampled"): see youte.parser.
+        append: add items to an existing CSV or JSONL file. Rows are added under
+            the header of the CSV file.
+    """
+
+    def __init__(
+        self,
+        filepath: str | Path,
+        kind: Kind,
+        file_format: TidyFormat = "csv",
+        encoding: str = "utf-8-sig",
+        pretty: bool = False,
+        validation: parser.Validation = "strict",
+        append: bool = False,
+    ):
+        if file_format not in ("csv", "json", "jsonl", "parquet"):
+            raise ValueError(f"Cannot tidy data into {file_format}")
+        if append and file_format not in ("csv", "jsonl"):
+            raise ValueError("Only CSV and JSONL files can be appended to")
+        self._parse, self.schema = _KINDS[kind]
+        self.file_format = file_format
+        self.validation = validation
+        self.count = 0
+        # one builder for all pages, so that sampling and interning span the file
+        self._build = parser._Builder(validation, intern=True)
+        self._encode = _encoder(pretty)
+        self._separator = ",\n" if pretty else ", "
+        self._header: Optional[Tuple[str, ...]] = None
+        self._flattener = Flattener.for_model(self.schema.model)
+        self._file: IO[str]
+        self._parquet: Optional[ParquetWriter] = None
+        if file_format == "parquet":
+            self._parquet = ParquetWriter(filepath, kind, validation=validation)
+        elif file_format == "csv":
+            if append:
+                with open(filepath, newline="", encoding=encoding) as f:
+                    header = next(csv.reader(f), None)
+                if header:
+                    self._header = self._flattener.set_header(header)
+            mode = "a" if append else "w"
+            self._file = open(filepath, mode, newline="", encoding=encoding)
+            self._writer = csv.writer(self._file)
+        else:
+            self._file = open(filepath, "a" if append else "w", encoding="utf-8")
+            if file_format == "json":
+                self._file.write("[")
+
+    def __enter__(self) -> TidyWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, page: dict) -> int:
+        """Parse a page of results and write its items.
+
+        Args:
+            page: a page of results, as returned by the Youte methods.
+
+        Returns:
+            The number of items written.
+        """
+        if self._parquet:
+            added = self._parquet.write(page)
+            self.count += added
+            return added
+        items = self._parse(page, self._build)
+        before = self.count
+        if self.file_format == "csv":
+            self._write_csv(items, page.get("_youte", {}))
+        else:
+            file = self._file
+            json_array = self.file_format == "json"
+            for item in items:
+                if json_array and self.count:
+                    file.write(self._separator)
+                file.write(self._encode(self._flattener.flatten(item)))
+                if not json_array:
+                    file.write("\n")
+                self.count += 1
+        return self.count - before
+
+    def close(self) -> None:
+        """Finish the file, writing the CSV header or closing the JSON array"""
+        if self._parquet:
+            self._parquet.close()
+            return
+        if self._file.closed:
+            return
+        if self.file_format == "csv" and self._header is None:
+            self._write_header({})
+        elif self.file_format == "json":
+            self._file.write("]")
+        self._file.close()
+
+    def _write_header(self, meta: dict) -> None:
+        flattener = self._flattener
+        self._header = flattener.set_header(flattener.header_with({"meta": meta}))
+        self._writer.writerow(self._header)
+
+    def _write_csv(self, items: Iterable[YouteClass], meta: dict) -> None:
+        if self._header is None:
+            self._write_header(meta)
+        writerow = self._writer.writerow
+        row = self._flattener.row
+        for item in items:
+            writerow(row(item))
+            self.count += 1
@@ -0,0 +1,102 @@
+"""Decode RFC3339 timestamps returned by YouTube API.
+
+YouTube gives timestamps in two fixed formats, with or without fractional seconds:
+"2023-04-10T18:19:31Z" and "2023-04-10T18:19:31.123456Z". They are decoded by
+slicing rather than with datetime.strptime(), which is several times slower, and
+the most recent values are cached, since items often share the same timestamps.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterable
+
+CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_rfc3339(string: str) -> datetime:
+    """Parse an RFC3339 timestamp into a timezone-aware datetime.
+
+    Args:
+        string: timestamp, e.g. "2023-04-10T18:19:31Z".
+
+    Returns:
+        A datetime object.
+
+    Raises:
+        ValueError: if the string is not a valid RFC3339 timestamp.
+    """
+    try:
+        return _decode(string)
+    except (ValueError, IndexError):
+        return _fallback(string)
+
+
+def parse_rfc3339_many(strings: Iterable[str]) -> list[datetime]:
+    """Parse a column of RFC3339 timestamps, decoding each distinct value once.
+
+    Args:
+        strings: timestamps to parse.
+
+    Returns:
+        A list of datetime objects, in the same order as `strings`.
+    """
+    decoded: dict[str, datetime] = {}
+    result = []
+    for string in strings:
+        moment = decoded.get(string)
+        if moment is None:
+            moment = decoded[string] = parse_rfc3339(string)
+        result.append(moment)
+    return result
+
+
+def _decode(string: str) -> datetime:
+    if (
+        string[4] != "-"
+        or string[7] != "-"
+        or string[10] not in "Tt"
+        or string[13] != ":"
+        or string[16] != ":"
+    ):
+        raise ValueError(string)
+
+    end = 19
+    microsecond = 0
+    if string[19] == ".":
+        end = 20
+        while string[end].isdigit():
+            end += 1
+        fraction = string[20:end]
+        if not fraction:
+            raise ValueError(string)
+        microsecond = int(fraction[:6].ljust(6, "0"))
+
+    offset = string[end:]
+    if offset in ("Z", "z"):
+        tz = timezone.utc
+    elif len(offset) == 6 and offset[0] in "+-" and offset[3] == ":":
+        minutes = int(offset[1:3]) * 60 + int(offset[4:6])
+        tz = timezone(timedelta(minutes=-minutes if offset[0] == "-" else minutes))
+    else:
+        raise ValueError(string)
+
+    return datetime(
+        int(string[0:4]),
+        int(string[5:7]),
+        int(string[8:10]),
+        int(string[11:13]),
+        int(string[14:16]),
+        int(string[17:19]),
+        microsecond,
+        tzinfo=tz,
+    )
+
+
+def _fallback(string: str) -> datetime:
+    try:
+        return datetime.strptime(string, "%Y-%m-%dT%H:%M:%S.%f%z")
+    except ValueError:
+        return datetime.strptime(string, "%Y-%m-%dT%H:%M:%S%z")
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from youte.exceptions import RecordingNotFound
+
+logger = logging.getLogger(__name__)
+
+# Parameters left out of recordings, so that cassettes do not leak API keys and
+# can be replayed with any key.
+_IGNORED_PARAMS = ("key",)
+
+
+class Transport(ABC):
+    """Send GET requests to YouTube API on behalf of Youte.
+
+    Subclass this and implement get() to change how requests are made.
+    """
+
+    @abstractmethod
+    def get(self, url: str, params: dict) -> requests.Response:
+        """Send a GET request and return the response"""
+
+
+class HTTPTransport(Transport):
+    """Send requests over HTTP, reusing connections between requests."""
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session if session else requests.Session()
+
+    def get(self, url: str, params: dict) -> requests.Response:
+        return self.session.get(url, params=params)
+
+
+class RecordTransport(Transport):
+    """Send requests with another transport and save each request and response to
+    a cassette directory, so they can be served later by ReplayTransport.
+
+    Args:
+        cassette_dir: directory to store recordings in. Created if it doesn't exist.
+        transport: transport used to send requests, HTTPTransport by default.
+    """
+
+    def __init__(self, cassette_dir: str | Path, transport: Optional[Transport] = None):
+        self.cassette_dir = Path(cassette_dir)
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+        self.transport = transport if transport else HTTPTransport()
+
+    def get(self, url: str, params: dict) -> requests.Response:
+        response = self.transport.get(url, params)
+        recording = {
+            "request": {"url": url, "params": _clean_params(params)},
+            "response": {
+                "status_code": response.status_code,
+                "url": _redacted_url(url, params),
+                "headers": {"Content-Type": response.headers.get("Content-Type")},
+                "body": response.text,
+            },
+        }
+        path = _cassette_path(self.cassette_dir, url, params)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(recording, indent=2, ensure_ascii=False))
+        logger.debug(f"Recorded {recording['response']['url']} to {path}")
+        return response
+
+
+class ReplayTransport(Transport):
+    """Serve responses recorded by RecordTransport without touching the network.
+
+    Args:
+        cassette_dir: directory containing recordings.
+
+    Raises:
+        RecordingNotFound: if a request was not recorded.
+    """
+
+    def __init__(self, cassette_dir: str | Path):
+        self.cassette_dir = Path(cassette_dir)
+
+    def get(self, url: str, params: dict) -> requests.Response:
+        path = _cassette_path(self.cassette_dir, url, params)
+        try:
+            with open(path, encoding="utf-8") as f:
+                recorded = json.loads(f.read())["response"]
+        except FileNotFoundError:
+            raise RecordingNotFound(
+                f"No recording of {_redacted_url(url, params)} in {self.cassette_dir}"
+            )
+
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.url = recorded["url"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response.encoding = "utf-8"
+        response._content = recorded["body"].encode("utf-8")
+        logger.debug(f"Replayed {response.url} from {path}")
+        return response
+
+
+def _clean_params(params: dict) -> dict:
+    return {
+        k: v for k, v in params.items() if v is not None and k not in _IGNORED_PARAMS
+    }
+
+
+def _redacted_url(url: str, params: dict) -> str:
+    request = requests.Request("GET", url, params=_clean_params(params)).prepare()
+    return str(request.url)
+
+
+def _cassette_path(cassette_dir: Path, url: str, params: dict) -> Path:
+    key = json.dumps([url, _clean_params(params)], sort_keys=True, default=str)
+    return cassette_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
@@ -1,20 +1,30 @@
 from __future__ import annotations
 
+import gzip
+import io
 import json
 import logging
+import os
 import re
+import sys
 from pathlib import Path
-from typing import Iterable, Iterator, Literal, Optional, Union
+from typing import IO, Iterable, Iterator, Literal, Optional, Union
 
 import click
 
 from youte._typing import APIResponse
 from youte.exceptions import InvalidFileName
+from youte.jsonl import JsonlFile
 
 logger = logging.getLogger(__name__)
 
 _VALID_OUTPUT = ("json", "jsonl")
 
+FlushPolicy = Literal["none", "page", "fsync"]
+
+# Number of characters read at a time when decoding JSON incrementally
+_READ_SIZE = 1 << 16
+
 
 def validate_file(file_name: str, suffix=None):
     path = Path(file_name)
@@ -53,32 +63,194 @@ def export_file(
     file_format: Literal["json", "jsonl"],
     pretty: bool = False,
     ensure_ascii=True,
+    append: bool = False,
 ) -> None:
+    """Write raw API responses to a JSON or JSONL file, compressed if the file name
+    ends in .gz or .zst (see open_file()). To write pages as they are collected, use
+    RawWriter.
+    """
+    if isinstance(obj, list):
+        with RawWriter(
+            fp, file_format, pretty, ensure_ascii, append=append, flush="none"
+        ) as writer:
+            for page in obj:
+                writer.write(page)
+        return
+
     if file_format not in _VALID_OUTPUT:
         raise ValueError(f"file_format has to be one of {_VALID_OUTPUT}")
 
+    if append and file_format != "jsonl":
+        raise ValueError("Only JSONL files can be appended to")
+
     indent: Optional[int] = 4 if pretty else None
+    with open_file(fp, "a" if append else "w") as file:
+        file.write(
+            json.dumps(obj, default=str, indent=indent, ensure_ascii=ensure_ascii)
+        )
 
-    if file_format == "json":
-        with open(fp, "w") as file:
-            file.write(
-                json.dumps(obj, default=str, indent=indent, ensure_ascii=ensure_ascii)
-            )
-
-    if file_format == "jsonl":
-        with open(fp, "w") as file:
-            if isinstance(obj, list):
-                for json_obj in obj:
-                    file.write(
-                        json.dumps(json_obj, default=str, ensure_ascii=ensure_ascii)
-                        + "\n"
-                    )
-            else:
-                file.write(
-                    json.dumps(
-                        obj, default=str, indent=indent, ensure_ascii=ensure_ascii
-                    )
-                )
+
+class RawWriter:
+    """Write raw API responses to a JSON or JSONL file one page at a time, as they
+    are collected.
+
+    The file is the same as the one written by export_file() with all pages. Each
+    page is written as soon as it is passed to the writer, and a JSON array is
+    closed when the writer is closed, including when collection stops with an
+    error. Files are compressed if their name ends in .gz or .zst.
+
+    If fp is "-", JSONL is written to standard output for other programs to read
+    through a pipe. Each page is flushed as soon as it is written, and standard
+    output is left open when the writer is closed.
+
+    Args:
+        fp: path of the file, or "-" for standard output.
+        file_format ("json", "jsonl"): a JSON array of pages or one page per line.
+        pretty: indent JSON arrays.
+        ensure_ascii: escape non-ASCII characters.
+        append: add pages to an existing JSONL file.
+        flush ("none", "page", "fsync"): leave writing to the file buffers, write
+            each page to the operating system, or also force it to disk, so that
+            a crash loses at most the page being written.
+    """
+
+    def __init__(
+        self,
+        fp: str | Path,
+        file_format: Literal["json", "jsonl"] = "json",
+        pretty: bool = False,
+        ensure_ascii: bool = True,
+        append: bool = False,
+        flush: FlushPolicy = "page",
+    ):
+        if file_format not in _VALID_OUTPUT:
+            raise ValueError(f"file_format has to be one of {_VALID_OUTPUT}")
+        if append and file_format != "jsonl":
+            raise ValueError("Only JSONL files can be appended to")
+        if flush not in ("none", "page", "fsync"):
+            raise ValueError(f"Unknown flush policy {flush}")
+        self._stdout = str(fp) == "-"
+        if self._stdout:
+            if file_format != "jsonl":
+                raise ValueError("Only JSONL can be written to standard output")
+            # pipes cannot be synced to disk, and readers expect whole lines
+            flush = "page"
+        self.file_format = file_format
+        self.pretty = pretty
+        self.flush = flush
+        self.count = 0
+        self._encode = json.JSONEncoder(
+            default=str,
+            ensure_ascii=ensure_ascii,
+            indent=4 if pretty and file_format == "json" else None,
+        ).encode
+        self._file: IO[str] = (
+            sys.stdout if self._stdout else open_file(fp, "a" if append else "w")
+        )
+        if file_format == "json":
+            self._file.write("[")
+
+    def __enter__(self) -> RawWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, page: dict) -> int:
+        """Write a page of results.
+
+        Returns:
+            The number of items in the page.
+        """
+        text = self._encode(page)
+        if self.file_format == "jsonl":
+            text += "\n"
+        elif self.pretty:
+            text = ("\n" if not self.count else ",\n") + _indent(text)
+        elif self.count:
+            text = ", " + text
+        try:
+            self._file.write(text)
+            if self.flush != "none":
+                self._file.flush()
+        except BrokenPipeError:
+            if self._stdout:
+                _discard_stdout()
+            raise
+        if self.flush == "fsync":
+            os.fsync(self._file.fileno())
+        self.count += 1
+        return len(page.get("items", ()))
+
+    def close(self) -> None:
+        """Close the file, ending the JSON array"""
+        if self._stdout or self._file.closed:
+            return
+        if self.file_format == "json":
+            self._file.write("\n]" if self.pretty and self.count else "]")
+        self._file.close()
+
+
+def _discard_stdout() -> None:
+    """Send standard output to /dev/null once the program reading it has exited,
+    so that flushing it again when Python exits does not fail"""
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        pass
+
+
+def _indent(text: str) -> str:
+    """Indent the lines of JSON as an element of an indented array"""
+    return "    " + text.replace("\n", "\n    ")
+
+
+def open_file(
+    filepath: str | Path,
+    mode: Literal["r", "w", "a"] = "r",
+    encoding: str = "utf-8",
+) -> IO[str]:
+    """Open a text file, compressed with gzip if its name ends in .gz or with zstd if
+    it ends in .zst.
+
+    Compressed files are read and written as streams. Appending to a compressed
+    file adds a new gzip member or zstd frame, which is read back as part of the
+    same file. zstd requires the zstandard package.
+
+    Args:
+        filepath: path of the file.
+        mode: "r" to read, "w" to write or "a" to append.
+        encoding: encoding of the text.
+
+    Returns:
+        A file object reading or writing text.
+    """
+    suffix = Path(filepath).suffix
+    if suffix == ".gz":
+        return gzip.open(filepath, mode + "t", encoding=encoding)
+    if suffix == ".zst":
+        return _open_zstd(filepath, mode, encoding)
+    return open(filepath, mode, encoding=encoding)
+
+
+def _open_zstd(filepath: str | Path, mode: str, encoding: str) -> IO[str]:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "zstandard is required for .zst files, run pip install zstandard"
+        ) from e
+    raw = open(filepath, mode + "b")
+    stream: IO[bytes]
+    if mode == "r":
+        stream = zstandard.ZstdDecompressor().stream_reader(
+            raw, read_across_frames=True
+        )
+    else:
+        stream = zstandard.ZstdCompressor().stream_writer(raw)
+    return io.TextIOWrapper(stream, encoding=encoding)
 
 
 def retrieve_ids_from_file(filepath: str | Path) -> Iterator[str]:
@@ -90,28 +262,94 @@ def retrieve_ids_from_file(filepath: str | Path) -> Iterator[str]:
     yield from _get_id(items)
 
 
+def read_pages(filepath: str | Path, encoding: str = "utf-8") -> Iterator[dict]:
+    """Read pages of raw API responses from a file, one at a time.
+
+    The file can be a JSON array of pages, as written by youte with
+    `--output-format json`, or JSONL with one page per line. Files ending in .gz or
+    .zst are decompressed, see open_file(). Pages are decoded as the file is read,
+    so memory use does not depend on the size of the file. JSONL files are read
+    through a memory map, see youte.jsonl.JsonlFile.
+
+    Pages are read from standard input if filepath is "-".
+
+    Args:
+        filepath: path of the file, or "-" for standard input.
+        encoding: encoding of the file.
+
+    Yields:
+        Each page as a dictionary.
+
+    Raises:
+        json.JSONDecodeError: the file is not valid JSON or JSONL.
+    """
+    if str(filepath) == "-":
+        yield from _decode_values(sys.stdin)
+        return
+    filepath = Path(filepath)
+    if filepath.suffix == ".jsonl" and encoding.lower().replace("-", "") == "utf8":
+        with JsonlFile(filepath) as pages:
+            yield from pages
+        return
+    with open_file(filepath, encoding=encoding) as file:
+        yield from _decode_values(file)
+
+
+def _decode_values(file: IO[str]) -> Iterator[dict]:
+    """Decode a JSON array, or JSON values separated by whitespace, from a file"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    in_array = None
+    read_size = _READ_SIZE
+    eof = False
+    while True:
+        # skip whitespace and, in an array, the separators between values
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    break
+                buffer, pos = file.read(read_size), 0
+                eof = not buffer
+                continue
+            char = buffer[pos]
+            if in_array is None:
+                in_array = char == "["
+                pos += in_array
+            elif in_array and char in ",]":
+                pos += 1
+            else:
+                break
+        if pos == len(buffer):
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # the value is cut off by the end of the buffer
+            more = file.read(read_size)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+            read_size *= 2
+            continue
+        read_size = _READ_SIZE
+        pos = end
+        yield value
+
+
 def _get_items(filepath: str | Path) -> Iterator[dict]:
     """Utility function to get each item from raw API JSON response"""
-    filepath = Path(filepath) if isinstance(filepath, str) else filepath
-    with open(filepath, mode="r") as file:
-        if filepath.suffix == ".jsonl":
-            responses = (row.strip() for row in file.readlines())
-            for response in responses:
-                try:
-                    items = json.loads(response)["items"]
-                    for item in items:
-                        yield item
-                except KeyError:
-                    logger.warning("No items found in JSON response")
-        elif filepath.suffix == ".json":
-            responses = json.loads(file.read())
-            for response in responses:
-                try:
-                    items = response["items"]
-                    for item in items:
-                        yield item
-                except KeyError:
-                    logger.warning("No items found in JSON response")
+    for response in read_pages(filepath):
+        try:
+            items = response["items"]
+            for item in items:
+                yield item
+        except KeyError:
+            logger.warning("No items found in JSON response")
 
 
 def _get_id(items: Iterable[dict]) -> Iterator[str]:
@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Collection, Iterator, Optional, Sequence, Union
+
+from sqlalchemy.engine import Engine
+
+import youte.database as database
+import youte.parser as parser
+from youte._typing import APIResponse
+from youte.collector import Youte
+from youte.exceptions import MaxQuotaReached
+
+logger = logging.getLogger(__name__)
+
+UNIT_KINDS = ("search", "video", "channel", "thread", "reply")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    leased_until REAL,
+    heartbeat_at REAL,
+    UNIQUE (kind, payload)
+);
+CREATE INDEX IF NOT EXISTS units_state ON units (state, id);
+"""
+
+
+@dataclass
+class Unit:
+    """A unit of work leased from a WorkQueue.
+
+    The payload is a list of IDs for "video", "channel", "thread" and "reply" units,
+    or a dict of keyword arguments to Youte.search() for "search" units.
+    """
+
+    id: int
+    kind: str
+    payload: Union[list, dict]
+    attempts: int
+
+
+class WorkQueue:
+    """A work queue stored in a SQLite file that can be shared between several
+    machines, e.g. on a network drive.
+
+    Workers lease units of work for `lease_seconds` and keep the lease alive with
+    heartbeats while they work. Units whose lease expired (because the worker crashed
+    or lost its connection) are put back in the queue for other workers, up to
+    `max_attempts` times before being marked as failed.
+
+    The rollback journal is used instead of WAL as WAL does not work across hosts.
+    """
+
+    def __init__(
+        self, path: str | Path, lease_seconds: int = 300, max_attempts: int = 5
+    ):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def put(
+        self,
+        kind: str,
+        items: Sequence[str] | dict,
+        batch_size: int = 1,
+    ) -> int:
+        """Add units of work to the queue. Units already in the queue are ignored,
+        so several workers can seed the queue with the same IDs.
+
+        Args:
+            kind: one of "search", "video", "channel", "thread", "reply".
+            items: the IDs to split into units, or search parameters for
+                a "search" unit.
+            batch_size: number of IDs per unit.
+
+        Returns:
+            The number of new units added.
+        """
+        if kind not in UNIT_KINDS:
+            raise ValueError(f"kind has to be one of {UNIT_KINDS}")
+
+        if isinstance(items, dict):
+            payloads = [json.dumps(items, sort_keys=True)]
+        else:
+            ids = list(dict.fromkeys(items))
+            payloads = [
+                json.dumps(ids[i : i + batch_size])
+                for i in range(0, len(ids), batch_size)
+            ]
+
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO units (kind, payload) VALUES (?, ?)",
+                [(kind, payload) for payload in payloads],
+            )
+            conn.execute("COMMIT")
+            added = conn.total_changes - before
+
+        logger.debug(f"Added {added} {kind} units to {self.path}")
+        return added
+
+    def lease(self, worker_id: str) -> Optional[Unit]:
+        """Lease the next pending unit. Returns None if nothing is pending."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT id, kind, payload, attempts FROM units "
+                "WHERE state = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE units SET state = 'leased', worker = ?, leased_until = ?, "
+                "heartbeat_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row[0]),
+            )
+            conn.execute("COMMIT")
+
+        return Unit(id=row[0], kind=row[1], payload=json.loads(row[2]), attempts=row[3])
+
+    def heartbeat(self, unit: Unit, worker_id: str) -> bool:
+        """Extend the lease on a unit. Returns False if the lease has been lost."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE units SET leased_until = ?, heartbeat_at = ? "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (now + self.lease_seconds, now, unit.id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, unit: Unit, worker_id: str) -> bool:
+        """Mark a leased unit done. Returns False if the lease has been lost, e.g.
+        the unit was requeued or failed after the lease expired."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE units SET state = 'done', leased_until = NULL "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (unit.id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, unit: Unit, worker_id: str) -> None:
+        """Give a leased unit back to the queue without counting the attempt."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE units SET state = 'pending', worker = NULL, "
+                "leased_until = NULL, attempts = attempts - 1 "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (unit.id, worker_id),
+            )
+
+    def requeue_expired(self) -> int:
+        """Put units whose lease has expired back in the queue.
+
+        Returns:
+            The number of units requeued.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            requeued = self._requeue_expired(conn, time.time())
+            conn.execute("COMMIT")
+        return requeued
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> int:
+        conn.execute(
+            "UPDATE units SET state = 'failed' "
+            "WHERE state = 'leased' AND leased_until < ? AND attempts >= ?",
+            (now, self.max_attempts),
+        )
+        cursor = conn.execute(
+            "UPDATE units SET state = 'pending', worker = NULL, leased_until = NULL "
+            "WHERE state = 'leased' AND leased_until < ?",
+            (now,),
+        )
+        if cursor.rowcount:
+            logger.warning(f"Requeued {cursor.rowcount} units with expired leases")
+        return cursor.rowcount
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        """Number of units in each state, by kind."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT kind, state, COUNT(*) FROM units GROUP BY kind, state"
+            ).fetchall()
+        counts: dict[str, dict[str, int]] = {}
+        for kind, state, count in rows:
+            counts.setdefault(kind, {})[state] = count
+        return counts
+
+    def is_drained(self) -> bool:
+        """True if no unit is pending or being worked on."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM units WHERE state IN ('pending', 'leased')"
+            ).fetchone()
+        return row[0] == 0
+
+
+class _Heartbeat:
+    """Keep the lease on a unit alive from a background thread."""
+
+    def __init__(self, queue: WorkQueue, unit: Unit, worker_id: str):
+        self.queue = queue
+        self.unit = unit
+        self.worker_id = worker_id
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        interval = max(self.queue.lease_seconds / 3, 1)
+        while not self._stop.wait(interval):
+            if not self.queue.heartbeat(self.unit, self.worker_id):
+                logger.warning(f"Lost lease on unit {self.unit.id}")
+                self.lost = True
+                return
+
+    def holds_lease(self) -> bool:
+        """Renew the lease once more, and return whether it is still held"""
+        if not self.lost and not self.queue.heartbeat(self.unit, self.worker_id):
+            logger.warning(f"Lost lease on unit {self.unit.id}")
+            self.lost = True
+        return not self.lost
+
+    def __enter__(self) -> _Heartbeat:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(
+    queue: WorkQueue,
+    yob: Youte,
+    worker_id: str,
+    sink: Callable[[Unit, list[APIResponse]], None],
+    follow: Collection[str] = (),
+    include_meta: bool = True,
+    poll_interval: float = 5,
+) -> int:
+    """Lease and process units from a queue until no work is left.
+
+    Args:
+        queue: the WorkQueue to take units from.
+        yob: a Youte instance, using this worker's API key.
+        worker_id: name of this worker, unique across all hosts.
+        sink: called with each unit and its raw API responses once they are
+            collected, before the unit is marked done. This is where results are
+            written to this worker's shard. Results of a unit whose lease was lost
+            meanwhile are discarded, as another worker collects it again.
+        follow: kinds of units spawned from collected results. A "search" unit
+            spawns "video", "channel" and "thread" units, and a "thread" unit spawns
+            "reply" units for threads with replies, if these kinds are included.
+        include_meta: include `_youte` metadata in output.
+        poll_interval: seconds to wait when other workers still hold leases.
+
+    Returns:
+        The number of units processed by this worker.
+    """
+    processed = 0
+    while True:
+        unit = queue.lease(worker_id)
+        if unit is None:
+            if queue.is_drained():
+                logger.info(f"Queue drained, {processed} units done by {worker_id}")
+                return processed
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(
+            f"Working on {unit.kind} unit {unit.id} (attempt {unit.attempts + 1})"
+        )
+        with _Heartbeat(queue, unit, worker_id) as heartbeat:
+            try:
+                pages = list(_collect(yob, unit, include_meta))
+            except MaxQuotaReached:
+                queue.release(unit, worker_id)
+                raise
+            # the unit is redone by another worker, whose results are kept instead
+            if not heartbeat.holds_lease():
+                logger.warning(f"Discarding results of unit {unit.id}")
+                continue
+            sink(unit, pages)
+            _spawn(queue, unit, pages, follow)
+        if queue.complete(unit, worker_id):
+            processed += 1
+
+
+def _collect(yob: Youte, unit: Unit, include_meta: bool) -> Iterator[APIResponse]:
+    if unit.kind == "search":
+        params = dict(unit.payload)
+        if params.get("location"):
+            params["location"] = tuple(params["location"])
+        yield from yob.search(include_meta=include_meta, **params)
+    elif unit.kind == "video":
+        yield from yob.get_video_metadata(unit.payload, include_meta=include_meta)
+    elif unit.kind == "channel":
+        yield from yob.get_channel_metadata(unit.payload, include_meta=include_meta)
+    elif unit.kind == "thread":
+        yield from yob.get_comment_threads(
+            video_ids=unit.payload, include_meta=include_meta
+        )
+    elif unit.kind == "reply":
+        yield from yob.get_thread_replies(unit.payload, include_meta=include_meta)
+
+
+def _spawn(
+    queue: WorkQueue, unit: Unit, pages: list[APIResponse], follow: Collection[str]
+) -> None:
+    if unit.kind == "search":
+        items = [item for page in pages for item in page.get("items", [])]
+        video_ids = [item["id"]["videoId"] for item in items if "videoId" in item["id"]]
+        channel_ids = [item["snippet"]["channelId"] for item in items]
+        if "video" in follow:
+            queue.put("video", video_ids, batch_size=50)
+        if "channel" in follow:
+            queue.put("channel", channel_ids, batch_size=50)
+        if "thread" in follow:
+            queue.put("thread", video_ids)
+
+    if unit.kind == "thread" and "reply" in follow:
+        thread_ids = [
+            item["id"]
+            for page in pages
+            for item in page.get("items", [])
+            if item["snippet"].get("totalReplyCount")
+        ]
+        queue.put("reply", thread_ids)
+
+
+def database_sink(engine: Engine) -> Callable[[Unit, list[APIResponse]], None]:
+    """Return a sink for run_worker() that parses results and stores them in an
+    SQLite database set up with youte.database.set_up_database().
+    """
+
+    def sink(unit: Unit, pages: list[APIResponse]) -> None:
+        if unit.kind == "search":
+            database.populate_searches(engine, [parser.parse_searches(pages)])
+        elif unit.kind == "video":
+            database.populate_videos(engine, [parser.parse_videos(pages)])
+        elif unit.kind == "channel":
+            database.populate_channels(engine, [parser.parse_channels(pages)])
+        elif unit.kind in ("thread", "reply"):
+            database.populate_comments(engine, [parser.parse_comments(pages)])
+
+    return sink
+
+
+def merge_shards(shards: Sequence[str | Path], output: str | Path) -> None:
+    """Merge per-worker shards into one file.
+
+    SQLite shards (.db) are merged into a single database, skipping rows that are
+    already in it. Any other shards are treated as JSONL and concatenated.
+    """
+    output = Path(output)
+    if output.suffix == ".db":
+        database.set_up_database(output)
+        # a shard created by another version may order its columns differently
+        columns = {
+            name: ", ".join(column.name for column in table.columns)
+            for name, table in database.Base.metadata.tables.items()
+        }
+        with closing(sqlite3.connect(output)) as conn:
+            for shard in shards:
+                conn.execute("ATTACH DATABASE ? AS shard", (str(shard),))
+                for table, names in columns.items():
+                    conn.execute(
+                        f"INSERT OR IGNORE INTO main.{table} ({names}) "
+                        f"SELECT {names} FROM shard.{table}"
+                    )
+                conn.commit()
+                conn.execute("DETACH DATABASE shard")
+                logger.info(f"Merged {shard} into {output}")
+    else:
+        with open(output, "wb") as out:
+            for shard in shards:
+                with open(shard, "rb") as f:
+                    shutil.copyfileobj(f, out)
+                logger.info(f"Merged {shard} into {output}")
@@ -0,0 +1,67 @@
+import gc
+import json
+import tracemalloc
+
+from youte import parser
+from youte.common import Flattener, _flatten_json
+from youte.synthetic import generate_pages
+
+
+def _pages(kind, pages=2, items_per_page=20):
+    # decode pages from JSON, as when parsing a raw file, so strings are not shared
+    return [
+        json.loads(json.dumps(page))
+        for page in generate_pages(kind, pages=pages, items_per_page=items_per_page)
+    ]
+
+
+def test_strings_are_shared():
+    comments = parser.parse_comments(_pages("comment")).items
+    assert comments[0].video_id is comments[1].video_id
+    assert comments[0].viewer_rating is comments[-1].viewer_rating
+    assert comments[0].text_original is comments[0].text_display
+
+    comments = parser.parse_comments(_pages("comment"), intern=False).items
+    assert comments[0].video_id is not comments[1].video_id
+
+
+def test_meta_is_shared():
+    pages = _pages("video")
+    videos = parser.parse_videos(pages).items
+    assert videos[0].meta is pages[0]["_youte"]
+    assert videos[0].meta is videos[1].meta
+    assert parser.parse_videos(pages, intern=False).items[0].meta == videos[0].meta
+
+
+def test_memory():
+    lines = [json.dumps(page) for page in generate_pages("comment", 20, 50)]
+
+    def size(intern):
+        gc.collect()
+        tracemalloc.start()
+        pages = (json.loads(line) for line in lines)
+        items = parser.parse_comments(
+            pages, validation="trusted", compact=True, intern=intern
+        )
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(items.items) == 1000
+        return used
+
+    assert size(intern=True) < size(intern=False) * 0.8
+
+
+def test_flatten_cache():
+    pages = list(generate_pages("video", pages=2, items_per_page=3))
+    videos = parser.parse_videos(pages, validation="trusted").items
+    flattener = Flattener.for_item(videos[0])
+    rows = [flattener.row(video) for video in videos]
+    # the metadata shared by the items of a page is flattened once
+    assert len(flattener._cache) == 2
+    assert rows[1][flattener.header.index("meta_version")] == (
+        pages[0]["_youte"]["version"]
+    )
+    assert [flattener.flatten(video) for video in videos] == [
+        _flatten_json(dict(video)) for video in videos
+    ]
@@ -0,0 +1,122 @@
+import csv
+import json
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from youte import database, parser
+from youte.common import Flattener, _flatten_json, write_csv, write_json, write_jsonl
+from youte.resources import Video
+from youte.synthetic import generate_pages
+
+
+def test_iter_is_lazy():
+    pages = generate_pages("video", pages=1_000_000, items_per_page=5)
+    videos = parser.iter_videos(pages)
+    first = next(videos)
+    assert isinstance(first, Video)
+    assert len([next(videos) for _ in range(9)]) == 9
+
+
+@pytest.mark.parametrize(
+    "kind,parse,iter_parse",
+    [
+        ("search", parser.parse_searches, parser.iter_searches),
+        ("video", parser.parse_videos, parser.iter_videos),
+        ("channel", parser.parse_channels, parser.iter_channels),
+        ("comment", parser.parse_comments, parser.iter_comments),
+    ],
+)
+def test_iter_matches_parse(kind, parse, iter_parse):
+    pages = list(generate_pages(kind, pages=3, items_per_page=10))
+    assert list(iter_parse(pages)) == parse(pages).items
+
+
+def test_write_from_iterator(tmp_path):
+    pages = list(generate_pages("comment", pages=3, items_per_page=10))
+
+    write_csv(parser.iter_comments(pages), tmp_path / "iter.csv")
+    parser.parse_comments(pages).to_csv(tmp_path / "list.csv")
+    assert (tmp_path / "iter.csv").read_text() == (tmp_path / "list.csv").read_text()
+    with open(tmp_path / "iter.csv", encoding="utf-8-sig") as f:
+        assert len(list(csv.DictReader(f))) == 30
+
+    write_json(parser.iter_comments(pages), tmp_path / "iter.json", pretty=True)
+    items = json.loads((tmp_path / "iter.json").read_text(encoding="utf-8"))
+    assert len(items) == 30
+    assert items[0]["id"] == pages[0]["items"][0]["id"]
+
+
+def test_write_jsonl(tmp_path):
+    pages = list(generate_pages("comment", pages=3, items_per_page=10))
+    comments = parser.parse_comments(pages)
+
+    write_jsonl(parser.iter_comments(pages), tmp_path / "iter.jsonl")
+    comments.to_jsonl(tmp_path / "list.jsonl")
+    write_json(comments, tmp_path / "list.json")
+    lines = (tmp_path / "iter.jsonl").read_text(encoding="utf-8").splitlines()
+    assert (tmp_path / "list.jsonl").read_text(encoding="utf-8").splitlines() == lines
+    items = json.loads((tmp_path / "list.json").read_text(encoding="utf-8"))
+    assert [json.loads(line) for line in lines] == items
+    assert len(items) == 30
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_flattener(compact):
+    pages = list(generate_pages("video", pages=2, items_per_page=3))
+    videos = parser.parse_videos(pages, validation="trusted", compact=compact).items
+    flattener = Flattener.for_item(videos[0])
+    for video in videos:
+        expected = _flatten_json(dict(video))
+        assert flattener.flatten(video) == expected
+        assert flattener.columns(video) == tuple(expected)
+        assert flattener.row(video) == tuple(expected.values())
+
+
+def test_write_csv_different_meta(tmp_path, caplog):
+    pages = list(generate_pages("video", pages=3, items_per_page=2))
+    del pages[0]["_youte"]["user_agent"]
+    pages[2]["_youte"]["extra"] = "x"
+    with caplog.at_level(logging.WARNING):
+        write_csv(parser.iter_videos(pages), tmp_path / "videos.csv")
+    with open(tmp_path / "videos.csv", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 6
+    # the header has all the metadata youte writes, whatever the first page has
+    assert rows[0]["meta_user_agent"] == ""
+    assert rows[2]["meta_user_agent"] == pages[1]["_youte"]["user_agent"]
+    assert rows[4]["meta_version"] == pages[2]["_youte"]["version"]
+    # other keys not in the first page are left out with a warning
+    assert "meta_extra" not in rows[0]
+    assert [r.message for r in caplog.records] == [
+        "meta_extra not in the header, left out of rows"
+    ]
+
+
+def test_write_nothing(tmp_path):
+    write_json(iter([]), tmp_path / "empty.json")
+    assert json.loads((tmp_path / "empty.json").read_text()) == []
+    write_jsonl(iter([]), tmp_path / "empty.jsonl")
+    assert (tmp_path / "empty.jsonl").read_text() == ""
+    write_csv(iter([]), tmp_path / "empty.csv")
+    assert (tmp_path / "empty.csv").read_text() == ""
+
+
+def test_populate_from_iterator(tmp_path):
+    engine = database.set_up_database(tmp_path / "test.db")
+    pages = generate_pages("video", pages=3, items_per_page=10)
+    database.populate_videos(engine, parser.iter_videos(pages))
+
+    comments = list(generate_pages("comment", pages=2, items_per_page=10))
+    database.populate_comments(engine, [parser.parse_comments(comments)])
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM video")).scalar() == 30
+        assert conn.execute(text("SELECT COUNT(*) FROM comment")).scalar() == 20
+
+
+def test_populate_wrong_type(tmp_path):
+    engine = database.set_up_database(tmp_path / "test.db")
+    with pytest.raises(TypeError):
+        database.populate_videos(engine, parser.parse_videos([]))
@@ -0,0 +1,55 @@
+import pytest
+
+from youte.jsonl import JsonlFile
+from youte.synthetic import generate_pages, write_corpus
+
+
+@pytest.fixture()
+def videos(tmp_path):
+    return write_corpus(tmp_path / "videos.jsonl", "video", 7, 3)
+
+
+def test_iterate(videos):
+    with JsonlFile(videos) as f:
+        assert list(f) == list(generate_pages("video", 7, 3))
+        assert f._index is None
+
+
+def test_random_access(videos):
+    pages = list(generate_pages("video", 7, 3))
+    with JsonlFile(videos) as f:
+        assert f.count() == 7
+        assert f[3] == pages[3]
+        assert f[-1] == pages[-1]
+        with pytest.raises(IndexError):
+            f[7]
+
+
+def test_blank_lines(tmp_path):
+    path = tmp_path / "pages.jsonl"
+    path.write_text('{"a": 1}\n\n  \r\n{}\n{"b": 2}')
+    with JsonlFile(path) as f:
+        assert list(f) == [{"a": 1}, {}, {"b": 2}]
+        assert f.count() == 3
+        assert f[-1] == {"b": 2}
+
+
+def test_empty(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.touch()
+    with JsonlFile(path) as f:
+        assert list(f) == []
+        assert f.count() == 0
+        assert f.ranges(100) == []
+
+
+def test_ranges(videos):
+    with JsonlFile(videos) as f:
+        data = videos.read_bytes()
+        for chunk_size in (1, 1000, len(data), 10 * len(data)):
+            ranges = f.ranges(chunk_size)
+            assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+            assert all(data[end - 1 : end] == b"\n" for _, end in ranges)
+            pages = [page for start, end in ranges for page in f.read(start, end)]
+            assert pages == list(f)
+        assert len(f.ranges(1)) == 7
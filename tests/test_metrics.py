@@ -0,0 +1,56 @@
+import json
+
+import youte.collector
+from youte.collector import Youte
+from youte.metrics import Histogram, Metrics, MetricsReporter
+from youte.stub import StubConfig, StubServer
+
+
+def test_histogram_is_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 1), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4
+
+
+def test_requests_are_recorded(monkeypatch):
+    monkeypatch.setattr(youte.collector, "_BACKOFF", 0)
+    metrics = Metrics()
+    with StubServer(StubConfig(videos=120, error_rate=0.3)) as server:
+        yob = Youte(api_key="any", base_url=server.base_url, metrics=metrics)
+        [page for page in yob.search("anything", max_pages_retrieved=2)]
+        [page for page in yob.get_video_metadata(server.video_ids)]
+
+    snapshot = metrics.snapshot()
+    search = snapshot["endpoints"]["search"]
+    videos = snapshot["endpoints"]["videos"]
+    assert search["pages"] == 2
+    assert search["quota_units"] == 200
+    assert videos["items"] == 120
+    assert videos["requests"]["200"] == 3
+    assert snapshot["quota_units"] == server.stats.quota_used
+    assert search["retries"] + videos["retries"] == server.stats.errors
+    assert videos["latency_seconds"]["count"] == 3 + videos["retries"]
+    assert videos["bytes_received"] > 0
+
+
+def test_export(tmp_path):
+    metrics = Metrics()
+    metrics.observe_request("videos", 200, 0.3, 1000)
+    metrics.observe_page("videos", 50)
+    with metrics.stage("write"):
+        pass
+
+    with MetricsReporter(metrics, tmp_path / "metrics.json", interval=0.01):
+        pass
+    snapshot = json.loads((tmp_path / "metrics.json").read_text())
+    assert snapshot["endpoints"]["videos"]["items"] == 50
+    assert "write" in snapshot["stage_seconds"]
+
+    metrics.write(tmp_path / "youte.prom")
+    text = (tmp_path / "youte.prom").read_text()
+    assert 'youte_requests_total{endpoint="videos",status="200"} 1' in text
+    assert 'youte_request_duration_seconds_bucket{endpoint="videos",le="0.5"} 1' in text
+    assert 'youte_quota_units_total{endpoint="videos"} 1' in text
+    assert "# TYPE youte_request_duration_seconds histogram" in text
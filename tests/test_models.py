@@ -0,0 +1,31 @@
+from typing import List
+
+from youte.common import Flattener, field_types
+from youte.partition import partition_columns
+from youte.resources import Comment, Video
+from youte.table import BoolColumn, IntColumn, ListColumn, StringColumn, Table
+
+
+def test_field_types():
+    types = field_types(Video)
+    assert list(types)[:3] == ["kind", "id", "published_at"]
+    assert types["tags"] == List[str]
+    assert types["like_count"] is int
+    assert types["meta"] is dict
+    assert list(field_types(Comment)) == list(Table(Comment).names)
+
+
+def test_columns_from_models():
+    columns = Table(Video).columns
+    assert isinstance(columns["tags"], ListColumn)
+    assert isinstance(columns["view_count"], IntColumn)
+    assert isinstance(columns["caption"], BoolColumn)
+    assert isinstance(columns["definition"], StringColumn)
+    assert Flattener.for_model(Video).nested == [(len(columns) - 1, "meta")]
+    assert "tags" not in partition_columns("video")
+    assert "meta" not in partition_columns("video")
+
+
+def test_cli_imports():
+    # the CLI imports every module, with pydantic 1 or 2
+    import youte.cli  # noqa: F401
@@ -0,0 +1,116 @@
+import csv
+import json
+import logging
+
+import pytest
+from click.testing import CliRunner
+
+from youte import database, parser
+from youte.cli import youte
+from youte.common import write_csv
+from youte.parallel import (
+    parse_file,
+    parse_file_to_csv,
+    parse_file_to_database,
+    split_file,
+)
+from youte.synthetic import generate_pages, write_corpus
+
+
+@pytest.fixture(scope="module")
+def comments(tmp_path_factory):
+    return write_corpus(
+        tmp_path_factory.mktemp("data") / "comments.jsonl", "comment", 12, 20
+    )
+
+
+def _pages(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_split_file(comments):
+    chunks = split_file(comments, 5000)
+    assert len(chunks) > 2
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == comments.stat().st_size
+    data = comments.read_bytes()
+    for start, end in chunks:
+        assert data[end - 1 : end] == b"\n"
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_file(comments, jobs):
+    records = list(parse_file(comments, jobs=jobs, chunk_size=5000))
+    expected = parser.parse_comments(_pages(comments)).items
+    assert [r.to_model() for r in records] == expected
+
+    unordered = parse_file(comments, jobs=jobs, ordered=False, chunk_size=5000)
+    assert sorted(r.id for r in unordered) == sorted(c.id for c in expected)
+
+
+def test_parse_file_to_csv(comments, tmp_path):
+    rows = parse_file_to_csv(
+        comments, tmp_path / "parallel.csv", jobs=2, chunk_size=5000
+    )
+    write_csv(parser.iter_comments(_pages(comments)), tmp_path / "serial.csv")
+    assert rows == 240
+    assert (tmp_path / "parallel.csv").read_text(encoding="utf-8-sig") == (
+        tmp_path / "serial.csv"
+    ).read_text(encoding="utf-8-sig")
+
+
+def test_parse_file_to_database(comments, tmp_path):
+    engine = database.set_up_database(tmp_path / "comments.db")
+    assert parse_file_to_database(comments, engine, jobs=2, chunk_size=5000) == 240
+    assert parse_file_to_database(comments, engine, jobs=2, chunk_size=5000) == 0
+
+    serial = database.set_up_database(tmp_path / "serial.db")
+    database.populate_comments(serial, [parser.parse_comments(_pages(comments))])
+    with engine.connect() as a, serial.connect() as b:
+        query = database.Comment.__table__.select().order_by("id")
+        assert a.execute(query).all() == b.execute(query).all()
+
+
+def test_empty_file(tmp_path):
+    empty = tmp_path / "empty.jsonl"
+    empty.touch()
+    assert list(parse_file(empty)) == []
+    assert parse_file_to_csv(empty, tmp_path / "empty.csv") == 0
+
+
+def test_empty_first_page(tmp_path, caplog):
+    pages = list(generate_pages("comment", pages=3, items_per_page=10))
+    pages[0]["items"] = []
+    path = tmp_path / "comments.jsonl"
+    path.write_text("".join(json.dumps(page) + "\n" for page in pages))
+    with caplog.at_level(logging.WARNING):
+        assert parse_file_to_csv(path, tmp_path / "comments.csv", jobs=2) == 20
+    with open(tmp_path / "comments.csv", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["id"] for row in rows] == [c.id for c in parser.iter_comments(pages)]
+    assert rows[0]["meta_version"] == pages[1]["_youte"]["version"]
+    assert not caplog.records
+
+
+def test_first_line_not_a_page(tmp_path):
+    path = tmp_path / "comments.jsonl"
+    path.write_text(json.dumps(list(generate_pages("comment", 2, 2))))
+    with pytest.raises(ValueError, match="not a page of results"):
+        parse_file_to_csv(path, tmp_path / "comments.csv", jobs=2)
+    result = CliRunner().invoke(
+        youte, ["parse", str(path), "-o", str(tmp_path / "out.csv"), "--jobs", "2"]
+    )
+    assert result.exit_code == 1
+    assert "not a page of results" in result.output
+
+
+def test_cli_jobs(comments, tmp_path):
+    output = tmp_path / "comments.csv"
+    result = CliRunner().invoke(
+        youte, ["parse", str(comments), "-o", str(output), "--jobs", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    with open(output, encoding="utf-8-sig") as f:
+        assert len(list(csv.DictReader(f))) == 240
@@ -0,0 +1,87 @@
+import sys
+
+import pytest
+
+from youte import parser
+from youte.synthetic import generate_pages
+
+
+def test_requires_pyarrow(tmp_path, monkeypatch):
+    from youte.parquet import ParquetWriter
+
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        ParquetWriter(tmp_path / "videos.parquet", "video")
+
+
+def test_schema():
+    pa = pytest.importorskip("pyarrow")
+    from youte.parquet import arrow_schema
+    from youte.resources import Video
+
+    schema = arrow_schema(Video)
+    assert schema.names == list(Video.__fields__)
+    assert schema.field("view_count").type == pa.int64()
+    assert schema.field("published_at").type == pa.timestamp("us", tz="UTC")
+    assert schema.field("tags").type == pa.list_(pa.string())
+    assert schema.field("meta").type == pa.string()
+
+
+@pytest.mark.parametrize(
+    "kind,tabulate",
+    [
+        ("search", parser.tabulate_searches),
+        ("video", parser.tabulate_videos),
+        ("channel", parser.tabulate_channels),
+        ("comment", parser.tabulate_comments),
+    ],
+)
+def test_row_groups(tmp_path, kind, tabulate):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from youte.parquet import ParquetWriter
+
+    pages = list(generate_pages(kind, pages=5, items_per_page=10))
+    with ParquetWriter(tmp_path / "out.parquet", kind, row_group_size=20) as writer:
+        for page in pages:
+            assert writer.write(page) == 10
+    assert writer.count == 50
+
+    file = pq.ParquetFile(tmp_path / "out.parquet")
+    assert file.metadata.num_row_groups == 3
+    assert file.metadata.row_group(0).column(0).compression == "ZSTD"
+    written = file.read()
+    expected = tabulate(pages)
+    for name in expected.names:
+        if name != "meta":
+            assert written[name].to_pylist() == expected[name]
+
+
+def test_write_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from youte.parquet import write_parquet
+
+    pages = list(generate_pages("comment", pages=2, items_per_page=5))
+    comments = parser.parse_comments(pages)
+    comments.to_parquet(tmp_path / "resources.parquet")
+    assert write_parquet(parser.iter_comments(pages), tmp_path / "items.parquet") == 10
+    resources = pq.read_table(tmp_path / "resources.parquet")
+    assert resources.equals(pq.read_table(tmp_path / "items.parquet"))
+    assert resources["id"].to_pylist() == [c.id for c in comments.items]
+
+    with pytest.raises(ValueError):
+        write_parquet([], tmp_path / "empty.parquet")
+    assert write_parquet([], tmp_path / "empty.parquet", kind="comment") == 0
+    assert pq.read_table(tmp_path / "empty.parquet").num_rows == 0
+
+
+def test_tidy_writer(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from youte.tidy import TidyWriter
+
+    pages = list(generate_pages("video", pages=3, items_per_page=4))
+    with TidyWriter(tmp_path / "videos.parquet", "video", "parquet") as writer:
+        for page in pages:
+            writer.write(page)
+    assert writer.count == 12
+    assert pq.read_table(tmp_path / "videos.parquet").num_rows == 12
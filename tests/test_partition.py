@@ -0,0 +1,219 @@
+import csv
+import functools
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from youte import parser, partition
+from youte.partition import PartitionedWriter, partition_name
+from youte.synthetic import generate_pages, write_corpus
+from youte.utilities import read_pages
+
+
+def _read_csv(paths):
+    rows = []
+    for path in paths:
+        with open(path, encoding="utf-8-sig") as f:
+            rows.extend(csv.DictReader(f))
+    return rows
+
+
+def test_partition_name():
+    assert partition_name("channel_id", "UC1") == "channel_id=UC1"
+    assert partition_name("video_id", None) == "video_id=__HIVE_DEFAULT_PARTITION__"
+    assert partition_name("title", "a/b c") == "title=a%2Fb%20c"
+
+
+def test_raw_partitions(tmp_path):
+    pages = list(generate_pages("comment", pages=4, items_per_page=10))
+    with PartitionedWriter(tmp_path, "comment", "video_id") as writer:
+        for page in pages:
+            writer.write(page)
+    assert writer.count == 40
+
+    comments = list(parser.iter_comments(pages))
+    video_ids = {c.video_id for c in comments}
+    assert {p.name for p in tmp_path.iterdir()} == {
+        f"video_id={video_id}" for video_id in video_ids
+    }
+    for video_id in video_ids:
+        partition = tmp_path / f"video_id={video_id}"
+        items = [
+            item
+            for path in partition.iterdir()
+            for page in read_pages(path)
+            for item in page["items"]
+        ]
+        assert [c.id for c in parser.iter_comments([{**pages[0], "items": items}])] == [
+            c.id for c in comments if c.video_id == video_id
+        ]
+
+
+def test_published_date(tmp_path):
+    pages = list(generate_pages("video", pages=2, items_per_page=10))
+    with PartitionedWriter(tmp_path, "video", "published_date", "csv") as writer:
+        for page in pages:
+            writer.write(page)
+    rows = 0
+    for path in writer.files:
+        date = path.parent.name.split("=")[1]
+        for row in _read_csv([path]):
+            assert row["published_at"].startswith(date)
+            rows += 1
+    assert rows == 20
+
+
+def test_rolling_and_update(tmp_path):
+    pages = list(generate_pages("video", pages=6, items_per_page=5))
+    with PartitionedWriter(tmp_path, "video", "kind", max_file_size=1) as writer:
+        for page in pages[:3]:
+            writer.write(page)
+    partition = tmp_path / "kind=youtube%23video"
+    assert sorted(p.name for p in partition.iterdir()) == [
+        "part-00000.jsonl",
+        "part-00001.jsonl",
+        "part-00002.jsonl",
+    ]
+
+    # writing again adds files instead of overwriting them
+    with PartitionedWriter(tmp_path, "video", "kind") as writer:
+        for page in pages[3:]:
+            writer.write(page)
+    assert len(list(partition.iterdir())) == 4
+    written = [
+        page for path in sorted(partition.iterdir()) for page in read_pages(path)
+    ]
+    assert written == pages
+
+
+@pytest.mark.parametrize("file_format", ["raw", "csv", "jsonl"])
+def test_reopen_closed_files(tmp_path, monkeypatch, file_format):
+    monkeypatch.setattr(partition, "MAX_OPEN_FILES", 4)
+    pages = list(generate_pages("comment", pages=10, items_per_page=20))
+    with PartitionedWriter(
+        tmp_path, "comment", "published_date", file_format
+    ) as writer:
+        for page in pages:
+            writer.write(page)
+    partitions = list(tmp_path.iterdir())
+    assert len(partitions) > 4 * partition.MAX_OPEN_FILES
+    # files closed to make room for other partitions are added to when reopened
+    assert all(len(list(p.iterdir())) == 1 for p in partitions)
+    assert len(writer.files) == len(partitions)
+    if file_format == "csv":
+        rows = _read_csv(writer.files)
+        assert sorted(row["id"] for row in rows) == sorted(
+            c.id for c in parser.iter_comments(pages)
+        )
+    else:
+        lines = [
+            json.loads(line)
+            for path in writer.files
+            for line in path.read_text().splitlines()
+        ]
+        if file_format == "raw":
+            lines = [item for page in lines for item in page["items"]]
+        assert len(lines) == 200
+
+
+def test_parquet_rolling(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    pages = list(generate_pages("video", pages=20, items_per_page=50))
+    with PartitionedWriter(
+        tmp_path, "video", "kind", "parquet", max_file_size=50_000
+    ) as writer:
+        for page in pages:
+            writer.write(page)
+    assert len(writer.files) > 1
+    # files are rolled over by the size of the rows held in memory too
+    assert all(path.stat().st_size < 2 * 50_000 for path in writer.files)
+    assert sum(pq.read_metadata(path).num_rows for path in writer.files) == 1000
+
+
+def test_invalid_column(tmp_path):
+    with pytest.raises(ValueError, match="cannot be partitioned by tags"):
+        PartitionedWriter(tmp_path, "video", "tags")
+
+
+def test_cli_partitions(tmp_path, monkeypatch):
+    import youte.cli
+    from youte.collector import Youte
+    from youte.stub import StubConfig, StubServer
+
+    with StubServer(StubConfig(videos=60)) as server:
+        monkeypatch.setattr(
+            youte.cli, "Youte", functools.partial(Youte, base_url=server.base_url)
+        )
+        (tmp_path / "ids.txt").write_text("\n".join(server.video_ids))
+        result = CliRunner().invoke(
+            youte.cli.youte,
+            ["videos", "-f", str(tmp_path / "ids.txt"), "--key", "any"]
+            + ["-o", str(tmp_path / "raw"), "--tidy-to", str(tmp_path / "tidy")]
+            + ["--partition-by", "channel_id"],
+        )
+    assert result.exit_code == 0, result.output
+    raw = [
+        json.loads(line)
+        for path in (tmp_path / "raw").glob("*/*.jsonl")
+        for line in path.read_text().splitlines()
+    ]
+    assert sum(len(page["items"]) for page in raw) == 60
+    rows = _read_csv((tmp_path / "tidy").glob("channel_id=*/*.csv"))
+    assert sorted(row["id"] for row in rows) == sorted(server.video_ids)
+
+
+def test_cli_replies_by_video(tmp_path, monkeypatch):
+    import youte.cli
+    from youte.collector import Youte
+    from youte.stub import StubConfig, StubServer
+
+    config = StubConfig(videos=3, threads_per_video=20)
+    with StubServer(config) as server:
+        monkeypatch.setattr(
+            youte.cli, "Youte", functools.partial(Youte, base_url=server.base_url)
+        )
+        videos = server.video_ids
+        result = CliRunner().invoke(
+            youte.cli.youte,
+            ["comments", *videos, "-v", "-r", "--key", "any"]
+            + ["-o", str(tmp_path / "raw"), "--partition-by", "video_id"],
+        )
+        assert result.exit_code == 0, result.output
+        result = CliRunner().invoke(
+            youte.cli.youte,
+            ["replies", "anything", "--key", "any"]
+            + ["-o", str(tmp_path / "replies"), "--partition-by", "video_id"],
+        )
+    assert result.exit_code == 2
+    assert "replies do not name their video" in result.output
+
+    assert not (tmp_path / "raw" / partition.DEFAULT_PARTITION).exists()
+    replies = 0
+    for video_id in videos:
+        path = tmp_path / "raw" / f"video_id={video_id}" / "part-00000.jsonl"
+        pages = list(read_pages(path))
+        threads = {
+            item["id"]
+            for page in pages
+            for item in page["items"]
+            if item["kind"] == "youtube#commentThread"
+        }
+        for page in pages:
+            for item in page["items"]:
+                if item["kind"] == "youtube#comment":
+                    assert item["snippet"]["parentId"] in threads
+                    replies += 1
+    assert replies
+
+
+def test_cli_parse(tmp_path):
+    from youte.cli import youte
+
+    path = write_corpus(tmp_path / "comments.jsonl", "comment", 4, 10)
+    output = tmp_path / "comments"
+    result = CliRunner().invoke(
+        youte, ["parse", str(path), "-o", str(output), "--partition-by", "video_id"]
+    )
+    assert result.exit_code == 0, result.output
+    assert len(_read_csv(output.glob("video_id=*/part-*.csv"))) == 40
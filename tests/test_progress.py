@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+import pytest
+
+from youte.collector import Youte
+from youte.progress import Progress
+from youte.stub import StubConfig, StubServer
+
+
+@pytest.fixture()
+def server():
+    with StubServer(StubConfig(videos=120, threads_per_video=80)) as s:
+        yield s
+
+
+def test_eta():
+    progress = Progress("videos", "batches", units_done=1, units_total=4, elapsed=10)
+    assert progress.fraction == 0.25
+    assert progress.eta == timedelta(seconds=30)
+    assert "1/4 batches" in str(progress)
+
+    searching = Progress("search", "pages", items=50, items_total=200, elapsed=2)
+    assert searching.eta == timedelta(seconds=6)
+    assert searching.items_per_second == 25
+
+    assert Progress("videos", "pages").eta is None
+
+
+def test_video_batches(server):
+    reports = []
+    yob = Youte(api_key="any", base_url=server.base_url, progress=reports.append)
+    [page for page in yob.get_video_metadata(server.video_ids)]
+
+    assert [p.units_done for p in reports if p.pages == 3] == [2, 3, 3]
+    assert reports[-1].finished
+    assert reports[-1].items == 120
+    assert reports[-1].units_total == 3
+
+
+def test_search_total_from_page_info(server):
+    reports = []
+    yob = Youte(api_key="any", base_url=server.base_url, progress=reports.append)
+    [page for page in yob.search("anything", max_pages_retrieved=2)]
+
+    assert reports[0].items_total == 100
+    assert reports[0].fraction == 0.5
+    assert reports[-1].finished
+
+
+def test_comments_by_video(server):
+    reports = []
+    yob = Youte(api_key="any", base_url=server.base_url, progress=reports.append)
+    video_ids = server.video_ids[:3]
+    pages = [page for page in yob.get_comment_threads(video_ids=video_ids)]
+
+    assert reports[-1].units_done == 3
+    assert reports[-1].items == sum(len(page["items"]) for page in pages)
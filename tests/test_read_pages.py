@@ -0,0 +1,132 @@
+import csv
+import json
+import tracemalloc
+
+import pytest
+from click.testing import CliRunner
+
+from youte import utilities
+from youte.cli import youte
+from youte.synthetic import generate_pages, write_corpus
+from youte.utilities import (
+    RawWriter,
+    export_file,
+    read_pages,
+    retrieve_ids_from_file,
+)
+
+
+@pytest.mark.parametrize(
+    "name", ["videos.json", "videos.jsonl", "videos.json.gz", "videos.jsonl.gz"]
+)
+def test_read_pages(tmp_path, monkeypatch, name):
+    monkeypatch.setattr(utilities, "_READ_SIZE", 100)
+    path = write_corpus(tmp_path / name, "video", 5, 10)
+    assert list(read_pages(path)) == list(generate_pages("video", 5, 10))
+
+
+@pytest.mark.parametrize("file_format", ["json", "jsonl"])
+@pytest.mark.parametrize("compression", ["gz", "zst"])
+def test_compressed_export(tmp_path, file_format, compression):
+    if compression == "zst":
+        pytest.importorskip("zstandard")
+    pages = list(generate_pages("video", 4, 3))
+    path = tmp_path / f"videos.{file_format}.{compression}"
+    export_file(pages, path, file_format=file_format)
+    assert list(read_pages(path)) == pages
+    assert len(list(retrieve_ids_from_file(path))) == 12
+    magic = {"gz": b"\x1f\x8b", "zst": b"\x28\xb5\x2f\xfd"}[compression]
+    assert path.read_bytes().startswith(magic)
+    if file_format == "jsonl":
+        # appending adds a gzip member or zstd frame to the same file
+        export_file(pages[:1], path, file_format="jsonl", append=True)
+        assert list(read_pages(path)) == pages + pages[:1]
+
+
+def test_read_pretty_json(tmp_path):
+    pages = list(generate_pages("channel", 3, 2))
+    path = tmp_path / "channels.json"
+    path.write_text(json.dumps(pages, indent=4))
+    assert list(read_pages(path)) == pages
+    assert len(list(retrieve_ids_from_file(path))) == 6
+
+
+def test_read_invalid(tmp_path):
+    path = tmp_path / "invalid.json"
+    path.write_text('[{"kind": "youtube#videoListResponse"}, {"items": ')
+    pages = read_pages(path)
+    assert next(pages) == {"kind": "youtube#videoListResponse"}
+    with pytest.raises(json.JSONDecodeError):
+        next(pages)
+
+
+def test_read_memory(tmp_path):
+    path = write_corpus(tmp_path / "comments.json", "comment", 200)
+    tracemalloc.start()
+    for _ in read_pages(path):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < path.stat().st_size / 4
+
+
+@pytest.mark.parametrize("name", ["comments.json", "comments.jsonl.gz"])
+def test_cli_parse(tmp_path, name):
+    path = write_corpus(tmp_path / name, "comment", 4, 10)
+    output = tmp_path / "comments.csv"
+    result = CliRunner().invoke(youte, ["parse", str(path), "-o", str(output)])
+    assert result.exit_code == 0, result.output
+    with open(output, encoding="utf-8-sig") as f:
+        assert len(list(csv.DictReader(f))) == 40
+
+
+@pytest.mark.parametrize("flush", ["page", "fsync"])
+def test_raw_writer_streams(tmp_path, flush):
+    pages = list(generate_pages("video", 3, 2))
+    path = tmp_path / "videos.json"
+    with pytest.raises(KeyboardInterrupt):
+        with RawWriter(path, "json", pretty=True, flush=flush) as writer:
+            for n, page in enumerate(pages, 1):
+                writer.write(page)
+                assert (
+                    path.read_text().count('"kind": "youtube#videoListResponse"') == n
+                )
+            raise KeyboardInterrupt
+    # the array is closed when collection stops
+    assert json.loads(path.read_text()) == pages
+
+
+@pytest.mark.parametrize("file_format", ["json", "jsonl"])
+@pytest.mark.parametrize("pretty", [False, True])
+def test_raw_writer_matches_export(tmp_path, file_format, pretty):
+    pages = list(generate_pages("comment", 3, 2))
+    for n in (0, 1, 3):
+        export_file(pages[:n], tmp_path / "export", file_format, pretty=pretty)
+        with RawWriter(tmp_path / "raw", file_format, pretty=pretty) as writer:
+            for page in pages[:n]:
+                writer.write(page)
+        assert (tmp_path / "raw").read_text() == (tmp_path / "export").read_text()
+
+
+def test_raw_writer_stdout(capsys):
+    pages = list(generate_pages("video", 3, 2))
+    with RawWriter("-", "jsonl", flush="fsync") as writer:
+        for n, page in enumerate(pages, 1):
+            writer.write(page)
+            assert len(capsys.readouterr().out.splitlines()) == 1
+    # standard output is left open for whatever is written after
+    print("done")
+    assert capsys.readouterr().out == "done\n"
+    with pytest.raises(ValueError, match="standard output"):
+        RawWriter("-", "json")
+
+
+def test_cli_parse_stdin(tmp_path):
+    path = write_corpus(tmp_path / "comments.jsonl", "comment", 4, 10)
+    output = tmp_path / "comments.csv"
+    result = CliRunner().invoke(
+        youte, ["parse", "-", "-o", str(output)], input=path.read_text()
+    )
+    assert result.exit_code == 0, result.output
+    with open(output, encoding="utf-8-sig") as f:
+        assert len(list(csv.DictReader(f))) == 40
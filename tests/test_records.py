@@ -0,0 +1,74 @@
+import pickle
+import tracemalloc
+
+import pytest
+from sqlalchemy import text
+
+from youte import database, parser
+from youte.records import CommentRecord, VideoRecord
+from youte.synthetic import generate_pages
+
+
+@pytest.mark.parametrize(
+    "kind,parse",
+    [
+        ("search", parser.parse_searches),
+        ("video", parser.parse_videos),
+        ("channel", parser.parse_channels),
+        ("comment", parser.parse_comments),
+    ],
+)
+def test_records_match_models(kind, parse):
+    pages = list(generate_pages(kind, pages=2, items_per_page=20))
+    models = parse(pages).items
+    records = parse(pages, validation="sampled", compact=True).items
+
+    assert [dict(record) for record in records] == [dict(model) for model in models]
+    assert [record.to_model() for record in records] == models
+    assert records[0].id == models[0].id
+
+
+def test_export(tmp_path):
+    pages = list(generate_pages("comment", pages=2, items_per_page=20))
+    parser.parse_comments(pages).to_csv(tmp_path / "models.csv")
+    parser.parse_comments(pages, compact=True).to_csv(tmp_path / "records.csv")
+    assert (tmp_path / "models.csv").read_text() == (
+        tmp_path / "records.csv"
+    ).read_text()
+
+    parser.parse_comments(pages).to_json(tmp_path / "models.json")
+    parser.parse_comments(pages, compact=True).to_json(tmp_path / "records.json")
+    assert (tmp_path / "models.json").read_text() == (
+        tmp_path / "records.json"
+    ).read_text()
+
+
+def test_populate(tmp_path):
+    engine = database.set_up_database(tmp_path / "test.db")
+    pages = generate_pages("video", pages=2, items_per_page=10)
+    database.populate_videos(engine, parser.iter_videos(pages, compact=True))
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM video")).scalar() == 20
+
+
+def test_pickle():
+    pages = list(generate_pages("video", pages=1, items_per_page=5))
+    video = parser.parse_videos(pages, compact=True).items[0]
+    assert isinstance(video, VideoRecord)
+    assert pickle.loads(pickle.dumps(video)) == video
+
+
+def test_memory():
+    pages = list(generate_pages("comment", pages=20, items_per_page=50))
+
+    def size(compact):
+        tracemalloc.start()
+        items = parser.parse_comments(pages, validation="trusted", compact=compact)
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(items.items) == 1000
+        return used
+
+    assert size(compact=True) < size(compact=False) / 2
+    assert not hasattr(CommentRecord(id="x"), "__dict__")
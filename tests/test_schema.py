@@ -0,0 +1,52 @@
+import pytest
+
+from youte import database
+from youte.resources import Video
+from youte.schema import CHANNEL, COMMENT, SEARCH, VIDEO, Field, Schema
+
+
+@pytest.mark.parametrize(
+    "schema,table",
+    [
+        (SEARCH, database.Search),
+        (VIDEO, database.Video),
+        (CHANNEL, database.Channel),
+        (COMMENT, database.Comment),
+    ],
+)
+def test_schema_matches_model_and_table(schema, table):
+    assert schema.names == list(schema.model.__fields__)
+    stored = {f.name for f in schema.stored}
+    assert stored == set(table.__table__.columns.keys())
+
+
+def test_paths():
+    schema = Schema(
+        Video,
+        [
+            Field("id", "id"),
+            Field("title", "snippet.title"),
+            Field("view_count", "statistics?.viewCount", int),
+            Field("duration", "contentDetails.duration?"),
+            Field("meta", "@meta"),
+        ],
+    )
+    item = {"id": "a", "snippet": {"title": "t"}, "contentDetails": {}}
+    assert schema.extract(item, {"q": 1}) == {
+        "id": "a",
+        "title": "t",
+        "view_count": None,
+        "duration": None,
+        "meta": {"q": 1},
+    }
+
+    item["statistics"] = {"viewCount": "12"}
+    assert schema.extract(item, {})["view_count"] == 12
+
+    del item["snippet"]
+    with pytest.raises(KeyError):
+        schema.extract(item, {})
+
+
+def test_shared_lookups():
+    assert VIDEO.source.count("item['snippet']") == 1
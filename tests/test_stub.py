@@ -0,0 +1,67 @@
+import pytest
+
+import youte.collector
+from youte import parser
+from youte.collector import Youte
+from youte.exceptions import MaxQuotaReached
+from youte.resources import Channels, Comments, Searches, Videos
+from youte.stub import StubConfig, StubServer
+
+
+@pytest.fixture()
+def server():
+    with StubServer(StubConfig(videos=120, channels=10, threads_per_video=80)) as s:
+        yield s
+
+
+@pytest.fixture()
+def yob(server) -> Youte:
+    return Youte(api_key="any", base_url=server.base_url)
+
+
+def test_search_paginates(yob, server):
+    pages = [page for page in yob.search("anything", max_pages_retrieved=2)]
+    assert len(pages) == 2
+    assert pages[0]["pageInfo"]["totalResults"] == 120
+    assert server.stats.quota_used == 200
+    assert isinstance(parser.parse_searches(pages), Searches)
+
+
+def test_videos_in_batches(yob, server):
+    pages = [page for page in yob.get_video_metadata(server.video_ids)]
+    assert [len(page["items"]) for page in pages] == [50, 50, 20]
+    assert len(parser.parse_videos(pages).items) == 120
+
+
+def test_channels(yob, server):
+    pages = [page for page in yob.get_channel_metadata(server.channel_ids)]
+    assert isinstance(parser.parse_channels(pages), Channels)
+
+
+def test_comments_and_replies(yob, server):
+    video_id = server.video_ids[0]
+    pages = [page for page in yob.get_comment_threads(video_ids=[video_id])]
+    threads = parser.parse_comments(pages)
+    assert len(threads.items) == server.n_threads(video_id)
+
+    thread_ids = [c.id for c in threads.items if c.total_reply_count > 0]
+    replies = parser.parse_comments(yob.get_thread_replies(thread_ids))
+    assert isinstance(replies, Comments)
+    assert len(replies.items) == sum(server.n_replies(t) for t in thread_ids)
+
+
+def test_quota_exceeded():
+    with StubServer(StubConfig(quota=150)) as server:
+        yob = Youte(api_key="any", base_url=server.base_url)
+        with pytest.raises(MaxQuotaReached):
+            [page for page in yob.search("anything")]
+
+
+def test_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(youte.collector, "_BACKOFF", 0)
+    with StubServer(StubConfig(videos=200, error_rate=0.3)) as server:
+        yob = Youte(api_key="any", base_url=server.base_url)
+        videos = parser.parse_videos(yob.get_video_metadata(server.video_ids))
+        assert isinstance(videos, Videos)
+        assert len(videos.items) == 200
+        assert server.stats.errors > 0
@@ -0,0 +1,61 @@
+import gzip
+import json
+
+import pytest
+
+from youte import parser
+from youte.synthetic import CorpusSpec, generate_pages, write_corpus
+
+
+@pytest.mark.parametrize(
+    "kind,parse",
+    [
+        ("search", parser.parse_searches),
+        ("video", parser.parse_videos),
+        ("channel", parser.parse_channels),
+        ("comment", parser.parse_comments),
+        ("reply", parser.parse_comments),
+    ],
+)
+def test_pages_can_be_parsed(kind, parse):
+    pages = list(generate_pages(kind, pages=3, items_per_page=20))
+    assert "nextPageToken" in pages[0]
+    assert "nextPageToken" not in pages[-1]
+    assert len(parse(pages).items) == 60
+
+
+def test_pages_are_seedable():
+    first = list(generate_pages("video", pages=2, seed=42))
+    second = list(generate_pages("video", pages=2, seed=42))
+    other = list(generate_pages("video", pages=2, seed=43))
+    assert first == second
+    assert first != other
+
+
+def test_spec():
+    spec = CorpusSpec(comment_words=(5, 5), reply_rate=1.0)
+    for page in generate_pages("comment", pages=2, spec=spec):
+        for item in page["items"]:
+            snippet = item["snippet"]
+            assert (
+                len(snippet["topLevelComment"]["snippet"]["textOriginal"].split()) == 5
+            )
+            assert snippet["totalReplyCount"] > 0
+
+
+@pytest.mark.parametrize("name", ["corpus.json", "corpus.jsonl.gz"])
+def test_write_corpus(tmp_path, name):
+    path = write_corpus(tmp_path / name, "comment", pages=5, items_per_page=10)
+    if name.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            pages = [json.loads(line) for line in f]
+    else:
+        with open(path, encoding="utf-8") as f:
+            pages = json.loads(f.read())
+    assert len(pages) == 5
+    assert pages == list(generate_pages("comment", pages=5, items_per_page=10))
+
+
+def test_write_corpus_wrong_suffix(tmp_path):
+    with pytest.raises(ValueError):
+        write_corpus(tmp_path / "corpus.csv", "video", pages=1)
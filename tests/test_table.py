@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from youte import parser
+from youte.synthetic import generate_pages
+from youte.table import BoolColumn, IntColumn, StringColumn, TimestampColumn
+
+
+@pytest.mark.parametrize(
+    "kind,parse,tabulate",
+    [
+        ("search", parser.parse_searches, parser.tabulate_searches),
+        ("video", parser.parse_videos, parser.tabulate_videos),
+        ("channel", parser.parse_channels, parser.tabulate_channels),
+        ("comment", parser.parse_comments, parser.tabulate_comments),
+    ],
+)
+def test_table_matches_parse(kind, parse, tabulate):
+    pages = list(generate_pages(kind, pages=3, items_per_page=20))
+    items = parse(pages).items
+    table = tabulate(pages)
+
+    assert len(table) == len(items)
+    assert table.names == list(items[0].__fields__)
+    for name in table.names:
+        assert table[name] == [getattr(item, name) for item in items]
+    assert list(table.rows()) == items
+
+
+def test_column_types():
+    pages = list(generate_pages("video", pages=1, items_per_page=10))
+    columns = parser.tabulate_videos(pages).columns
+    assert isinstance(columns["view_count"], IntColumn)
+    assert isinstance(columns["caption"], BoolColumn)
+    assert isinstance(columns["published_at"], TimestampColumn)
+    assert isinstance(columns["definition"], StringColumn)
+
+
+def test_missing_values():
+    pages = list(generate_pages("comment", pages=1, items_per_page=10))
+    pages[0]["items"][0] = {
+        **pages[0]["items"][0],
+        "snippet": pages[0]["items"][0]["snippet"]["topLevelComment"]["snippet"],
+    }
+    table = parser.tabulate_comments(pages)
+    column = table.columns["total_reply_count"]
+    assert column.null_count == 1
+    assert table["total_reply_count"][0] is None
+    assert isinstance(table["published_at"][0], datetime)
+
+
+def test_validation():
+    pages = list(generate_pages("comment", pages=1, items_per_page=10))
+    pages[0]["items"][3]["snippet"]["topLevelComment"]["snippet"]["viewerRating"] = "?"
+    assert len(parser.tabulate_comments(pages)) == 10
+    with pytest.raises(ValidationError):
+        parser.tabulate_comments(pages, validation="strict")
+
+    pages[0]["items"][3]["snippet"]["topLevelComment"]["snippet"]["likeCount"] = "x"
+    with pytest.raises(ValueError, match="like_count"):
+        parser.tabulate_comments(pages, validation="trusted")
+
+
+def test_to_numpy():
+    np = pytest.importorskip("numpy")
+    pages = list(generate_pages("video", pages=2, items_per_page=10))
+    table = parser.tabulate_videos(pages)
+    arrays = table.to_numpy()
+    assert arrays["view_count"].tolist() == table["view_count"]
+    assert arrays["published_at"].dtype == np.dtype("datetime64[us]")
+
+
+def test_to_arrow():
+    pytest.importorskip("pyarrow")
+    pages = list(generate_pages("comment", pages=2, items_per_page=10))
+    table = parser.tabulate_comments(pages)
+    arrow = table.to_arrow()
+    assert arrow.num_rows == 20
+    assert arrow.column("like_count").to_pylist() == table["like_count"]
+    assert arrow.column("text_display").to_pylist() == table["text_display"]
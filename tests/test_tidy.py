@@ -0,0 +1,192 @@
+import csv
+import functools
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from youte import parser
+from youte.common import write_csv, write_json, write_jsonl
+from youte.synthetic import generate_pages
+from youte.tidy import TidyWriter
+
+
+@pytest.mark.parametrize(
+    "kind,iter_parse",
+    [
+        ("search", parser.iter_searches),
+        ("video", parser.iter_videos),
+        ("channel", parser.iter_channels),
+        ("comment", parser.iter_comments),
+    ],
+)
+@pytest.mark.parametrize(
+    "file_format,write",
+    [("csv", write_csv), ("json", write_json), ("jsonl", write_jsonl)],
+)
+def test_matches_writers(tmp_path, kind, iter_parse, file_format, write):
+    pages = list(generate_pages(kind, pages=3, items_per_page=10))
+    with TidyWriter(tmp_path / "tidy", kind, file_format) as writer:
+        for page in pages:
+            assert writer.write(page) == 10
+    assert writer.count == 30
+    write(iter_parse(pages), tmp_path / "expected")
+    assert (tmp_path / "tidy").read_bytes() == (tmp_path / "expected").read_bytes()
+
+
+def test_header_from_schema(tmp_path):
+    with TidyWriter(tmp_path / "empty.csv", "video"):
+        pass
+    with open(tmp_path / "empty.csv", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f))
+    assert header[:3] == ["kind", "id", "published_at"]
+    assert "meta" not in header
+
+    pages = list(generate_pages("video", pages=2, items_per_page=2))
+    pages[0]["items"] = []
+    del pages[1]["_youte"]["user_agent"]
+    with TidyWriter(tmp_path / "videos.csv", "video") as writer:
+        for page in pages:
+            writer.write(page)
+    with open(tmp_path / "videos.csv", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2
+    assert rows[0]["meta_version"] == pages[1]["_youte"]["version"]
+    assert rows[0]["meta_user_agent"] == ""
+
+
+def test_sampled_across_pages(tmp_path, monkeypatch):
+    validated = []
+    validate = parser._Builder._validate
+
+    def counting(self, model, values):
+        validated.append(values["id"])
+        return validate(self, model, values)
+
+    monkeypatch.setattr(parser._Builder, "_validate", counting)
+    with TidyWriter(tmp_path / "videos.csv", "video", validation="sampled") as writer:
+        for page in generate_pages("video", pages=5, items_per_page=10):
+            writer.write(page)
+    assert writer.count == 50
+    assert len(validated) == 1
+
+
+def test_pretty_json(tmp_path):
+    pages = list(generate_pages("channel", pages=2, items_per_page=3))
+    with TidyWriter(tmp_path / "tidy.json", "channel", "json", pretty=True) as w:
+        for page in pages:
+            w.write(page)
+    write_json(parser.iter_channels(pages), tmp_path / "expected.json", pretty=True)
+    assert (tmp_path / "tidy.json").read_text() == (
+        tmp_path / "expected.json"
+    ).read_text()
+
+
+def test_cli_tidies_while_collecting(tmp_path, monkeypatch):
+    import youte.cli
+    from youte.collector import Youte
+    from youte.stub import StubConfig, StubServer
+
+    with StubServer(StubConfig(videos=120)) as server:
+        quota_used = []
+
+        class Spy(TidyWriter):
+            def write(self, page):
+                quota_used.append(server.stats.quota_used)
+                return super().write(page)
+
+        monkeypatch.setattr(
+            youte.cli, "Youte", functools.partial(Youte, base_url=server.base_url)
+        )
+        monkeypatch.setattr(youte.cli, "TidyWriter", Spy)
+        (tmp_path / "ids.txt").write_text("\n".join(server.video_ids))
+        result = CliRunner().invoke(
+            youte.cli.youte,
+            ["videos", "-f", str(tmp_path / "ids.txt"), "--key", "any"]
+            + ["-o", str(tmp_path / "raw.json")]
+            + ["--tidy-to", str(tmp_path / "videos.csv")],
+        )
+    assert result.exit_code == 0, result.output
+    # each page is tidied as soon as it is fetched
+    assert quota_used == [1, 2, 3]
+    with open(tmp_path / "videos.csv", encoding="utf-8-sig") as f:
+        assert len(list(csv.DictReader(f))) == 120
+
+
+def test_cli_writes_raw_while_collecting(tmp_path, monkeypatch):
+    import youte.cli
+    from youte.collector import Youte
+    from youte.stub import StubConfig, StubServer
+
+    raw = tmp_path / "raw.jsonl"
+    lines_written = []
+
+    class Spy(TidyWriter):
+        def write(self, page):
+            lines_written.append(len(raw.read_text().splitlines()))
+            return super().write(page)
+
+    with StubServer(StubConfig(videos=3, threads_per_video=30)) as server:
+        monkeypatch.setattr(
+            youte.cli, "Youte", functools.partial(Youte, base_url=server.base_url)
+        )
+        monkeypatch.setattr(youte.cli, "TidyWriter", Spy)
+        (tmp_path / "ids.txt").write_text("\n".join(server.video_ids))
+        result = CliRunner().invoke(
+            youte.cli.youte,
+            ["comments", "-v", "-r", "-f", str(tmp_path / "ids.txt"), "--key", "any"]
+            + ["-o", str(raw), "--output-format", "jsonl", "--max-results", "20"]
+            + ["--tidy-to", str(tmp_path / "comments.csv")],
+        )
+    assert result.exit_code == 0, result.output
+    # each page is in the raw file before it is tidied
+    assert lines_written == list(range(1, len(lines_written) + 1))
+    pages = [json.loads(line) for line in raw.read_text().splitlines()]
+    assert {page["kind"] for page in pages} == {
+        "youtube#commentThreadListResponse",
+        "youtube#commentListResponse",
+    }
+    with open(tmp_path / "comments.csv", encoding="utf-8-sig") as f:
+        assert len(list(csv.DictReader(f))) == sum(len(p["items"]) for p in pages)
+
+
+def test_cli_writes_to_stdout(tmp_path, monkeypatch):
+    import youte.cli
+    from youte.collector import Youte
+    from youte.stub import StubConfig, StubServer
+
+    with StubServer(StubConfig(videos=60)) as server:
+        monkeypatch.setattr(
+            youte.cli, "Youte", functools.partial(Youte, base_url=server.base_url)
+        )
+        (tmp_path / "ids.txt").write_text("\n".join(server.video_ids))
+        args = ["videos", "-f", str(tmp_path / "ids.txt"), "--key", "any", "-o", "-"]
+        result = CliRunner().invoke(youte.cli.youte, args + ["--verbosity", "INFO"])
+        partitioned = CliRunner().invoke(
+            youte.cli.youte, args + ["--partition-by", "channel_id"]
+        )
+    assert result.exit_code == 0, result.output
+    # only pages are written to standard output, one per line
+    pages = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [item["id"] for page in pages for item in page["items"]] == (
+        server.video_ids
+    )
+    assert partitioned.exit_code == 2
+    assert "standard output" in partitioned.stderr
+
+
+def test_collect_stops_when_stdout_closed():
+    import youte.cli
+
+    class ClosedPipe:
+        def write(self, page):
+            raise BrokenPipeError
+
+    class FakeYoute:
+        metrics = None
+
+    pages = generate_pages("video", pages=3, items_per_page=2)
+    # like other Unix tools, youte exits quietly when its reader has gone
+    with pytest.raises(SystemExit) as exc:
+        youte.cli._collect(FakeYoute(), pages, None, ClosedPipe())
+    assert exc.value.code == 0
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from youte.timestamps import parse_rfc3339, parse_rfc3339_many
+
+
+@pytest.mark.parametrize(
+    "string",
+    [
+        "2023-04-10T18:19:31Z",
+        "2023-04-10T18:19:31.123456Z",
+        "2023-04-10T18:19:31.5Z",
+        "2023-04-10T18:19:31+10:00",
+        "2023-04-10T18:19:31.25-05:30",
+    ],
+)
+def test_matches_strptime(string):
+    fmt = "%Y-%m-%dT%H:%M:%S.%f%z" if "." in string else "%Y-%m-%dT%H:%M:%S%z"
+    expected = datetime.strptime(string, fmt)
+    parsed = parse_rfc3339(string)
+    assert parsed == expected
+    assert parsed.utcoffset() == expected.utcoffset()
+
+
+def test_utc():
+    parsed = parse_rfc3339("2023-04-10T18:19:31.000001Z")
+    assert parsed.tzinfo is timezone.utc
+    assert parsed.microsecond == 1
+
+
+@pytest.mark.parametrize(
+    "string", ["", "2023-04-10", "2023-04-10 18:19:31", "2023-04-10T18:19:31.Z"]
+)
+def test_invalid(string):
+    with pytest.raises(ValueError):
+        parse_rfc3339(string)
+
+
+def test_many():
+    strings = ["2023-04-10T18:19:31Z", "2023-04-11T00:00:00.5Z"] * 3
+    parsed = parse_rfc3339_many(strings)
+    assert parsed == [parse_rfc3339(string) for string in strings]
+    assert parsed[0] is parsed[2]
+    assert parsed[1] - parsed[0] == timedelta(hours=5, minutes=40, seconds=29.5)
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+import requests
+
+from youte.collector import Youte
+from youte.exceptions import RecordingNotFound
+from youte.transport import RecordTransport, ReplayTransport, Transport
+
+
+class FakeTransport(Transport):
+    """Serve two pages of search results."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params):
+        self.calls.append(dict(params))
+        page = {"kind": "youtube#searchListResponse", "items": [{"page": 2}]}
+        if "pageToken" not in params:
+            page = {
+                "kind": "youtube#searchListResponse",
+                "nextPageToken": "next",
+                "items": [{"page": 1}],
+            }
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers["Content-Type"] = "application/json; charset=UTF-8"
+        response._content = json.dumps(page).encode("utf-8")
+        return response
+
+
+@pytest.fixture()
+def cassette(tmp_path):
+    return tmp_path / "cassette"
+
+
+def test_record_and_replay(cassette):
+    fake = FakeTransport()
+    yob = Youte(api_key="secret", transport=RecordTransport(cassette, fake))
+    recorded = [page for page in yob.search("harry potter", include_meta=False)]
+
+    assert len(fake.calls) == 2
+    assert len(list(cassette.iterdir())) == 2
+    for path in cassette.iterdir():
+        assert "secret" not in path.read_text()
+
+    yob = Youte(api_key="another key", transport=ReplayTransport(cassette))
+    replayed = [page for page in yob.search("harry potter", include_meta=False)]
+    assert replayed == recorded
+
+
+def test_replay_missing(cassette):
+    cassette.mkdir()
+    yob = Youte(api_key="key", transport=ReplayTransport(cassette))
+    with pytest.raises(RecordingNotFound):
+        next(yob.search("not recorded"))
+
+
+def test_batches_are_repeatable(cassette):
+    ids = [f"video{i}" for i in range(120)]
+    fake = FakeTransport()
+    yob = Youte(api_key="key", transport=fake)
+    [page for page in yob.get_video_metadata(ids + ids[:10])]
+
+    batches = [call["id"].split(",") for call in fake.calls if "pageToken" not in call]
+    assert batches == [ids[:50], ids[50:100], ids[100:]]
+
+
+def test_transport_requires_get():
+    class NoGet(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        NoGet()
@@ -0,0 +1,47 @@
+import pytest
+from pydantic import ValidationError
+
+from youte import parser
+from youte.synthetic import generate_pages
+
+
+@pytest.mark.parametrize(
+    "kind,parse",
+    [
+        ("search", parser.parse_searches),
+        ("video", parser.parse_videos),
+        ("channel", parser.parse_channels),
+        ("comment", parser.parse_comments),
+    ],
+)
+def test_trusted_matches_strict(kind, parse):
+    pages = list(generate_pages(kind, pages=2, items_per_page=20))
+    strict = parse(pages).items
+    assert parse(pages, validation="trusted").items == strict
+    assert parse(pages, validation="sampled", sample_every=7).items == strict
+
+
+def test_statistics_are_converted():
+    pages = list(generate_pages("video", pages=1, items_per_page=5))
+    video = parser.parse_videos(pages, validation="trusted").items[0]
+    assert isinstance(video.view_count, int)
+
+
+def _drifted_pages():
+    pages = list(generate_pages("comment", pages=2, items_per_page=10))
+    for page in pages:
+        for item in page["items"]:
+            item["snippet"]["topLevelComment"]["snippet"]["viewerRating"] = "meh"
+    return pages
+
+
+def test_sampled_catches_schema_drift():
+    with pytest.raises(ValidationError):
+        parser.parse_comments(_drifted_pages(), validation="sampled", sample_every=5)
+    comments = parser.parse_comments(_drifted_pages(), validation="trusted")
+    assert len(comments.items) == 20
+
+
+def test_wrong_validation():
+    with pytest.raises(ValueError):
+        parser.parse_videos([], validation="lenient")
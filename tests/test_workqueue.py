@@ -0,0 +1,181 @@
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+import pytest
+
+from youte.workqueue import WorkQueue, merge_shards, run_worker
+
+
+@pytest.fixture()
+def queue(tmp_path) -> WorkQueue:
+    return WorkQueue(tmp_path / "queue.db", lease_seconds=60)
+
+
+class FakeYoute:
+    def get_video_metadata(self, ids, include_meta=True):
+        yield {"kind": "youtube#videoListResponse", "items": [{"id": i} for i in ids]}
+
+
+def test_put_ignores_existing_units(queue):
+    ids = [f"video{i}" for i in range(120)]
+    assert queue.put("video", ids, batch_size=50) == 3
+    assert queue.put("video", ids, batch_size=50) == 0
+    assert queue.counts() == {"video": {"pending": 3}}
+
+
+def test_put_wrong_kind(queue):
+    with pytest.raises(ValueError):
+        queue.put("playlist", ["id"])
+
+
+def test_lease_and_complete(queue):
+    queue.put("video", ["a", "b", "c"], batch_size=2)
+
+    first = queue.lease("w1")
+    second = queue.lease("w2")
+    assert first.payload == ["a", "b"]
+    assert second.payload == ["c"]
+    assert queue.lease("w3") is None
+    assert not queue.is_drained()
+
+    queue.complete(first, "w1")
+    queue.complete(second, "w2")
+    assert queue.is_drained()
+
+
+def test_expired_lease_is_requeued(queue):
+    queue.lease_seconds = -1
+    queue.put("reply", ["thread"])
+
+    unit = queue.lease("crashed")
+    assert not queue.heartbeat(unit, "other")
+    assert queue.requeue_expired() == 1
+
+    queue.lease_seconds = 60
+    unit = queue.lease("w2")
+    assert unit.payload == ["thread"]
+    assert unit.attempts == 1
+    assert queue.heartbeat(unit, "w2")
+
+
+def test_unit_fails_after_max_attempts(queue):
+    queue.lease_seconds = -1
+    queue.max_attempts = 2
+    queue.put("video", ["a"])
+
+    queue.lease("w1")
+    queue.lease("w1")
+    time.sleep(0.01)
+    assert queue.lease("w1") is None
+    assert queue.counts() == {"video": {"failed": 1}}
+    assert queue.is_drained()
+
+
+def test_run_worker(queue, tmp_path):
+    queue.put("video", [f"video{i}" for i in range(75)], batch_size=50)
+    shard = tmp_path / "w1.jsonl"
+
+    def sink(unit, pages):
+        with open(shard, "a") as f:
+            for page in pages:
+                f.write(json.dumps(page) + "\n")
+
+    assert run_worker(queue, FakeYoute(), "w1", sink) == 2
+    assert queue.counts() == {"video": {"done": 2}}
+
+    merged = tmp_path / "merged.jsonl"
+    merge_shards([shard, shard], merged)
+    with open(merged) as f:
+        pages = [json.loads(line) for line in f]
+    assert len(pages) == 4
+    assert sum(len(page["items"]) for page in pages) == 150
+
+
+def test_complete_after_lease_lost(queue):
+    queue.lease_seconds = -1
+    queue.max_attempts = 1
+    queue.put("video", ["a"])
+
+    unit = queue.lease("slow")
+    time.sleep(0.01)
+    queue.requeue_expired()
+    # the slow worker cannot mark the failed unit done
+    assert not queue.complete(unit, "slow")
+    assert queue.counts() == {"video": {"failed": 1}}
+
+
+def test_run_worker_discards_lost_units(queue):
+    queue.put("video", ["a", "b"], batch_size=1)
+    collected = []
+    sunk = []
+
+    class Requeued(FakeYoute):
+        def get_video_metadata(self, ids, include_meta=True):
+            collected.append(ids)
+            if len(collected) == 1:
+                # the lease expires while the first unit is collected
+                with sqlite3.connect(queue.path) as conn:
+                    conn.execute("UPDATE units SET leased_until = 0")
+                queue.requeue_expired()
+            yield from super().get_video_metadata(ids, include_meta)
+
+    assert run_worker(queue, Requeued(), "w1", lambda u, p: sunk.append(u)) == 2
+    # the requeued unit is collected again, and its results sunk only once
+    assert collected == [["a"], ["a"], ["b"]]
+    assert [u.payload for u in sunk] == [["a"], ["b"]]
+    assert queue.counts() == {"video": {"done": 2}}
+
+
+def test_cli_worker_output(tmp_path, monkeypatch, caplog):
+    import functools
+
+    from click.testing import CliRunner
+
+    import youte.cli
+    from youte.collector import Youte
+    from youte.stub import StubConfig, StubServer
+
+    with StubServer(StubConfig(videos=120)) as server:
+        monkeypatch.setattr(
+            youte.cli, "Youte", functools.partial(Youte, base_url=server.base_url)
+        )
+        result = CliRunner().invoke(
+            youte.cli.youte,
+            ["videos", "--key", "any", "--queue", str(tmp_path / "queue.db")]
+            + ["-o", str(tmp_path / "w1.jsonl"), "--output-format", "json"]
+            + ["--flush", "fsync", "--", *server.video_ids],
+        )
+    assert result.exit_code == 0, result.output
+    assert "--output-format json is ignored with --queue" in caplog.text
+    with open(tmp_path / "w1.jsonl") as f:
+        pages = [json.loads(line) for line in f]
+    assert len(pages) == 3
+    assert sum(len(page["items"]) for page in pages) == 120
+
+
+def test_merge_database_shards(tmp_path):
+    import youte.database as database
+
+    # the shard has the columns of the comment table in another order
+    columns = [c.name for c in database.Base.metadata.tables["comment"].columns]
+    shard = tmp_path / "w1.db"
+    with closing(sqlite3.connect(shard)) as conn:
+        for name, table in database.Base.metadata.tables.items():
+            names = [c.name for c in table.columns][::-1]
+            conn.execute(f"CREATE TABLE {name} ({', '.join(names)})")
+        comment = {name: f"{name} value" for name in columns}
+        placeholders = ", ".join("?" * len(comment))
+        conn.execute(
+            f"INSERT INTO comment ({', '.join(comment)}) VALUES ({placeholders})",
+            list(comment.values()),
+        )
+        conn.commit()
+
+    merged = tmp_path / "merged.db"
+    merge_shards([shard, shard], merged)
+    with closing(sqlite3.connect(merged)) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = [dict(row) for row in conn.execute("SELECT * FROM comment")]
+    assert rows == [comment]